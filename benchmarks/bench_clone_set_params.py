@@ -0,0 +1,56 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Times how often a long sklearn-compatible pipeline can be cloned and
+given new hyperparameters, as a grid search does for every candidate.
+
+Run from the repository root:
+
+    PYTHONPATH=`pwd` python benchmarks/bench_clone_set_params.py
+"""
+
+import argparse
+import time
+
+from sklearn.base import clone
+
+import lale.operators
+from lale.lib.lale import NoOp
+from lale.lib.sklearn import LogisticRegression, MinMaxScaler, StandardScaler
+from lale.sklearn_compat import make_sklearn_compat
+
+def long_pipeline(n_steps):
+    kinds = [StandardScaler, MinMaxScaler, NoOp]
+    steps = [kinds[i % len(kinds)]() for i in range(n_steps - 1)] + [LogisticRegression()]
+    return make_sklearn_compat(lale.operators.make_pipeline(*steps))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--steps', type=int, default=30)
+    parser.add_argument('--clones', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    op = long_pipeline(args.steps)
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for i in range(args.clones):
+            clone(op).set_params(LogisticRegression__C=1.0 + i)
+        times.append(time.perf_counter() - start)
+    elapsed = min(times)
+    print(f'{args.clones} clones of a {args.steps}-step pipeline, best of {args.repeat}')
+    print(f'{elapsed:.3f}s ({args.clones / elapsed:.1f} clones/s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Times the sliding-window engine of TimeFreqEigenVectors against the
+original computation that extracted the features one window at a time.
+
+Run from the repository root:
+
+    PYTHONPATH=`pwd` python benchmarks/bench_time_series_windows.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn import preprocessing
+
+from lale.lib.lale.time_series_transformer import TimeFreqEigenVectorsImpl
+
+def original_window_features(window):
+    #FFTWithTimeFreqCorrelation(1, 24, 250, 'first_axis') on one matrix,
+    #as computed before the windows were batched
+    def upper_right_triangle(matrix):
+        return np.array([matrix[i, j] for i in range(matrix.shape[0]) for j in range(i+1, matrix.shape[1])])
+    def eigenvalues(matrix):
+        w, v = np.linalg.eig(matrix)
+        w = np.absolute(w)
+        w.sort()
+        return w
+    def correlation_features(data):
+        corr = np.corrcoef(preprocessing.scale(data, axis=0))
+        return np.concatenate([upper_right_triangle(corr), eigenvalues(corr)])
+    data = window.copy()
+    for ch in data:
+        if np.all(ch == 0.0):
+            ch[-1] += 0.00001
+    time_features = correlation_features(data)
+    freq = np.absolute(np.fft.rfft(window, axis=1))[:, 1:25]
+    indices = np.where(freq <= 0)
+    freq[indices] = np.max(freq)
+    freq[indices] = (np.min(freq) * 0.1)
+    freq = np.log10(freq)
+    freq_features = np.concatenate([correlation_features(freq), freq.ravel()])
+    return np.concatenate([time_features, freq_features])
+
+def transform_window_by_window(X, y):
+    X_transformed, y_transformed = [], []
+    for seizure_data, seizure_label in zip(X, y):
+        start, stop = 0, 250
+        while stop < seizure_data.shape[1]:
+            X_transformed.append(original_window_features(seizure_data[:, start:stop]))
+            y_transformed.append(seizure_label)
+            start, stop = start + 125, stop + 125
+    return np.array(X_transformed), np.array(y_transformed)
+
+def best_time(f, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--channels', type=int, default=16)
+    parser.add_argument('--seconds', type=int, nargs='+', default=[3, 10, 60, 300])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    rng = np.random.RandomState(42)
+    X = [rng.randn(args.channels, 250 * n_seconds) for n_seconds in args.seconds]
+    y = np.zeros(len(X))
+    n_windows = len(transform_window_by_window(X, y)[1])
+    loop_time = best_time(lambda: transform_window_by_window(X, y), args.repeat)
+    batched_time = best_time(lambda: TimeFreqEigenVectorsImpl().transform(X, y), args.repeat)
+    print(f'{n_windows} windows of {args.channels} channels, best of {args.repeat}')
+    print(f'window by window: {loop_time:.3f}s ({n_windows / loop_time:.0f} windows/s)')
+    print(f'sliding windows:  {batched_time:.3f}s ({n_windows / batched_time:.0f} windows/s)')
+    print(f'speedup: {loop_time / batched_time:.1f}x')
+
+if __name__ == '__main__':
+    main()
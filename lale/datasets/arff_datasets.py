@@ -0,0 +1,282 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import numpy as np
+import pandas as pd
+import lale.datasets.data_schemas
+
+_attribute_regex = re.compile(
+    r'''@attribute\s+('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|\S+)\s+(.*)$''',
+    re.IGNORECASE)
+
+def _unquote(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '\'"':
+        return text[1:-1]
+    return text
+
+_value_regex = re.compile(
+    r'''\s*('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[^,]*?)\s*(,|$)''')
+
+def _split_values(text):
+    """Splits comma-separated values that may be quoted with ' or "."""
+    values, pos = [], 0
+    while True:
+        match = _value_regex.match(text, pos)
+        values.append(match.group(1))
+        if match.group(2) == '':
+            return values
+        pos = match.end()
+
+def _unescape(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+def _requote(line):
+    """Rewrites the double-quoted values of a data line as single-quoted ones."""
+    if '"' not in line or line.lstrip().startswith('%'):
+        return line
+    newline = '\n' if line.endswith('\n') else ''
+    values = _split_values(line.rstrip('\r\n'))
+    for i, value in enumerate(values):
+        if value.startswith('"'):
+            escaped = _unescape(value).replace('\\', '\\\\').replace("'", "\\'")
+            values[i] = "'" + escaped + "'"
+    return ','.join(values) + newline
+
+def _parse_attribute(line):
+    match = _attribute_regex.match(line)
+    if match is None:
+        raise ValueError(f'cannot parse ARFF attribute declaration: {line}')
+    name, typ = _unquote(match.group(1)), match.group(2).strip()
+    if typ.startswith('{'):
+        if not typ.endswith('}'):
+            raise ValueError(f'cannot parse ARFF nominal attribute: {line}')
+        return name, [_unescape(value) for value in _split_values(typ[1:-1])]
+    keyword = typ.split()[0].upper()
+    if keyword in ['NUMERIC', 'REAL', 'INTEGER', 'STRING']:
+        return name, keyword
+    if keyword == 'DATE':
+        return name, 'STRING'
+    raise ValueError(f'unsupported ARFF attribute type {keyword} of attribute {name}')
+
+def read_arff_header(f):
+    """Reads the header of an ARFF file up to and including the @data line.
+
+    Returns the relation name, the attributes in the same format as
+    liac-arff, that is, a list of (name, type) pairs where type is
+    'NUMERIC', 'REAL', 'INTEGER', 'STRING', or a list of nominal values,
+    and the position of the first data line in f."""
+    relation, attributes = None, []
+    while True:
+        line = f.readline()
+        if line == '':
+            raise ValueError('ARFF file without @data section')
+        stripped = line.strip()
+        if stripped == '' or stripped.startswith('%'):
+            continue
+        keyword = stripped.split(None, 1)[0].lower()
+        if keyword == '@relation':
+            relation = _unquote(stripped.split(None, 1)[1])
+        elif keyword == '@attribute':
+            attributes.append(_parse_attribute(stripped))
+        elif keyword == '@data':
+            break
+        else:
+            raise ValueError(f'unexpected line in ARFF header: {stripped}')
+    data_offset = f.tell()
+    while True:
+        line = f.readline()
+        stripped = line.strip()
+        if line == '' or (stripped != '' and not stripped.startswith('%')):
+            break
+    if stripped.startswith('{'):
+        raise ValueError('sparse ARFF data is not supported')
+    f.seek(data_offset)
+    return relation, attributes, data_offset
+
+class _RequotedData():
+    """File-like view of an ARFF data section with double quotes rewritten."""
+    def __init__(self, f):
+        self._lines = (_requote(line) for line in f)
+        self._buffer = ''
+
+    def __iter__(self):
+        buffer, self._buffer = self._buffer, ''
+        if buffer != '':
+            yield buffer
+        yield from self._lines
+
+    def read(self, size=-1):
+        parts, length = [self._buffer], len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        text = ''.join(parts)
+        if size < 0:
+            size = len(text)
+        self._buffer = text[size:]
+        return text[:size]
+
+def _with_n_rows(schema, n_rows):
+    #shallow copy, so the column schemas are shared by all chunks
+    return {**schema, 'minItems': n_rows, 'maxItems': n_rows}
+
+class ArffBatchReader():
+    """Reads the data section of an ARFF file as a stream of schema-annotated chunks.
+
+    The header is parsed once, and the JSON schema is derived from it
+    with the same logic as liac_arff_to_schema, without looking at the
+    data. The data section is then parsed by the pandas CSV engine,
+    batch_size rows at a time, into typed columns: floats for NUMERIC
+    and REAL, integers (or floats if there are missing values) for
+    INTEGER, categoricals for nominal attributes, and strings for STRING
+    and DATE. Missing values ('?') become NaN. Sparse ARFF data is not
+    supported.
+
+    Parameters
+    ----------
+    path : string
+        Path to the .arff file.
+    batch_size : int, default 65536
+        Maximum number of rows per chunk.
+    columns : list of strings, optional
+        Only read these attributes. By default, read all attributes.
+    target : string, optional
+        If given, iterating yields (X, y) pairs where y is this attribute,
+        otherwise iterating yields X only.
+
+    Examples
+    --------
+    >>> reader = ArffBatchReader('credit-g.arff', target='class')
+    >>> for X, y in reader:
+    ...     trained = trained.partial_fit(X, y)
+    """
+    def __init__(self, path, batch_size=65536, columns=None, target=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.target = target
+        with open(path) as f:
+            self.relation, self.attributes, self._data_offset = read_arff_header(f)
+        names = [attr[0] for attr in self.attributes]
+        if columns is not None:
+            if target is not None and target not in columns:
+                columns = [*columns, target]
+            for col in columns:
+                if col not in names:
+                    raise ValueError(f'attribute {col} not found in {path}, available attributes: {names}')
+        self.columns = columns
+        selected = [attr for attr in self.attributes
+                    if columns is None or attr[0] in columns]
+        to_schema = lale.datasets.data_schemas.liac_arff_attributes_to_schema
+        self.schema = to_schema(selected)
+        if target is None:
+            self.schema_X = self.schema
+            self.schema_y = None
+        else:
+            self.schema_X = to_schema([attr for attr in selected if attr[0] != target])
+            target_attr = [attr for attr in selected if attr[0] == target]
+            if len(target_attr) == 0:
+                raise ValueError(f'target {target} not found in {path}')
+            self.schema_y = {
+                'type': 'array',
+                'items': to_schema(target_attr)['items']['items'][0]}
+
+    def _data_frames(self):
+        names = [attr[0] for attr in self.attributes]
+        dtypes = {}
+        for name, typ in self.attributes:
+            if typ in ['NUMERIC', 'REAL']:
+                dtypes[name] = np.float64
+            elif typ == 'INTEGER':
+                pass #let pandas pick int64, or float64 if there are missing values
+            else:
+                dtypes[name] = str
+        with open(self.path) as f:
+            f.seek(self._data_offset)
+            #pandas only supports one quote character, so lines with
+            #double-quoted values are rewritten while reading
+            chunks = pd.read_csv(
+                _RequotedData(f), header=None, names=names, usecols=self.columns, dtype=dtypes,
+                na_values=['?'], keep_default_na=False, quotechar="'",
+                escapechar='\\', skipinitialspace=True, comment='%',
+                skip_blank_lines=True, chunksize=self.batch_size)
+            for chunk in chunks:
+                yield self._convert(chunk)
+
+    def _convert(self, df):
+        for name, typ in self.attributes:
+            if name not in df.columns or typ in ['NUMERIC', 'REAL', 'INTEGER']:
+                continue
+            values = df[name]
+            if isinstance(typ, list):
+                values = pd.Categorical(values, categories=typ)
+            df[name] = values
+        if self.columns is not None:
+            df = df[self.columns]
+        return df
+
+    def project(self, op):
+        """Returns a reader of only the columns that op reads, plus the target.
+
+        If all steps of op that receive the input data are Project
+        operators, the other columns are never loaded, otherwise this
+        returns self."""
+        from lale.lib.lale.project import projected_columns
+        columns = projected_columns(op, self.schema_X)
+        if columns is None:
+            return self
+        return type(self)(self.path, batch_size=self.batch_size, columns=columns,
+                          target=self.target)
+
+    def __iter__(self):
+        from lale.datasets.data_schemas import DataFrameWithSchema, SeriesWithSchema
+        for df in self._data_frames():
+            n_rows = len(df)
+            if self.target is None:
+                X = DataFrameWithSchema(df)
+                X.json_schema = _with_n_rows(self.schema_X, n_rows)
+                yield X
+            else:
+                X = DataFrameWithSchema(df.drop(columns=[self.target]))
+                X.json_schema = _with_n_rows(self.schema_X, n_rows)
+                y = SeriesWithSchema(df[self.target])
+                y.json_schema = _with_n_rows(self.schema_y, n_rows)
+                yield X, y
+
+    def read(self, missing_as_none=False):
+        """Reads all selected attributes, including the target, into one DataFrameWithSchema.
+
+        With missing_as_none=True, nominal and string attributes are
+        returned as object columns with None for missing values, like
+        the data returned by arff.load."""
+        chunks = list(self._data_frames())
+        if len(chunks) == 0:
+            names = [attr[0] for attr in self.attributes]
+            df = pd.DataFrame(columns=names if self.columns is None else self.columns)
+        else:
+            df = pd.concat(chunks, ignore_index=True)
+        if missing_as_none:
+            for name, typ in self.attributes:
+                if name in df.columns and typ not in ['NUMERIC', 'REAL', 'INTEGER']:
+                    values = df[name].astype(object)
+                    df[name] = values.where(values.notna(), None)
+        result = lale.datasets.data_schemas.DataFrameWithSchema(df)
+        result.json_schema = _with_n_rows(self.schema, len(df))
+        return result
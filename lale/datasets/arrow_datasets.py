@@ -0,0 +1,198 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ModuleNotFoundError:
+    raise ModuleNotFoundError("""Package 'pyarrow' not found. You can install it with
+    pip install pyarrow""")
+import lale.datasets.data_schemas
+import lale.type_checking
+
+_parquet_extensions = ['.parquet', '.pq']
+_ipc_extensions = ['.arrow', '.feather', '.ipc']
+
+def arrow_type_to_schema(arrow_type):
+    if pyarrow.types.is_boolean(arrow_type):
+        return {'type': 'boolean'}
+    if pyarrow.types.is_unsigned_integer(arrow_type):
+        return {'type': 'integer', 'minimum': 0}
+    if pyarrow.types.is_integer(arrow_type):
+        return {'type': 'integer'}
+    if pyarrow.types.is_floating(arrow_type) or pyarrow.types.is_decimal(arrow_type):
+        return {'type': 'number'}
+    if pyarrow.types.is_string(arrow_type) or pyarrow.types.is_large_string(arrow_type):
+        return {'type': 'string'}
+    if pyarrow.types.is_dictionary(arrow_type):
+        return arrow_type_to_schema(arrow_type.value_type)
+    return lale.datasets.data_schemas.dtype_to_schema(arrow_type.to_pandas_dtype())
+
+def arrow_schema_to_schema(arrow_schema, n_rows=None):
+    """JSON schema of a table with the given pyarrow.Schema.
+
+    The schema has the same shape as the result of
+    lale.datasets.data_schemas.dataframe_to_schema, but is computed
+    from the Arrow metadata alone without touching any data."""
+    n_columns = len(arrow_schema)
+    items = [
+        {'description': field.name, **arrow_type_to_schema(field.type)}
+        for field in arrow_schema]
+    result = {
+        'type': 'array',
+        'items': {
+            'type': 'array',
+            'minItems': n_columns,
+            'maxItems': n_columns,
+            'items': items}}
+    if n_rows is not None:
+        result['minItems'] = n_rows
+        result['maxItems'] = n_rows
+    lale.type_checking.validate_is_schema(result)
+    return result
+
+def _with_n_rows(schema, n_rows):
+    #shallow copy, so the column schemas are shared by all chunks
+    return {**schema, 'minItems': n_rows, 'maxItems': n_rows}
+
+class ArrowBatchReader():
+    """Reads a Parquet or Arrow IPC file as a stream of schema-annotated chunks.
+
+    The JSON schema is derived once from the Arrow schema in the file
+    metadata, so no chunk is ever inspected with dataframe_to_schema.
+    The reader can be iterated several times, for instance once per
+    epoch, and each iteration re-reads the file chunk by chunk.
+
+    Parameters
+    ----------
+    path : string
+        Path to a .parquet/.pq file or an Arrow IPC (.arrow/.feather/.ipc) file.
+    batch_size : int, default 65536
+        Maximum number of rows per chunk.
+    columns : list of strings, optional
+        Only read these columns. By default, read all columns.
+    target : string, optional
+        If given, iterating yields (X, y) pairs where y is this column,
+        otherwise iterating yields X only.
+    file_format : 'parquet' or 'ipc', optional
+        By default, the format is derived from the file extension.
+
+    Examples
+    --------
+    >>> reader = ArrowBatchReader('train.parquet', target='class')
+    >>> for X, y in reader:
+    ...     trained = trained.partial_fit(X, y)
+    """
+    def __init__(self, path, batch_size=65536, columns=None, target=None, file_format=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.target = target
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lower()
+            if extension in _parquet_extensions:
+                file_format = 'parquet'
+            elif extension in _ipc_extensions:
+                file_format = 'ipc'
+            else:
+                raise ValueError(f'cannot derive the file format of {path} from its extension, please specify file_format')
+        if file_format not in ['parquet', 'ipc']:
+            raise ValueError(f'unexpected file_format {file_format}')
+        self.file_format = file_format
+        arrow_schema, self.n_rows = self._read_metadata()
+        if columns is not None:
+            if target is not None and target not in columns:
+                columns = [*columns, target]
+            arrow_schema = pyarrow.schema([arrow_schema.field(c) for c in columns])
+        self.columns = columns
+        if target is None:
+            self.schema_X = arrow_schema_to_schema(arrow_schema, self.n_rows)
+            self.schema_y = None
+        else:
+            X_fields = [field for field in arrow_schema if field.name != target]
+            self.schema_X = arrow_schema_to_schema(pyarrow.schema(X_fields), self.n_rows)
+            self.schema_y = {
+                'type': 'array',
+                'items': {
+                    'description': target,
+                    **arrow_type_to_schema(arrow_schema.field(target).type)}}
+            if self.n_rows is not None:
+                self.schema_y = _with_n_rows(self.schema_y, self.n_rows)
+            lale.type_checking.validate_is_schema(self.schema_y)
+
+    def _read_metadata(self):
+        if self.file_format == 'parquet':
+            parquet_file = pyarrow.parquet.ParquetFile(self.path)
+            return parquet_file.schema_arrow, parquet_file.metadata.num_rows
+        with pyarrow.memory_map(self.path) as source:
+            try:
+                file_reader = pyarrow.ipc.open_file(source)
+            except pyarrow.ArrowInvalid:
+                #the streaming format has no footer with the number of rows
+                return pyarrow.ipc.open_stream(source).schema, None
+            n_rows = sum(file_reader.get_batch(i).num_rows
+                         for i in range(file_reader.num_record_batches))
+            return file_reader.schema, n_rows
+
+    def _record_batches(self):
+        if self.file_format == 'parquet':
+            parquet_file = pyarrow.parquet.ParquetFile(self.path)
+            yield from parquet_file.iter_batches(
+                batch_size=self.batch_size, columns=self.columns)
+            return
+        with pyarrow.memory_map(self.path) as source:
+            try:
+                file_reader = pyarrow.ipc.open_file(source)
+                record_batches = (file_reader.get_batch(i)
+                                  for i in range(file_reader.num_record_batches))
+            except pyarrow.ArrowInvalid:
+                source.seek(0)
+                record_batches = iter(pyarrow.ipc.open_stream(source))
+            for record_batch in record_batches:
+                if self.columns is not None:
+                    record_batch = pyarrow.RecordBatch.from_arrays(
+                        [record_batch.column(c) for c in self.columns],
+                        names=self.columns)
+                #slicing is zero-copy on the memory-mapped file
+                for offset in range(0, record_batch.num_rows, self.batch_size):
+                    yield record_batch.slice(offset, self.batch_size)
+
+    def project(self, op):
+        """Returns a reader of only the columns that op reads, plus the target.
+
+        If all steps of op that receive the input data are Project
+        operators, the other columns are never loaded, otherwise this
+        returns self."""
+        from lale.lib.lale.project import projected_columns
+        columns = projected_columns(op, self.schema_X)
+        if columns is None:
+            return self
+        return type(self)(self.path, batch_size=self.batch_size, columns=columns,
+                          target=self.target, file_format=self.file_format)
+
+    def __iter__(self):
+        from lale.datasets.data_schemas import DataFrameWithSchema, SeriesWithSchema
+        for record_batch in self._record_batches():
+            df = record_batch.to_pandas()
+            n_rows = len(df)
+            if self.target is None:
+                X = DataFrameWithSchema(df)
+                X.json_schema = _with_n_rows(self.schema_X, n_rows)
+                yield X
+            else:
+                X = DataFrameWithSchema(df.drop(columns=[self.target]))
+                X.json_schema = _with_n_rows(self.schema_X, n_rows)
+                y = SeriesWithSchema(df[self.target])
+                y.json_schema = _with_n_rows(self.schema_y, n_rows)
+                yield X, y
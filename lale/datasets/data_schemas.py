@@ -17,6 +17,7 @@ import numpy as np
 import os
 import pandas as pd
 import scipy.sparse
+import weakref
 try:
     import torch
     torch_installed=True
@@ -56,6 +57,28 @@ class SeriesWithSchema(pd.Series):
     def _constructor(self):
         return SeriesWithSchema
 
+# Schemas of objects that cannot be given a json_schema attribute without
+# wrapping them in a subclass, such as sparse matrices and tensors. Keyed by
+# id, and each entry is dropped when its object is garbage collected.
+_side_table = {}
+
+def _side_table_set(obj, schema):
+    key = id(obj)
+    def drop(ref):
+        entry = _side_table.get(key, None)
+        if entry is not None and entry[0] is ref:
+            del _side_table[key]
+    _side_table[key] = (weakref.ref(obj, drop), schema)
+
+def _side_table_get(obj):
+    entry = _side_table.get(id(obj), None)
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    return None
+
+def _is_side_table_type(obj):
+    return scipy.sparse.issparse(obj) or (torch_installed and isinstance(obj, torch.Tensor))
+
 def is_list_tensor(obj):
     def list_tensor_shape(ls):
         if isinstance(ls, int) or isinstance(ls, float) or isinstance(ls, str):
@@ -78,6 +101,11 @@ def is_list_tensor(obj):
     return False
 
 def add_schema(obj, schema=None, raise_on_failure=False, recalc=False):
+    """Attaches a JSON schema to obj without copying its data.
+
+    Arrays become views, and pandas objects share their data with obj.
+    Sparse matrices and tensors are returned as is, with the schema (if
+    any) kept in a side table until they are garbage collected."""
     disable_schema = os.environ.get("LALE_DISABLE_SCHEMA_VALIDATION", None)
     if disable_schema is not None and disable_schema.lower()=='true':
         return obj
@@ -90,11 +118,17 @@ def add_schema(obj, schema=None, raise_on_failure=False, recalc=False):
     elif isinstance(obj, SeriesWithSchema):
         result = obj
     elif isinstance(obj, pd.Series):
-        result = SeriesWithSchema(obj)
+        result = SeriesWithSchema(obj, copy=False)
     elif isinstance(obj, DataFrameWithSchema):
         result = obj
     elif isinstance(obj, pd.DataFrame):
-        result = DataFrameWithSchema(obj)
+        result = DataFrameWithSchema(obj, copy=False)
+    elif _is_side_table_type(obj):
+        if recalc or _side_table_get(obj) is None:
+            if schema is not None:
+                lale.type_checking.validate_is_schema(schema)
+                _side_table_set(obj, schema)
+        return obj
     elif is_list_tensor(obj):
         obj = np.array(obj)
         result = obj.view(NDArrayWithSchema)
@@ -113,14 +147,15 @@ def add_schema(obj, schema=None, raise_on_failure=False, recalc=False):
     return result
 
 def strip_schema(obj):
+    """Returns obj without its JSON schema, sharing its data instead of copying it."""
     if isinstance(obj, NDArrayWithSchema):
-        result = np.array(obj)
+        result = obj.view(np.ndarray)
         assert type(result) == np.ndarray
     elif isinstance(obj, SeriesWithSchema):
-        result = pd.Series(obj)
+        result = pd.Series(obj, copy=False)
         assert type(result) == pd.Series
     elif isinstance(obj, DataFrameWithSchema):
-        result = pd.DataFrame(obj)
+        result = pd.DataFrame(obj, copy=False)
         assert type(result) == pd.DataFrame
     else:
         result = obj
@@ -172,6 +207,9 @@ def ndarray_to_schema(array):
 
 def csr_matrix_to_schema(matrix):
     assert isinstance(matrix, scipy.sparse.csr_matrix)
+    result = _side_table_get(matrix)
+    if result is not None:
+        return result
     return shape_and_dtype_to_schema(matrix.shape, matrix.dtype)
 
 def dataframe_to_schema(df):
@@ -180,9 +218,10 @@ def dataframe_to_schema(df):
         return df.json_schema
     n_rows, n_columns = df.shape
     assert n_columns == len(df.columns) and n_columns == len(df.dtypes)
+    #by position, since column names need not be unique
     items = [
-        {'description': str(col), **dtype_to_schema(df.dtypes[col])}
-        for col in df.columns]
+        {'description': str(col), **dtype_to_schema(dtype)}
+        for col, dtype in zip(df.columns, df.dtypes)]
     result = {
         'type': 'array',
         'minItems': n_rows,
@@ -216,6 +255,9 @@ def torch_tensor_to_schema(tensor):
 or with
     pip install 'lale[full]'"""
     assert isinstance(tensor, torch.Tensor)
+    result = _side_table_get(tensor)
+    if result is not None:
+        return result
     #https://pytorch.org/docs/stable/tensor_attributes.html#torch-dtype
     if tensor.dtype == torch.bool:
         result = {'type': 'boolean'}
@@ -247,7 +289,11 @@ def liac_arff_to_schema(larff):
     pip install 'liac-arff>=2.4.0'
 or with
     pip install 'lale[full]'"""
-    n_rows, n_columns = len(larff['data']), len(larff['attributes'])
+    return liac_arff_attributes_to_schema(larff['attributes'], len(larff['data']))
+
+def liac_arff_attributes_to_schema(attributes, n_rows=None):
+    """Schema of a table with the given liac-arff attributes, omitting the number of rows if n_rows is None."""
+    n_columns = len(attributes)
     def larff_type_to_schema(larff_type):
         if isinstance(larff_type, str):
             a2j = {'numeric': 'number', 'real': 'number',
@@ -257,16 +303,16 @@ or with
         return {'enum': [*larff_type]}
     items = [
         {'description': attr[0], **larff_type_to_schema(attr[1])}
-        for attr in larff['attributes']]
+        for attr in attributes]
     result = {
         'type': 'array',
-        'minItems': n_rows,
-        'maxItems': n_rows,
         'items': {
             'type': 'array',
             'minItems': n_columns,
             'maxItems': n_columns,
             'items': items}}
+    if n_rows is not None:
+        result = {**result, 'minItems': n_rows, 'maxItems': n_rows}
     lale.type_checking.validate_is_schema(result)
     return result
 
@@ -0,0 +1,165 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local cache of fetched and post-processed datasets.
+
+Each entry is a directory with one file per array, plus a JSON file
+with the names, formats, and JSON schemas of the arrays. NumPy arrays
+are stored as .npy files and loaded memory-mapped, pandas objects are
+stored as Parquet files if pyarrow is installed. Entries are keyed by
+the dataset name and the parameters that affect the result, and are
+written to a temporary directory first, so concurrent callers never
+see a half-written entry. The key also covers the cache format, the
+lale version, the checksums of the source resources if they are known,
+and the code of the source files that fetch and preprocess the data,
+so changes to any of them do not serve stale entries."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import lale.datasets.data_schemas
+import lale.datasets.resources
+
+logger = logging.getLogger(__name__)
+
+cache_dir = os.environ.get('LALE_DATASET_CACHE_DIR',
+                           os.path.join(os.path.dirname(__file__), 'cache_data'))
+
+_index_file_name = 'index.json'
+
+#increment when the layout of entries changes
+_format_version = 1
+
+_source_file_digests = {}
+
+def _source_file_digest(file_name):
+    if file_name not in _source_file_digests:
+        with open(file_name, 'rb') as f:
+            _source_file_digests[file_name] = hashlib.sha1(f.read()).hexdigest()
+    return _source_file_digests[file_name]
+
+def _entry_dir(dataset_name, params, resources, source_files):
+    import lale
+    parts = [f'format={_format_version}', f'lale={lale.__version__}']
+    parts += [f'{name}={lale.datasets.resources.known_sha256(name)}' for name in resources]
+    parts += [f'{os.path.basename(file_name)}={_source_file_digest(file_name)}'
+              for file_name in source_files]
+    parts += [f'{k}={params[k]!r}' for k in sorted(params)]
+    digest = hashlib.sha1(','.join(parts).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f'{dataset_name}-{digest}')
+
+def _parquet_installed():
+    try:
+        import pyarrow
+        return True
+    except ModuleNotFoundError:
+        return False
+
+def _nan_columns(df):
+    #Parquet turns both None and NaN into nulls, which pandas reads back as
+    #None in object columns, so remember which object columns used NaN
+    def is_nan(value):
+        return isinstance(value, float) and value != value
+    return [col for col in df.columns
+            if df[col].dtype == object and df[col].map(is_nan).any()]
+
+def load(dataset_name, resources=(), source_files=(), **params):
+    """Returns the list of cached arrays with their schemas, or None if there is no entry for dataset_name and params.
+
+    Pass the same resource names and source files as to store."""
+    entry_dir = _entry_dir(dataset_name, params, resources, source_files)
+    index_file_name = os.path.join(entry_dir, _index_file_name)
+    if not os.path.exists(index_file_name):
+        return None
+    with open(index_file_name) as f:
+        index = json.load(f)
+    result = []
+    for item in index:
+        file_name = os.path.join(entry_dir, item['file'])
+        if item['format'] == 'npy':
+            #copy-on-write, so callers can modify the array without touching the cache
+            obj = np.load(file_name, mmap_mode='c', allow_pickle=False)
+        elif item['format'] == 'parquet':
+            obj = pd.read_parquet(file_name)
+            for col in item['nan_columns']:
+                obj[col] = obj[col].where(obj[col].notna(), np.nan)
+            if item['kind'] == 'series':
+                obj = obj.iloc[:, 0].rename(item['name'])
+        else:
+            raise ValueError(f'unexpected format {item["format"]} in {index_file_name}')
+        result.append(lale.datasets.data_schemas.add_schema(obj, item['json_schema']))
+    return result
+
+def store(dataset_name, objs, resources=(), source_files=(), **params):
+    """Stores the list objs of arrays with their schemas, returns False if some array has a format that cannot be cached.
+
+    resources are the names of the resources that objs were computed
+    from, and source_files the code that computed them."""
+    index = []
+    for i, obj in enumerate(objs):
+        if isinstance(obj, np.ndarray) and obj.dtype != object:
+            item = {'file': f'{i}.npy', 'format': 'npy', 'kind': 'ndarray'}
+        elif isinstance(obj, pd.Series) and _parquet_installed():
+            item = {'file': f'{i}.parquet', 'format': 'parquet', 'kind': 'series', 'name': obj.name,
+                    'nan_columns': _nan_columns(pd.DataFrame({'values': obj}))}
+        elif isinstance(obj, pd.DataFrame) and _parquet_installed() \
+             and all(isinstance(col, str) for col in obj.columns):
+            item = {'file': f'{i}.parquet', 'format': 'parquet', 'kind': 'dataframe',
+                    'nan_columns': _nan_columns(obj)}
+        else:
+            logger.info(f'not caching {dataset_name}, since it contains a {type(obj)}')
+            return False
+        item['json_schema'] = lale.datasets.data_schemas.to_schema(obj)
+        index.append(item)
+    try:
+        index_text = json.dumps(index)
+    except TypeError as e:
+        logger.info(f'not caching {dataset_name}, since its schemas are not JSON: {e}')
+        return False
+    entry_dir = _entry_dir(dataset_name, params, resources, source_files)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        for obj, item in zip(objs, index):
+            file_name = os.path.join(tmp_dir, item['file'])
+            if item['format'] == 'npy':
+                np.save(file_name, lale.datasets.data_schemas.strip_schema(obj), allow_pickle=False)
+            elif item['kind'] == 'series':
+                pd.DataFrame({'values': obj}).to_parquet(file_name)
+            else:
+                pd.DataFrame(obj).to_parquet(file_name)
+        with open(os.path.join(tmp_dir, _index_file_name), 'w') as f:
+            f.write(index_text)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            #another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return True
+
+def clear(dataset_name=None):
+    """Removes the cached entries of dataset_name, or all entries if dataset_name is None."""
+    if not os.path.exists(cache_dir):
+        return
+    for entry in os.listdir(cache_dir):
+        if dataset_name is None or entry.rsplit('-', 1)[0] == dataset_name:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
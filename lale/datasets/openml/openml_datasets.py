@@ -14,14 +14,6 @@
 
 from typing import Dict
 import os
-try:
-    import arff
-except ModuleNotFoundError:
-    raise ModuleNotFoundError("""Package 'arff' not found. You can install it with
-    pip install 'liac-arff>=2.4.0'
-or with
-    pip install 'lale[full]'""")
-import urllib
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -29,6 +21,7 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
+import lale.datasets.resources
 
 download_data_dir = os.path.join(os.path.dirname(__file__), 'download_data')
 experiments_dict:Dict[str,Dict[str,str]] = {}
@@ -349,8 +342,13 @@ def add_schemas(schema_orig, target_col, train_X, test_X, train_y, test_y):
         'minItems': nrows_test, 'maxItems': nrows_test, 'items': elem_y})
     return train_X, test_X, train_y, test_y
 
+for _dataset_name, _experiment in experiments_dict.items():
+    lale.datasets.resources.register(
+        f'openml/{_dataset_name}.arff', _experiment['download_arff_url'],
+        default_path=os.path.join(download_data_dir, _dataset_name+".arff"))
+
 numeric_data_types_list = ['numeric', 'integer', 'real']
-def fetch(dataset_name, task_type, verbose=False, preprocess=True, test_size=0.33):
+def fetch(dataset_name, task_type, verbose=False, preprocess=True, test_size=0.33, use_cache=True):
     if verbose:
         print('Loading dataset:', dataset_name)
     #Check that the dataset name exists in experiments_dict
@@ -362,29 +360,43 @@ def fetch(dataset_name, task_type, verbose=False, preprocess=True, test_size=0.3
 
     except KeyError:
         raise KeyError("Dataset name {} not found in the supported datasets".format(dataset_name))
-    data_file_name = os.path.join(download_data_dir, dataset_name+".arff")
-    if verbose:
-        print(data_file_name)
-    if not os.path.exists(data_file_name):
-        #TODO: Download the data
-        if not os.path.exists(download_data_dir):
-            os.makedirs(download_data_dir)
+    import lale.datasets.dataset_cache
+    cache_params = {
+        'preprocess': preprocess, 'test_size': test_size,
+        'resources': [f'openml/{dataset_name}.arff'], 'source_files': [__file__]}
+    if use_cache:
+        cached = lale.datasets.dataset_cache.load(f'openml-{dataset_name}', **cache_params)
+        if cached is not None:
             if verbose:
-                print('created directory {}'.format(download_data_dir))
-        urllib.request.urlretrieve(experiments_dict[dataset_name]['download_arff_url'], data_file_name)
+                print('Loaded from cache:', lale.datasets.dataset_cache.cache_dir)
+            X_train, y_train, X_test, y_test = cached
+            return (X_train, y_train), (X_test, y_test)
+    (X_train, y_train), (X_test, y_test) = _fetch(
+        dataset_name, verbose, preprocess, test_size)
+    if use_cache:
+        lale.datasets.dataset_cache.store(
+            f'openml-{dataset_name}', [X_train, y_train, X_test, y_test], **cache_params)
+    return (X_train, y_train), (X_test, y_test)
 
+def _fetch(dataset_name, verbose, preprocess, test_size):
+    #from the resource mirror if there is one, otherwise from download_data_dir, downloading if needed
+    data_file_name = lale.datasets.resources.resolve(f'openml/{dataset_name}.arff')
+    if verbose:
+        print(data_file_name)
     assert os.path.exists(data_file_name)
-    with open(data_file_name) as f:
-        dataDictionary = arff.load(f)
-        f.close()
-
-    from lale.datasets.data_schemas import liac_arff_to_schema
-    schema_orig = liac_arff_to_schema(dataDictionary)
+    from lale.datasets.arff_datasets import ArffBatchReader
+    from lale.datasets.data_schemas import strip_schema
+    reader = ArffBatchReader(data_file_name)
+    #same values as arff.load, with None for missing nominal and string values
+    data_all = reader.read(missing_as_none=True)
+    schema_orig = data_all.json_schema
+    data_all = strip_schema(data_all)
     target_col = experiments_dict[dataset_name]['target']
     if preprocess:
-        arffData = pd.DataFrame(dataDictionary['data'])
+        arffData = data_all.copy()
+        arffData.columns = [*range(arffData.shape[1])]
         #arffData = arffData.fillna(0)
-        attributes = dataDictionary['attributes']
+        attributes = list(reader.attributes)
 
         if verbose:
             print(attributes)
@@ -442,8 +454,9 @@ def fetch(dataset_name, task_type, verbose=False, preprocess=True, test_size=0.3
             print("Shape of X after preprocessing", X.shape)
 
     else:
-        col_names = [attr[0].lower() for attr in dataDictionary['attributes']]
-        df_all = pd.DataFrame(dataDictionary['data'], columns=col_names)
+        col_names = [attr[0].lower() for attr in reader.attributes]
+        df_all = data_all.copy()
+        df_all.columns = col_names
         y = df_all[target_col]
         y = y.squeeze()
         cols_X = [col for col in col_names if col != target_col]
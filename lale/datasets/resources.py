@@ -0,0 +1,256 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of downloadable datasets and pretrained models.
+
+Every resource has a name, a download URL, and optionally a default
+local path and a SHA-256 checksum. The name doubles as the relative
+path of the resource in a local mirror directory, which is given by
+the environment variable LALE_RESOURCE_MIRROR. Setting LALE_OFFLINE
+to true forbids all downloads, so resources must be in the mirror or
+at their default path. A mirror can be filled on a machine with network
+access with prefetch, and then copied to machines without.
+
+Checksums come from the registry or from a SHA256SUMS file in the
+mirror, in the format of the sha256sum tool. A file is hashed once,
+and the result is remembered next to it in a .sha256 file, so later
+lookups of large resources do not re-read them."""
+
+import concurrent.futures
+import hashlib
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import urllib.request
+import zipfile
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, Dict[str, Any]] = {}
+
+_checksums_file_name = 'SHA256SUMS'
+
+def register(name:str, url:str, default_path:Optional[str]=None, sha256:Optional[str]=None) -> None:
+    """Adds a resource to the registry, or updates it if it is already there."""
+    _registry[name] = {'url': url, 'default_path': default_path, 'sha256': sha256}
+
+def registered_names() -> List[str]:
+    return [*_registry.keys()]
+
+def mirror_dir() -> Optional[str]:
+    return os.environ.get('LALE_RESOURCE_MIRROR', None)
+
+def offline() -> bool:
+    return os.environ.get('LALE_OFFLINE', 'false').lower() == 'true'
+
+def _lookup(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(f'Resource {name} not found in the registry, registered resources: {registered_names()}')
+
+def _mirror_path(name):
+    mirror = mirror_dir()
+    return None if mirror is None else os.path.join(mirror, *name.split('/'))
+
+def _read_checksums(mirror):
+    result = {}
+    checksums_file_name = os.path.join(mirror, _checksums_file_name)
+    if os.path.exists(checksums_file_name):
+        with open(checksums_file_name) as f:
+            for line in f:
+                if line.strip() != '':
+                    digest, file_name = line.split(None, 1)
+                    result[file_name.strip().lstrip('*')] = digest
+    return result
+
+def _expected_sha256(name):
+    expected = _lookup(name)['sha256']
+    if expected is None and mirror_dir() is not None:
+        expected = _read_checksums(mirror_dir()).get(name, None)
+    return expected
+
+def known_sha256(name:str) -> Optional[str]:
+    """Checksum of the resource from the registry or the mirror's SHA256SUMS file, or None if neither has one."""
+    return _expected_sha256(name)
+
+def sha256_of_file(path:str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _verify(name, path):
+    expected = _expected_sha256(name)
+    if expected is None:
+        return
+    marker = path + '.sha256'
+    if os.path.exists(marker) and os.path.getmtime(marker) >= os.path.getmtime(path):
+        with open(marker) as f:
+            if f.read().strip() == expected:
+                return
+    actual = sha256_of_file(path)
+    if actual != expected:
+        raise ValueError(f'Checksum mismatch for resource {name} at {path}: expected {expected}, found {actual}.')
+    try:
+        with open(marker, 'w') as f:
+            f.write(actual)
+    except OSError:
+        pass #read-only mirror, verify again next time
+
+def find(name:str) -> Optional[str]:
+    """Local path of the resource in the mirror or at its default path, or None if it is in neither place.
+
+    Raises ValueError if the local file does not match its checksum."""
+    resource = _lookup(name)
+    for path in [_mirror_path(name), resource['default_path']]:
+        if path is not None and os.path.exists(path):
+            _verify(name, path)
+            return path
+    return None
+
+def _download(name, path):
+    if offline():
+        raise FileNotFoundError(
+            f'Resource {name} is not available locally and LALE_OFFLINE is set. '
+            f'Put it at {_mirror_path(name) or _lookup(name)["default_path"]}, '
+            f'for instance with lale.datasets.resources.prefetch on a machine with network access.')
+    url = _lookup(name)['url']
+    logger.info(f'downloading {url} to {path}')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    #download next to the final location and rename, so a partial download is never found
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    try:
+        urllib.request.urlretrieve(url, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _verify(name, path)
+    return path
+
+def resolve(name:str, target:Optional[str]=None) -> str:
+    """Local path of the resource, downloading it into the mirror (or to its default path if there is no mirror) if needed.
+
+    A target path, for instance in a temporary directory, overrides where a missing resource is downloaded to."""
+    path = find(name)
+    if path is not None:
+        return path
+    if target is None:
+        target = _mirror_path(name) or _lookup(name)['default_path']
+    if target is None:
+        raise FileNotFoundError(f'Resource {name} has no default path, please set LALE_RESOURCE_MIRROR.')
+    return _download(name, target)
+
+def find_or_default(name:str, default:str) -> str:
+    """Local path of the resource if there is one, otherwise default, for instance a model name that a library downloads by itself.
+
+    Raises FileNotFoundError instead of returning default if LALE_OFFLINE is set."""
+    path = find(name)
+    if path is not None:
+        return path
+    if offline():
+        raise FileNotFoundError(
+            f'Resource {name} is not available locally and LALE_OFFLINE is set. '
+            f'Put it at {_mirror_path(name) or _lookup(name)["default_path"]}.')
+    return default
+
+def _escapes_target(member_path):
+    parts = member_path.replace('\\', '/').split('/')
+    return (os.path.isabs(member_path) or member_path.startswith(('/', '\\'))
+            or os.path.splitdrive(member_path)[0] != '' or '..' in parts)
+
+def check_archive_members(path:str) -> None:
+    """Raises ValueError if a member of the tar or zip archive at path would be extracted outside the target directory.
+
+    That is the case for members with an absolute path or a path with ..
+    components, and for tar links to such paths."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            bad = [name for name in archive.namelist() if _escapes_target(name)]
+    else:
+        with tarfile.open(path) as archive:
+            bad = [member.name for member in archive.getmembers()
+                   if _escapes_target(member.name)
+                   or ((member.issym() or member.islnk()) and _escapes_target(member.linkname))]
+    if len(bad) > 0:
+        raise ValueError(f'Refusing to extract archive {path} with members outside the target directory: {bad}')
+
+def extract_archive(path:str, target_dir:str, members:Optional[List[str]]=None) -> None:
+    """Extracts the given members, or all of them, of the tar or zip archive at path into target_dir after check_archive_members."""
+    check_archive_members(path)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            archive.extractall(target_dir, members)
+    else:
+        with tarfile.open(path) as archive:
+            archive.extractall(target_dir, None if members is None else [
+                archive.getmember(name) for name in members])
+
+def prefetch(names:Optional[List[str]]=None, max_workers:int=4) -> Dict[str, str]:
+    """Downloads resources into the mirror in parallel and records their checksums in its SHA256SUMS file.
+
+    Parameters
+    ----------
+    names : list of strings, optional
+        Names of the resources to fetch, by default all registered resources.
+    max_workers : int, default 4
+        Number of concurrent downloads.
+
+    Returns
+    -------
+    result : dict
+        Local path of each resource."""
+    mirror = mirror_dir()
+    if mirror is None:
+        raise ValueError('Please set LALE_RESOURCE_MIRROR to the directory to prefetch into.')
+    if names is None:
+        names = registered_names()
+    def fetch_one(name):
+        path = _mirror_path(name)
+        if not os.path.exists(path):
+            default_path = _lookup(name)['default_path']
+            if default_path is not None and os.path.exists(default_path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.copyfile(default_path, path)
+            else:
+                _download(name, path)
+        _verify(name, path)
+        return path
+    result, errors = {}, {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_one, name): name for name in names}
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            try:
+                result[name] = future.result()
+            except Exception as e:
+                logger.error(f'failed to prefetch {name}: {e}')
+                errors[name] = e
+    checksums = _read_checksums(mirror)
+    for name, path in result.items():
+        if name not in checksums:
+            checksums[name] = _expected_sha256(name) or sha256_of_file(path)
+    with open(os.path.join(mirror, _checksums_file_name), 'w') as f:
+        for name in sorted(checksums):
+            f.write(f'{checksums[name]}  {name}\n')
+    if len(errors) > 0:
+        raise ValueError(f'Failed to prefetch {sorted(errors)}, see the log for details.')
+    return result
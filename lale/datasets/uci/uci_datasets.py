@@ -16,15 +16,18 @@ import numpy as np
 import os
 import pandas as pd
 import tempfile
-import urllib.request
-import zipfile
 import lale.datasets.data_schemas
+import lale.datasets.dataset_cache
+import lale.datasets.resources
 
 download_data_dir = os.path.join(os.path.dirname(__file__), 'download_data')
 download_data_url = 'http://archive.ics.uci.edu/ml/machine-learning-databases'
 
 def download(dataset_id, zip_name, contents_files):
     zip_url = f'{download_data_url}/{dataset_id}/{zip_name}'
+    resource_name = f'uci/{dataset_id}/{zip_name}'
+    if resource_name not in lale.datasets.resources.registered_names():
+        lale.datasets.resources.register(resource_name, zip_url)
     data_dir = os.path.join(download_data_dir, dataset_id)
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
@@ -34,15 +37,18 @@ def download(dataset_id, zip_name, contents_files):
             if not os.path.exists(full):
                 return False
         return True
+    def extract(zip_file_name):
+        missing = [base for full, base in zip(full_file_names, contents_files)
+                   if not os.path.exists(full)]
+        lale.datasets.resources.extract_archive(zip_file_name, data_dir, missing)
     if not all_downloaded():
-        with tempfile.NamedTemporaryFile(suffix='.zip') as tmp_zip_file:
-            urllib.request.urlretrieve(zip_url, tmp_zip_file.name)
-            with zipfile.ZipFile(tmp_zip_file.name) as myzip:
-                for i in range(len(contents_files)):
-                    full, base = full_file_names[i], contents_files[i]
-                    if not os.path.exists(full):
-                        myzip.extract(base, data_dir)
-    assert all_downloaded
+        if lale.datasets.resources.mirror_dir() is not None:
+            extract(lale.datasets.resources.resolve(resource_name))
+        else:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                extract(lale.datasets.resources.resolve(
+                    resource_name, target=os.path.join(tmp_dir, zip_name)))
+    assert all_downloaded()
     return full_file_names
 
 def tsv_to_Xy(file_name, target_col, schema_orig):
@@ -70,7 +76,18 @@ def tsv_to_Xy(file_name, target_col, schema_orig):
     data_y = lale.datasets.data_schemas.add_schema(data_y, schema_y)
     return data_X, data_y
 
-def fetch_drugscom():
+lale.datasets.resources.register(
+    'uci/00462/drugsCom_raw.zip', f'{download_data_url}/00462/drugsCom_raw.zip')
+
+_drugscom_cache_sources = {
+    'resources': ['uci/00462/drugsCom_raw.zip'], 'source_files': [__file__]}
+
+def fetch_drugscom(use_cache=True):
+    if use_cache:
+        cached = lale.datasets.dataset_cache.load(
+            'uci-drugscom', **_drugscom_cache_sources)
+        if cached is not None:
+            return tuple(cached)
     files = download('00462', 'drugsCom_raw.zip',
                      ['drugsComTest_raw.tsv', 'drugsComTrain_raw.tsv'])
     target_col = 'rating'
@@ -91,4 +108,7 @@ def fetch_drugscom():
                  'minimum': 0}]}}
     test_X, test_y = tsv_to_Xy(files[0], target_col, json_schema)
     train_X, train_y = tsv_to_Xy(files[1], target_col, json_schema)
+    if use_cache:
+        lale.datasets.dataset_cache.store(
+            'uci-drugscom', [train_X, train_y, test_X, test_y], **_drugscom_cache_sources)
     return train_X, train_y, test_X, test_y
@@ -1,7 +1,7 @@
 from lale.operators import PlannedOperator, Operator, BasePipeline, OperatorChoice, IndividualOp
 from lale.operators import make_choice, make_pipeline, get_pipeline_of_applicable_type
 from lale.lib.lale import NoOp
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from lale.sklearn_compat import clone_op
 import random
 
@@ -35,6 +35,13 @@ class Grammar(Operator):
     """
     def __init__(self):
         self._variables = {}
+        self._clear_expansions()
+
+    def _clear_expansions(self):
+        # memoized expansions per (non-terminal, number of derivations)
+        self._expansions: Dict[Tuple[str, int], Optional[Operator]] = {}
+        # hash-consing table, so that identical sub-operators are built only once
+        self._interned: Dict[Any, Operator] = {}
 
     def __getattr__(self, name):
         if name.startswith('_'):
@@ -48,6 +55,7 @@ class Grammar(Operator):
             self.__dict__[name] = value
         else:
             self._variables[name] = value
+            self._clear_expansions()
             
     def _lale_clone(self):
         pass
@@ -67,8 +75,44 @@ class Grammar(Operator):
     def input_schema_fit(self):
         raise NotImplementedError() #TODO
 
+    def _intern(self, op: Operator) -> Operator:
+        """ Return the already built operator with the same structure as `op`, or `op` itself if there is none.
+        """
+        if isinstance(op, BasePipeline):
+            steps = op.steps()
+            index = {id(s): i for i, s in enumerate(steps)}
+            key: Any = ('pipeline', tuple(id(s) for s in steps),
+                        tuple((index[id(s)], index[id(d)]) for s, d in op.edges()))
+        elif isinstance(op, OperatorChoice):
+            key = ('choice', tuple(id(s) for s in op.steps()))
+        else:
+            return op
+        return self._interned.setdefault(key, op)
+
+    def _make_pipeline(self, op: BasePipeline, new_steps: List[Operator], origins: Dict[int, int] = None) -> Operator:
+        """ Build a pipeline with the structure of `op` from `new_steps`.
+
+        The new steps may share sub-operators, but a pipeline must not contain
+        the same instance twice, so the clashing steps are copied first.
+        When `origins` is given, it maps the ids of these copies to the ids of their originals.
+        """
+        seen: set = set()
+        distinct_steps = []
+        for step in new_steps:
+            if any(id(s) in seen for s in _flat_steps(step)):
+                step = _shallow_copy(step, origins)
+            seen.update(id(s) for s in _flat_steps(step))
+            distinct_steps.append(step)
+        step_map = {id(old): new for old, new in zip(op.steps(), distinct_steps)}
+        new_edges = [(step_map[id(s)], step_map[id(d)]) for s, d in op.edges()]
+        return get_pipeline_of_applicable_type(distinct_steps, new_edges, True)
+
     def _unfold(self, op: Operator, n: int) -> Optional[Operator]:
         """ Unroll all possible operators from the grammar `g` starting from    non-terminal `op` after `n` derivations.
+
+        The expansion of each non-terminal is memoized per number of derivations,
+        and identical sub-operators are shared, so the result is a DAG
+        whose size is polynomial in `n`.
         
         Parameters
         ----------
@@ -82,18 +126,20 @@ class Grammar(Operator):
         Optional[Operator]
         """
         if isinstance(op, BasePipeline):
-            steps = op.steps()
             new_steps = [self._unfold(sop, n) for sop in op.steps()]
-            step_map = {steps[i]: new_steps[i] for i in range(len(steps))}
-            new_edges = [(step_map[s], step_map[d]) for s, d in op.edges()]
             if not None in new_steps:
-                return get_pipeline_of_applicable_type(new_steps, new_edges, True)
+                return self._intern(self._make_pipeline(op, new_steps))
             return None
         if isinstance(op, OperatorChoice):
             steps = [s for s in (self._unfold(sop, n) for sop in op.steps()) if s]
-            return make_choice(*steps) if steps else None
+            return self._intern(make_choice(*steps)) if steps else None
         if isinstance(op, NonTerminal):
-            return self._unfold(self._variables[op.name()], n-1) if n > 0 else None
+            if n <= 0:
+                return None
+            key = (op.name(), n)
+            if key not in self._expansions:
+                self._expansions[key] = self._unfold(self._variables[op.name()], n-1)
+            return self._expansions[key]
         if isinstance(op, IndividualOp):
             return op
         assert False, f"Unknown operator {op}"
@@ -117,50 +163,90 @@ class Grammar(Operator):
         op = self._unfold(self.start, n)
         return make_pipeline(op) if op else NoOp
     
-    def _sample(self, op: Operator, n: int) -> Optional[Operator]:
+    def _sample(self, op: Operator, origins: Dict[int, int]) -> Tuple[Operator, Any]:
         """
-        Sample the grammar `g` starting from `g.start`, that is, choose one element at random for each possible choices.
+        Sample the unfolded operator `op`, that is, choose one element at random for each possible choices.
         
         Parameters
         ----------
         op : Operator
-            starting rule (e.g., `g.start`)
-        n : int
-            number of derivations
-        
+            unfolded operator without non-terminals (e.g., `g._unfold(g.start, n)`)
+        origins : Dict[int, int]
+            receives the ids of the original operators of the copies in the result
+
         Returns
         -------
-        Optional[Operator]
+        Tuple[Operator, Any]
+            the sampled operator, and a key that is equal for pipelines of the same operators
         """
         if isinstance(op, BasePipeline):
-            steps = op.steps()
-            new_steps = [self._sample(sop, n) for sop in op.steps()]
-            step_map = {steps[i]: new_steps[i] for i in range(len(steps))}
-            new_edges = [(step_map[s], step_map[d]) for s, d in op.edges()]
-            if not None in new_steps:
-                return get_pipeline_of_applicable_type(new_steps, new_edges, True)
-            return None
+            new_steps = [self._sample(sop, origins)[0] for sop in op.steps()]
+            result = self._make_pipeline(op, new_steps, origins)
+            steps = _flat_steps(result)
+            index = {id(s): i for i, s in enumerate(steps)}
+            key = (tuple(origins.get(id(s), id(s)) for s in steps),
+                   tuple((index[id(s)], index[id(d)]) for s, d in result.edges()))
+            return result, key
         if isinstance(op, OperatorChoice):
-            return self._sample(random.choice(op.steps()), n)
-        if isinstance(op, NonTerminal):
-            return self._sample(getattr(self, op.name()), n-1) if n > 0 else None
+            return self._sample(random.choice(op.steps()), origins)
         if isinstance(op, IndividualOp):
-            return op
+            return op, id(op)
         assert False, f"Unknown operator {op}"
             
-    def sample(self, n: int) -> PlannedOperator:
+    def sample(self, n: int, k: Optional[int] = None):
         """
         Sample the grammar `g` starting from `g.start`, that is, choose one element at random for each possible choices.
+
+        Only choices that can be derived in `n` steps are considered.
+        When `k` is given, up to `k` distinct pipelines are drawn at once,
+        for instance to evaluate them in parallel.
           
         Parameters
         ----------
         n : int
             number of derivations
-        
+        k : Optional[int]
+            number of pipelines, or None for a single one
+
         Returns
         -------
-        PlannedOperator
+        PlannedOperator, or a list of at most `k` distinct PlannedOperator if `k` is given
         """
         assert hasattr(self, 'start'), "Rule start must be defined"
-        op = self._sample(self.start, n)
-        return make_pipeline(op) if op else NoOp
+        op = self._unfold(self.start, n)
+        if k is None:
+            return make_pipeline(self._sample(op, {})[0]) if op else NoOp
+        result: List[PlannedOperator] = []
+        if op is None:
+            return result
+        origins: Dict[int, int] = {}
+        found = set()
+        # give up on the remaining ones when the grammar has fewer than k distinct pipelines
+        for _ in range(10 * k):
+            if len(result) >= k:
+                break
+            sampled, key = self._sample(op, origins)
+            if key not in found:
+                found.add(key)
+                result.append(make_pipeline(sampled))
+        return result
+
+def _flat_steps(op: Operator) -> List[Operator]:
+    return op.steps() if isinstance(op, BasePipeline) else [op]
+
+def _shallow_copy(op: Operator, origins: Dict[int, int] = None) -> Operator:
+    """ Copy the outermost structure of `op`, only sharing sub-operators that are nested in choices.
+    """
+    if isinstance(op, BasePipeline):
+        steps = op.steps()
+        new_steps = [_shallow_copy(s, origins) for s in steps]
+        step_map = {id(old): new for old, new in zip(steps, new_steps)}
+        new_edges = [(step_map[id(s)], step_map[id(d)]) for s, d in op.edges()]
+        return get_pipeline_of_applicable_type(new_steps, new_edges, True)
+    if isinstance(op, OperatorChoice):
+        result: Operator = OperatorChoice(op.steps(), op.name())
+    else:
+        result = clone_op(op)
+    if origins is not None:
+        origins[id(result)] = origins.get(id(op), id(op))
+    return result
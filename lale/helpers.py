@@ -22,6 +22,8 @@ import time
 import traceback
 import scipy.sparse
 import importlib
+import queue
+import threading
 from sklearn.model_selection import StratifiedKFold
 from sklearn.metrics import accuracy_score, log_loss
 from sklearn.metrics.scorer import check_scoring
@@ -509,7 +511,7 @@ def append_batch(data, batch_data):
             
     #TODO:Handle dataframes
 
-def create_data_loader(X, y = None, batch_size = 1):
+def create_data_loader(X, y = None, batch_size = 1, num_workers = 0, shuffle = False):
     from lale.util.numpy_to_torch_dataset import NumpyTorchDataset
     from lale.util.hdf5_to_torch_dataset import HDF5TorchDataset
     from torch.utils.data import DataLoader, TensorDataset
@@ -519,12 +521,21 @@ def create_data_loader(X, y = None, batch_size = 1):
         X = X.to_numpy()
         if isinstance(y, pd.Series):
             y = y.to_numpy()
-    elif isinstance(X, scipy.sparse.csr.csr_matrix):
-        #unfortunately, NumpyTorchDataset won't accept a subclass of np.ndarray
-        X = X.toarray()
-        if isinstance(y, lale.datasets.data_schemas.NDArrayWithSchema):
-            y = y.view(np.ndarray)
         dataset = NumpyTorchDataset(X, y)
+    elif scipy.sparse.issparse(X):
+        #slice the rows in sparse format and only densify one batch at a time
+        from lale.util.sparse_to_torch_dataset import SparseTorchDataset
+        from torch.utils.data import BatchSampler, RandomSampler, SequentialSampler
+        if isinstance(y, pd.Series):
+            y = y.to_numpy()
+        elif isinstance(y, lale.datasets.data_schemas.NDArrayWithSchema):
+            y = y.view(np.ndarray)
+        dataset = SparseTorchDataset(X, y)
+        row_sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+        batch_sampler = BatchSampler(row_sampler, batch_size=batch_size, drop_last=False)
+        #batch_size=None disables automatic batching, so the dataset gets
+        #indexed with the list of row indices of an entire batch
+        return DataLoader(dataset, batch_size=None, sampler=batch_sampler, num_workers=num_workers)
     elif isinstance(X, np.ndarray):
         #unfortunately, NumpyTorchDataset won't accept a subclass of np.ndarray
         if isinstance(X, lale.datasets.data_schemas.NDArrayWithSchema):
@@ -549,7 +560,75 @@ def create_data_loader(X, y = None, batch_size = 1):
         dataset = TensorDataset(X)
     else:
         raise TypeError("Can not create a data loader for a dataset with type {}".format(type(X)))
-    return DataLoader(dataset, batch_size=batch_size)
+    return DataLoader(dataset, batch_size=batch_size, num_workers=num_workers, shuffle=shuffle)
+
+def get_batch_size(data_loader):
+    """Batch size of a data loader created with create_data_loader."""
+    if data_loader.batch_size is None:
+        #sparse data loaders do their batching in the sampler
+        return data_loader.sampler.batch_size
+    return data_loader.batch_size
+
+def prefetch_batches(batches, num_prefetch = 1):
+    """Iterate over batches while a background thread reads ahead.
+
+    Loading batch i+1 (for instance, reading it from an hdf5 file or
+    collating it in a data loader) then overlaps with the computation
+    the caller does on batch i.
+
+    Parameters
+    ----------
+    batches : iterable
+        Usually a data loader created with create_data_loader.
+    num_prefetch : int, default 1
+        Maximum number of batches to read ahead. When it is less than 1,
+        the batches are read synchronously in the calling thread.
+
+    Returns
+    -------
+    result : generator
+        Yields the same batches in the same order as iterating over batches.
+        Exceptions raised while loading are re-raised in the caller.
+    """
+    if num_prefetch < 1:
+        yield from batches
+        return
+    buffer:queue.Queue = queue.Queue(maxsize=num_prefetch)
+    stopped = threading.Event()
+    end_marker = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put((batch, None)):
+                    return
+            put((end_marker, None))
+        except BaseException as e:
+            put((end_marker, e))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch, error = buffer.get()
+            if batch is end_marker:
+                if error is not None:
+                    raise error
+                return
+            yield batch
+    finally:
+        #also reached when the caller stops iterating early
+        stopped.set()
+        producer.join()
 
 def write_batch_output_to_file(file_obj, file_path, total_len, batch_idx, batch_X, batch_y, batch_out_X, batch_out_y):
     if file_obj is None and file_path is None:
@@ -24,6 +24,7 @@ Estimators:
 * lale.lib.lale. `BaselineRegressor`_
 * lale.lib.lale. `GridSearchCV`_
 * lale.lib.lale. `Hyperopt`_
+* lale.lib.lale. `RandomSearch`_
 * lale.lib.lale. `TopKVotingClassifier`_
 * lale.lib.lale. `SMAC`_
 
@@ -45,6 +46,7 @@ Estimators and transformers:
 .. _`BaselineRegressor`: lale.lib.lale.baseline_regressor.html
 .. _`GridSearchCV`: lale.lib.lale.grid_search_cv.html
 .. _`Hyperopt`: lale.lib.lale.hyperopt.html
+.. _`RandomSearch`: lale.lib.lale.random_search.html
 .. _`TopKVotingClassifier`: lale.lib.lale.topk_voting_classifier.html
 .. _`SMAC`: lale.lib.lale.smac.html
 .. _`Batching`: lale.lib.lale.batching.html
@@ -62,6 +64,7 @@ from .baseline_classifier import BaselineClassifier
 from .baseline_regressor import BaselineRegressor
 from .grid_search_cv import GridSearchCV
 from .hyperopt import Hyperopt
+from .random_search import RandomSearch
 from .topk_voting_classifier import TopKVotingClassifier
 
 import warnings
@@ -16,32 +16,53 @@ import lale.docstrings
 import lale.helpers
 import lale.operators
 import numpy as np
+import pandas as pd
 
 class BatchingImpl():
-  def __init__(self, operator = None, batch_size = 32, shuffle = True, num_workers = 0, inmemory=False, num_epochs=None):    
+  def __init__(self, operator = None, batch_size = 32, shuffle = False, num_workers = 0, inmemory=False, num_epochs=None, num_prefetch=1):    
     self.operator = operator
     self.batch_size = batch_size
     self.shuffle = shuffle
     self.num_workers = num_workers
     self.inmemory = inmemory
     self.num_epochs = num_epochs
+    self.num_prefetch = num_prefetch
+    self._timings = []
 
   def fit(self, X, y = None):
     if self.operator is None:
       raise ValueError("The pipeline object can't be None at the time of fit.")
-    data_loader = lale.helpers.create_data_loader(X = X, y = y, batch_size = self.batch_size)
+    data_loader = lale.helpers.create_data_loader(X = X, y = y, batch_size = self.batch_size,
+      num_workers = self.num_workers, shuffle = self.shuffle)
     classes = np.unique(y)
-    self.operator = self.operator.fit_with_batches(data_loader, y = classes, serialize = self.inmemory, num_epochs_batching=self.num_epochs)
+    self._timings = []
+    self.operator = self.operator.fit_with_batches(data_loader, y = classes, serialize = self.inmemory, num_epochs_batching=self.num_epochs,
+      num_prefetch = self.num_prefetch, timings = self._timings)
     return self
 
   def transform(self, X, y = None):
-    data_loader = lale.helpers.create_data_loader(X = X, y = y, batch_size = self.batch_size)
-    transformed_data = self.operator.transform_with_batches(data_loader, serialize = self.inmemory)
+    #never shuffle here, since the order of the rows has to be preserved
+    data_loader = lale.helpers.create_data_loader(X = X, y = y, batch_size = self.batch_size,
+      num_workers = self.num_workers)
+    transformed_data = self.operator.transform_with_batches(data_loader, serialize = self.inmemory,
+      num_prefetch = self.num_prefetch)
     return transformed_data
 
   def predict(self, X, y = None):
     return self.transform(X, y)
 
+  def summary(self):
+    """Table of the time spent by each step of the last fit (name, stage, epoch, n_rows, load_time, compute_time, rows_per_second).
+
+A load_time that is large compared to the compute_time means that
+training is bound by reading the batches rather than by computing.
+
+Returns
+-------
+result : DataFrame"""
+    columns = ['name', 'stage', 'epoch', 'n_rows', 'load_time', 'compute_time', 'rows_per_second']
+    return pd.DataFrame.from_records(self._timings, columns=columns)
+
 _input_fit_schema = {
   '$schema': 'http://json-schema.org/draft-04/schema#',
   'description': 'Input data schema for fit.',
@@ -125,7 +146,8 @@ _hyperparams_schema = {
         'num_workers':{
           'type':'integer',
           'default':0,
-          'description': 'Number of workers for pytorch dataloader.'
+          'minimum':0,
+          'description': 'Number of workers for pytorch dataloader, 0 loads the batches in the main process.'
           },
         'inmemory':{
           'type':'boolean',
@@ -138,6 +160,12 @@ _hyperparams_schema = {
             {'enum':[None]}],
           'default':None,
           'description': 'Number of epochs. If the operator has `num_epochs` as a parameter, that takes precedence.'
+          },
+        'num_prefetch':{
+          'type':'integer',
+          'default':1,
+          'minimum':0,
+          'description': 'Number of batches loaded ahead in a background thread while the current batch is processed, 0 disables prefetching.'
           }
           }}]}
 
@@ -145,7 +173,8 @@ _combined_schemas = {
   '$schema': 'http://json-schema.org/draft-04/schema#',
   'description': """Batching trains the given pipeline using batches.
 The batch_size is used across all steps of the pipeline, serializing
-the intermediate outputs if specified.""",
+the intermediate outputs if specified. The time spent loading
+versus computing on batches during fit is available from summary().""",
   'type': 'object',
   'tags': {
     'pre': [],
@@ -15,7 +15,6 @@
 import lale.docstrings
 import lale.operators
 import lale.type_checking
-import functools
 import numpy as np
 import pandas as pd
 import scipy.sparse
@@ -26,34 +25,108 @@ try:
 except ImportError:
     torch_installed=False
 
+def _is_pandas(d):
+    return isinstance(d, pd.DataFrame) or isinstance(d, pd.Series)
+
+def _pandas_columns(d):
+    """Names and underlying arrays (not copies) of the columns of a DataFrame or Series."""
+    if isinstance(d, pd.Series):
+        return [d.name], [d.array]
+    return list(d.columns), [d.iloc[:, i].array for i in range(d.shape[1])]
+
+def _numpy_dtype(dtype):
+    #categorical and other extension columns turn into objects, like with .values
+    return dtype if isinstance(dtype, np.dtype) else np.dtype(object)
+
 class ConcatFeaturesImpl():
-    def __init__(self):
-        pass
+    def __init__(self, sparse_threshold=0.3, dtype=None):
+        self.sparse_threshold = sparse_threshold
+        self.dtype = dtype
 
     def transform(self, X):
-        def is_pandas(d):
-            return isinstance(d, pd.DataFrame) or isinstance(d, pd.Series)
-        if functools.reduce(lambda accum, d: accum and is_pandas(d), X, True):
-            result = pd.concat(X, axis=1)
-            return result
-
-        np_datasets = []
-        #Preprocess the datasets to convert them to 2-d numpy arrays
+        if len(X) == 0:
+            raise ValueError('ConcatFeatures needs at least one dataset.')
+        if all(_is_pandas(d) for d in X):
+            return self._concat_pandas(X)
+
+        datasets = []
         for dataset in X:
-            if is_pandas(dataset):
-                np_dataset = dataset.values
-            elif isinstance(dataset, scipy.sparse.csr_matrix):
-                np_dataset = dataset.toarray()
+            if isinstance(dataset, pd.Series):
+                dataset = dataset.to_frame()
+            elif isinstance(dataset, pd.DataFrame) or scipy.sparse.issparse(dataset):
+                pass #written column by column or densified below only if needed
             elif torch_installed and isinstance(dataset, torch.Tensor):
-                np_dataset = dataset.detach().cpu().numpy()
+                dataset = dataset.detach().cpu().numpy()
+            elif not isinstance(dataset, np.ndarray):
+                dataset = np.asarray(dataset)
+            if len(dataset.shape) == 1: #To handle numpy column vectors
+                dataset = dataset.reshape(dataset.shape[0], 1)
+            datasets.append(dataset)
+        n_rows = datasets[0].shape[0]
+        for dataset in datasets:
+            if dataset.shape[0] != n_rows:
+                raise ValueError(f'ConcatFeatures cannot concatenate datasets with {n_rows} and {dataset.shape[0]} rows.')
+
+        if any(scipy.sparse.issparse(d) for d in datasets):
+            #like sklearn's ColumnTransformer, dense arms count as fully dense
+            n_nonzero = sum(d.nnz if scipy.sparse.issparse(d) else np.size(d)
+                            for d in datasets)
+            n_total = sum(np.prod(np.shape(d)) for d in datasets)
+            density = n_nonzero / n_total if n_total > 0 else 1.0
+            if density < self.sparse_threshold:
+                datasets = [d.to_numpy() if _is_pandas(d) else d for d in datasets]
+                result = scipy.sparse.hstack(datasets, format='csr', dtype=self.dtype)
+                return result
+        return self._concat_dense(datasets, n_rows)
+
+    def _result_dtype(self, datasets):
+        if self.dtype is not None:
+            return np.dtype(self.dtype)
+        dtypes = []
+        for d in datasets:
+            if isinstance(d, pd.DataFrame):
+                dtypes += [_numpy_dtype(t) for t in d.dtypes]
+            else:
+                dtypes.append(_numpy_dtype(d.dtype))
+        return np.result_type(*dtypes)
+
+    def _concat_dense(self, datasets, n_rows):
+        #write each dataset into its slice of a preallocated result, instead
+        #of converting it to a temporary array first like np.concatenate
+        n_cols = sum(d.shape[1] for d in datasets)
+        result = np.empty((n_rows, n_cols), dtype=self._result_dtype(datasets))
+        start = 0
+        for d in datasets:
+            stop = start + d.shape[1]
+            if isinstance(d, pd.DataFrame):
+                for i in range(d.shape[1]):
+                    result[:, start + i] = d.iloc[:, i].to_numpy()
+            elif scipy.sparse.issparse(d):
+                coo = d.tocoo()
+                coo.sum_duplicates()
+                result[:, start:stop] = 0
+                result[coo.row, start + coo.col] = coo.data
             else:
-                np_dataset = dataset
-            if hasattr(np_dataset, 'shape'):
-                if len(np_dataset.shape) == 1: #To handle numpy column vectors
-                    np_dataset = np.reshape(np_dataset, (np_dataset.shape[0], 1))
-            np_datasets.append(np_dataset)
-            
-        result = np.concatenate(np_datasets, axis=1)
+                result[:, start:stop] = d
+            start = stop
+        return result
+
+    def _concat_pandas(self, datasets):
+        #positional, like the numpy case, and unlike pd.concat, which aligns
+        #on the index and produces missing values if the indexes differ
+        n_rows = len(datasets[0])
+        names, columns = [], []
+        for d in datasets:
+            if len(d) != n_rows:
+                raise ValueError(f'ConcatFeatures cannot concatenate datasets with {n_rows} and {len(d)} rows.')
+            d_names, d_columns = _pandas_columns(d)
+            names += d_names
+            columns += d_columns
+        if self.dtype is not None:
+            columns = [c.astype(self.dtype) for c in columns]
+        #build from positions, since the column names may not be unique
+        result = pd.DataFrame(dict(enumerate(columns)), index=datasets[0].index, copy=False)
+        result.columns = names
         return result
 
     def transform_schema(self, s_X):
@@ -110,7 +183,23 @@ _hyperparams_schema = {
         'type': 'object',
         'additionalProperties': False,
         'relevantToOptimizer': [],
-        'properties': {}}]}
+        'properties': {
+          'sparse_threshold': {
+            'description': 'If any input dataset is sparse and the overall '
+            'density of the output is lower than this value, the output is a '
+            'scipy.sparse.csr_matrix stacked without densifying. Otherwise, '
+            'sparse inputs are converted to dense. Use 0 to always '
+            'return a dense result.',
+            'type': 'number',
+            'minimum': 0.0,
+            'maximum': 1.0,
+            'default': 0.3},
+          'dtype': {
+            'description': 'Type of the output. Use None for the common type '
+            'of all input columns as computed by numpy.result_type, or for '
+            'instance float32 to halve the memory of a numeric result.',
+            'laleType': 'Any',
+            'default': None}}}]}
 
 _input_transform_schema = {
     'type': 'object',
@@ -128,9 +217,9 @@ _input_transform_schema = {
                     'anyOf': [{
                         'type': 'array',
                         'items': {
-                            'type': 'number'},
+                            'laleType': 'Any'},
                     }, {
-                        'type': 'number'}]}}}}}
+                        'type': ['number', 'string', 'boolean']}]}}}}}
 
 _output_transform_schema = {
     'description': 'Features; the outer array is over samples.',
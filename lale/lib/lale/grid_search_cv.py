@@ -14,6 +14,13 @@
 
 from typing import Any, Dict
 
+import tempfile
+
+import numpy as np
+import pandas as pd
+import sklearn.base
+import sklearn.model_selection
+
 import lale.lib.sklearn
 import lale.search.lale_grid_search_cv
 import lale.operators
@@ -40,6 +47,8 @@ class GridSearchCVImpl:
             'pgo': pgo,
             'hp_grid': param_grid,
             'observer': observer }
+        self._candidates = []
+        self._candidate_pipelines = {}
 
     def fit(self, X, y):
         if self._hyperparams['estimator'] is None:
@@ -51,41 +60,65 @@ class GridSearchCVImpl:
         obs = self._hyperparams['observer']
         if obs is not None:
             observed_op = Observing(op=op, observer=obs)
+        parallel = lale.search.lale_grid_search_cv._is_parallel(self._hyperparams['n_jobs'])
+        # in worker processes, the observer would be pickled with every
+        # candidate and its callbacks would be lost, so parallel searches
+        # only observe the optimization and the final fit
+        observe_candidates = obs is not None and not parallel
+        searched_op = observed_op if observe_candidates else op
 
         hp_grid = self._hyperparams['hp_grid']
         if hp_grid is None:
             hp_grid = lale.search.lale_grid_search_cv.get_parameter_grids(
-                observed_op,
+                searched_op,
                 num_samples=self._hyperparams['lale_num_samples'],
                 num_grids=self._hyperparams['lale_num_grids'],
                 pgo=self._hyperparams['pgo'])
         if not hp_grid and isinstance(op, lale.operators.IndividualOp):
             hp_grid = [
-                lale.search.lale_grid_search_cv.get_defaults_as_param_grid(observed_op)]
+                lale.search.lale_grid_search_cv.get_defaults_as_param_grid(searched_op)]
+        self._candidates = []
+        self._candidate_pipelines = {}
         if hp_grid:
             if obs is not None:
                 observed_op._impl.startObserving("optimize", hp_grid=hp_grid, op=op,
                     num_samples=self._hyperparams['lale_num_samples'],
                     num_grids=self._hyperparams['lale_num_grids'],
                     pgo=self._hyperparams['pgo'])
+            self._searched_op = lale.sklearn_compat.make_sklearn_compat(searched_op)
             try:
-                self.grid = lale.search.lale_grid_search_cv.get_lale_gridsearchcv_op(
-                    lale.sklearn_compat.make_sklearn_compat(observed_op),
-                    hp_grid,
-                    cv=self._hyperparams['cv'],
-                    scoring=self._hyperparams['scoring'],
-                    n_jobs=self._hyperparams['n_jobs'])
-                self.grid.fit(X, y)
-                be = self.grid.best_estimator_.to_lale()
+                with tempfile.TemporaryDirectory() as folder:
+                    # split once, so that candidates do not redo it and all see the same folds
+                    folds = list(sklearn.model_selection.check_cv(
+                        self._hyperparams['cv'], y,
+                        classifier=sklearn.base.is_classifier(self._searched_op)).split(X, y))
+                    X_search, y_search = X, y
+                    if parallel:
+                        X_search = lale.search.lale_grid_search_cv.share_data_with_workers(X, folder)
+                        y_search = lale.search.lale_grid_search_cv.share_data_with_workers(y, folder)
+                    self.grid = lale.search.lale_grid_search_cv.get_lale_gridsearchcv_op(
+                        self._searched_op,
+                        hp_grid,
+                        cv=folds,
+                        scoring=self._hyperparams['scoring'],
+                        n_jobs=self._hyperparams['n_jobs'],
+                        refit=searched_op is observed_op)
+                    self.grid.fit(X_search, y_search)
+                self._candidates = self._candidates_from_results(self.grid.cv_results_)
+                if searched_op is observed_op:
+                    be = self.grid.best_estimator_.to_lale()
+                    if obs is not None:
+                        assert isinstance(be._impl, ObservingImpl)
+                else:
+                    best = self.get_pipeline(f'p{self.grid.best_index_}')
+                    #Observing returns the trained operator that it wraps
+                    be = Observing(op=best, observer=obs).fit(X, y)
             except BaseException as e:
                 if obs is not None:
-                    assert isinstance(be._impl, ObservingImpl)
                     observed_op._impl.failObserving("optimize", e)
                 raise
 
             if obs is not None:
-                assert isinstance(be._impl, ObservingImpl)
-                be_base = be._impl.getOp()
                 observed_op._impl.endObserving("optimize", best=be)
             self._best_estimator = be
         else:
@@ -93,13 +126,64 @@ class GridSearchCVImpl:
             self._best_estimator = op
         return self
 
+    def _candidates_from_results(self, cv_results):
+        scores = cv_results['mean_test_score']
+        times = cv_results['mean_fit_time']
+        return [{'params': params,
+                 'loss': -scores[i],
+                 'time': times[i],
+                 'status': 'fail' if np.isnan(scores[i]) else 'ok'}
+                for i, params in enumerate(cv_results['params'])]
+
     def predict(self, X):
         return self._best_estimator.predict(X)
 
+    def summary(self):
+        """Table summarizing the results of the candidates (ID, loss, time, log_loss, status).
+
+Returns
+-------
+result : DataFrame"""
+        records = [{
+            'name': f'p{tid}',
+            'tid': tid,
+            'loss': candidate['loss'],
+            'time': candidate['time'],
+            'log_loss': float('nan'),
+            'status': candidate['status']} for tid, candidate in enumerate(self._candidates)]
+        return pd.DataFrame.from_records(
+            records, index='name',
+            columns=['name', 'tid', 'loss', 'time', 'log_loss', 'status'])
+
     def get_pipeline(self, pipeline_name=None, astype='lale'):
-        if pipeline_name is not None:
-            raise NotImplementedError('Cannot get pipeline by name yet.')
-        result = getattr(self, '_best_estimator', None)
+        """Retrieve one of the candidates.
+
+Parameters
+----------
+pipeline_name : union type, default None
+
+    - string
+        Key for table returned by summary(), return a trainable pipeline.
+
+    - None
+        When not specified, return the best trained pipeline found.
+
+astype : 'lale' or 'sklearn', default 'lale'
+    Type of resulting pipeline.
+
+Returns
+-------
+result : Trained operator if best, trainable operator otherwise.
+"""
+        if pipeline_name is None:
+            result = getattr(self, '_best_estimator', None)
+        else:
+            if pipeline_name not in self._candidate_pipelines:
+                tid = int(pipeline_name[1:])
+                params = self._candidates[tid]['params']
+                wrapped_op = sklearn.base.clone(self._searched_op)
+                self._candidate_pipelines[pipeline_name] = wrapped_op.set_params(**params).to_lale()
+            result = self._candidate_pipelines[pipeline_name]
         if result is None or astype == 'lale':
             return result
         assert astype == 'sklearn', astype
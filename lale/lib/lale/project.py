@@ -16,76 +16,158 @@ import lale.datasets.data_schemas
 import lale.docstrings
 import lale.operators
 import lale.type_checking
-import sklearn.compose
+import numpy as np
 import pandas as pd
 
+def _column_positions(columns, n_columns, names, get_s_cols):
+    """Positions of the columns to keep, given the number and names (or None) of the input columns.
+
+    The column schemas are only computed, by calling get_s_cols, if
+    columns is a schema."""
+    if lale.type_checking.is_schema(columns):
+        s_cols = get_s_cols()
+        if isinstance(s_cols, dict):
+            if lale.type_checking.is_subschema(s_cols, columns):
+                return [*range(n_columns)]
+            return []
+        assert isinstance(s_cols, list)
+        return [i for i in range(n_columns)
+                if lale.type_checking.is_subschema(s_cols[i], columns)]
+    if not isinstance(columns, list):
+        columns = [columns]
+    if len(columns) > 0 and all(isinstance(c, bool) for c in columns):
+        if len(columns) != n_columns:
+            raise ValueError(f'boolean mask of length {len(columns)} for {n_columns} columns')
+        return [int(i) for i in np.flatnonzero(columns)]
+    result = []
+    for c in columns:
+        if isinstance(c, str):
+            if names is None or c not in names:
+                raise ValueError(f'column {c} not found, available columns: {names}')
+            result.append(names.index(c))
+        else:
+            if not -n_columns <= c < n_columns:
+                raise ValueError(f'column {c} out of range for {n_columns} columns')
+            result.append(c % n_columns)
+    return result
+
+def _column_names(s_X):
+    s_cols = s_X['items']['items']
+    if isinstance(s_cols, list):
+        return [s_col.get('description', None) for s_col in s_cols]
+    return None
+
+def _take_columns(X, positions):
+    #a contiguous range of columns is selected as a view, without copying
+    if len(positions) > 0 and positions == [*range(positions[0], positions[-1] + 1)]:
+        cols = slice(positions[0], positions[-1] + 1)
+    else:
+        cols = positions
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, cols]
+    return X[:, cols]
+
+def projected_columns(op, s_X):
+    """Names of the columns of data with schema s_X that op reads, or None if it may read all of them.
+
+    If every step of op that receives the input data is a Project,
+    the result is the union of the columns they keep, in the order of
+    s_X. Data readers use this to load only the columns a pipeline
+    uses, for instance:
+
+    >>> reader = ArrowBatchReader(path, target='class').project(pipeline)"""
+    names = _column_names(s_X)
+    if names is None or None in names:
+        return None
+    def positions(op):
+        if isinstance(op, lale.operators.BasePipeline):
+            sources = op._find_source_nodes()
+        elif isinstance(op, lale.operators.OperatorChoice):
+            sources = op.steps()
+        elif isinstance(op, lale.operators.IndividualOp) and op._impl_class() is ProjectImpl:
+            hyperparams = op._hyperparams
+            if hyperparams is None or 'columns' not in hyperparams:
+                return None
+            s_cols = s_X['items']['items']
+            return set(_column_positions(hyperparams['columns'], len(names), names, lambda: s_cols))
+        else:
+            return None
+        result = set()
+        for source in sources:
+            source_positions = positions(source)
+            if source_positions is None:
+                return None
+            result |= source_positions
+        return result
+    result = positions(op)
+    if result is None:
+        return None
+    return [names[i] for i in sorted(result)]
+
 class ProjectImpl:
     def __init__(self, columns=None):
         self._hyperparams = { 'columns': columns }
 
     def fit(self, X, y=None):
-        columns = self._hyperparams['columns']
-        if lale.type_checking.is_schema(columns):
-            s_all = lale.datasets.data_schemas.to_schema(X)
-            s_row = s_all['items']
-            n_columns = s_row['minItems']
-            assert n_columns == s_row['maxItems']
-            s_cols = s_row['items']
-            if isinstance(s_cols, dict):
-                if lale.type_checking.is_subschema(s_cols, columns):
-                    columns = [*range(n_columns)]
-                else:
-                    columns = []
-            else:
-                assert isinstance(s_cols, list)
-                columns = [
-                    i for i in range(n_columns)
-                    if lale.type_checking.is_subschema(s_cols[i], columns)]
-        self._col_tfm = sklearn.compose.ColumnTransformer(
-            transformers=[('keep', 'passthrough', columns)])
-        self._col_tfm.fit(X)
+        if not hasattr(X, 'shape'):
+            X = np.asarray(X)
+        def get_s_cols():
+            s_row = lale.datasets.data_schemas.to_schema(X)['items']
+            assert s_row['minItems'] == s_row['maxItems'] == X.shape[1]
+            return s_row['items']
+        names = [*X.columns] if isinstance(X, pd.DataFrame) else None
+        self._positions = _column_positions(
+            self._hyperparams['columns'], X.shape[1], names, get_s_cols)
+        self._names = None if names is None else [names[i] for i in self._positions]
         return self
 
     def transform(self, X):
-        columns = self._col_tfm.transformers[0][2]
-        if isinstance(X, pd.DataFrame) and isinstance(columns, list):
-            col_names = [
-                X.columns[c] if isinstance(c, int) else c for c in columns]
-            result = X[col_names]
-        else:
-            result = self._col_tfm.transform(X)
-        s_X = lale.datasets.data_schemas.to_schema(X)
+        if not hasattr(X, 'shape'):
+            X = np.asarray(X)
+        positions = self._positions
+        if isinstance(X, pd.DataFrame) and self._names is not None:
+            #for instance, pushed into a reader that already dropped columns
+            moved = max(positions, default=-1) >= X.shape[1] \
+                or [*X.columns[positions]] != self._names
+            if moved:
+                positions = [*X.columns.get_indexer(self._names)]
+                if -1 in positions:
+                    raise ValueError(f'columns {self._names} not found, available columns: {[*X.columns]}')
+        result = _take_columns(X, positions)
+        s_X = getattr(X, 'json_schema', None)
+        #recalc, since a view of an NDArrayWithSchema inherits the schema of all of X
+        if s_X is None:
+            #the schema of the result is cheaper to compute than that of all of X
+            return lale.datasets.data_schemas.add_schema(result, recalc=True)
         s_result = self.transform_schema(s_X)
-        return lale.datasets.data_schemas.add_schema(result, s_result)
+        return lale.datasets.data_schemas.add_schema(result, s_result, recalc=True)
 
     def transform_schema(self, s_X):
         """Used internally by Lale for type-checking downstream operators."""
-        if hasattr(self, '_col_tfm'):
-            return self._transform_schema_col_tfm(s_X, self._col_tfm)
+        if hasattr(self, '_positions'):
+            return self._transform_schema_positions(s_X)
         columns = self._hyperparams['columns']
         if lale.type_checking.is_schema(columns):
             return self._transform_schema_schema(s_X, columns)
         if not lale.type_checking.is_schema(s_X):
             X = lale.datasets.data_schemas.add_schema(s_X)
             self.fit(X)
-            return self._transform_schema_col_tfm(X.json_schema, self._col_tfm)
+            return self._transform_schema_positions(X.json_schema)
         return s_X
 
-    def _transform_schema_col_tfm(self, s_X, col_tfm):
+    def _transform_schema_positions(self, s_X):
         s_X = lale.datasets.data_schemas.to_schema(s_X)
         s_row = s_X['items']
         s_cols = s_row['items']
-        keep_cols = [col
-                     for name, tfm, cols in col_tfm.transformers_
-                     if tfm == 'passthrough'
-                     for col in cols]
-        n_columns = len(keep_cols)
+        n_columns = len(self._positions)
         if isinstance(s_cols, dict):
             s_cols_result = s_cols
         else:
-            name2i = {s_cols[i]['description']: i for i in range(len(s_cols))}
-            keep_cols_i = [name2i[col] if isinstance(col, str) else col
-                           for col in keep_cols]
+            if self._names is not None:
+                name2i = {s_cols[i]['description']: i for i in range(len(s_cols))}
+                keep_cols_i = [name2i[name] for name in self._names]
+            else:
+                keep_cols_i = self._positions
             s_cols_result = [s_cols[i] for i in keep_cols_i]
         s_result = {
             **s_X,
@@ -0,0 +1,311 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+import traceback
+import warnings
+from typing import Any, Dict
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection._split import check_cv
+
+from lale.helpers import cross_val_score_track_trials
+from lale.lib.sklearn import LogisticRegression
+from lale.search.lale_random_search import get_random_search_samples, lale_trainable_op_from_params
+import lale.docstrings
+import lale.operators
+
+logger = logging.getLogger(__name__)
+
+def _evaluate(trainable, X, y, cv, scoring, args_to_scorer, best_score, deadline):
+    if deadline is not None and time.time() > deadline:
+        return {'status': 'skipped'}
+    warnings.filterwarnings("ignore")
+    try:
+        score, logloss, execution_time = cross_val_score_track_trials(
+            trainable, X, y, cv=cv, scoring=scoring, args_to_scorer=args_to_scorer)
+        return {'status': 'ok', 'loss': best_score - score,
+                'time': execution_time, 'log_loss': logloss}
+    except BaseException as e:
+        logger.warning(f"Exception caught in RandomSearch:{type(e)}, {traceback.format_exc()}, setting status to fail")
+        return {'status': 'fail', 'error_msg': f"{type(e)}: {e}"}
+
+class RandomSearchImpl:
+    def __init__(self, estimator=None, max_evals=50, sampler='lhs', cv=5,
+                 scoring='accuracy', best_score=0.0, n_jobs=None,
+                 max_opt_time=None, random_state=None, pgo=None,
+                 args_to_scorer=None):
+        if estimator is None:
+            self.estimator = LogisticRegression()
+        else:
+            self.estimator = estimator
+        self.max_evals = max_evals
+        self.sampler = sampler
+        self.cv = cv
+        self.scoring = scoring
+        self.best_score = best_score
+        self.n_jobs = n_jobs
+        self.max_opt_time = max_opt_time
+        self.random_state = random_state
+        self.pgo = pgo
+        if args_to_scorer is not None:
+            self.args_to_scorer = args_to_scorer
+        else:
+            self.args_to_scorer = {}
+        self._trials = []
+
+    def fit(self, X_train, y_train):
+        opt_start_time = time.time()
+        cv = check_cv(self.cv, y=y_train, classifier=True)
+        deadline = None if self.max_opt_time is None else opt_start_time + self.max_opt_time
+        samples = get_random_search_samples(
+            self.estimator, self.max_evals, sampler=self.sampler,
+            random_state=self.random_state, pgo=self.pgo)
+        trainables = [lale_trainable_op_from_params(self.estimator, params)
+                      for params in samples]
+        results = joblib.Parallel(n_jobs=self.n_jobs)(
+            joblib.delayed(_evaluate)(
+                trainable, X_train, y_train, cv, self.scoring,
+                self.args_to_scorer, self.best_score, deadline)
+            for trainable in trainables)
+        self._trials = [{'params': params, **result}
+                        for params, result in zip(samples, results)]
+        ok_trials = [i for i, t in enumerate(self._trials) if t['status'] == 'ok']
+        if len(ok_trials) == 0:
+            self._best_estimator = None
+            raise ValueError('Error from RandomSearch, none of the trials succeeded.')
+        best = min(ok_trials, key=lambda i: self._trials[i]['loss'])
+        logger.info(f'best score: {self.best_score - self._trials[best]["loss"]:.1%}\n'
+                    f'best hyperparams found using {len(self._trials)} trials: {self._trials[best]["params"]}')
+        warnings.filterwarnings("ignore")
+        trainable = lale_trainable_op_from_params(self.estimator, self._trials[best]['params'])
+        self._best_estimator = trainable.fit(X_train, y_train)
+        return self
+
+    def predict(self, X_eval):
+        if getattr(self, '_best_estimator', None) is None:
+            raise ValueError("Can not predict as the best estimator is None. Either an attempt to call `predict` "
+        "before calling `fit` or all the trials during `fit` failed.")
+        return self._best_estimator.predict(X_eval)
+
+    def summary(self):
+        """Table summarizing the trial results (ID, loss, time, log_loss, status).
+
+Returns
+-------
+result : DataFrame"""
+        records = [{
+            'name': f'p{tid}',
+            'tid': tid,
+            'loss': trial.get('loss', float('nan')),
+            'time': trial.get('time', float('nan')),
+            'log_loss': trial.get('log_loss', float('nan')),
+            'status': trial['status']} for tid, trial in enumerate(self._trials)]
+        result = pd.DataFrame.from_records(records, index='name')
+        return result
+
+    def get_pipeline(self, pipeline_name=None, astype='lale'):
+        """Retrieve one of the trials.
+
+Parameters
+----------
+pipeline_name : union type, default None
+
+    - string
+        Key for table returned by summary(), return a trainable pipeline.
+
+    - None
+        When not specified, return the best trained pipeline found.
+
+astype : 'lale' or 'sklearn', default 'lale'
+    Type of resulting pipeline.
+
+Returns
+-------
+result : Trained operator if best, trainable operator otherwise.
+"""
+        if pipeline_name is None:
+            result = getattr(self, '_best_estimator', None)
+        else:
+            tid = int(pipeline_name[1:])
+            params = self._trials[tid]['params']
+            result = lale_trainable_op_from_params(self.estimator, params)
+        if result is None or astype == 'lale':
+            return result
+        assert astype == 'sklearn', astype
+        return result.export_to_sklearn_pipeline()
+
+_hyperparams_schema = {
+    'allOf': [
+    {   'type': 'object',
+        'required': [
+            'estimator', 'max_evals', 'sampler', 'cv', 'scoring',
+            'best_score', 'n_jobs', 'max_opt_time', 'random_state', 'pgo'],
+        'relevantToOptimizer': ['estimator', 'max_evals', 'cv'],
+        'additionalProperties': False,
+        'properties': {
+            'estimator': {
+                'description': 'Planned Lale individual operator or pipeline,\nby default LogisticRegression.',
+                'anyOf': [
+                {   'laleType': 'operator',
+                    'not': {'enum': [None]}},
+                {   'enum': [None]}],
+                'default': None},
+            'max_evals': {
+                'description': 'Number of trials, that is, of sampled hyperparameter settings.',
+                'type': 'integer',
+                'minimum': 1,
+                'default': 50},
+            'sampler': {
+                'description': """Sequence of points in the unit hypercube that is mapped to hyperparameter values.
+
+Samples are spread evenly over the combinations of choices (`|`) in
+the estimator, and within a combination all hyperparameters are
+drawn jointly from one sequence.""",
+                'anyOf': [
+                {   'description': 'Scrambled Sobol low-discrepancy sequence, requires scipy>=1.7.',
+                    'enum': ['sobol']},
+                {   'description': 'Latin hypercube: every dimension is split into max_evals strata with one point each.',
+                    'enum': ['lhs']},
+                {   'description': 'Independent uniform random points.',
+                    'enum': ['uniform']}],
+                'default': 'lhs'},
+            'cv': {
+                'description': """Cross-validation as integer or as object that has a split function.
+
+If integer: number of folds in sklearn.model_selection.StratifiedKFold.
+
+If object with split function: generator yielding (train, test) splits
+as arrays of indices. Can use any of the iterators from
+https://scikit-learn.org/stable/modules/cross_validation.html#cross-validation-iterators.""",
+                'anyOf':[
+                    {'type': 'integer'},
+                    {'laleType':'Any', 'forOptimizer':False}],
+                'minimum': 1,
+                'default': 5},
+            'scoring': {
+                'description': 'Scorer object, or known scorer named by string.',
+                'anyOf': [
+                {   'description': 'Custom scorer object, see https://scikit-learn.org/stable/modules/model_evaluation.html',
+                    'not': {'type': 'string'}},
+                {   'description': 'Known scorer for classification task.',
+                    'enum': [
+                        'accuracy', 'explained_variance', 'max_error',
+                        'roc_auc', 'roc_auc_ovr', 'roc_auc_ovo',
+                        'roc_auc_ovr_weighted', 'roc_auc_ovo_weighted',
+                        'balanced_accuracy', 'average_precision',
+                        'neg_log_loss', 'neg_brier_score']},
+                {   'description': 'Known scorer for regression task.',
+                    'enum': [
+                        'r2', 'neg_mean_squared_error',
+                        'neg_mean_absolute_error',
+                        'neg_root_mean_squared_error',
+                        'neg_mean_squared_log_error',
+                        'neg_median_absolute_error']}],
+                'default': 'accuracy'},
+            'best_score': {
+                'description': """The best score for the specified scorer.
+
+The loss of a trial is best_score - score, so that zero is the best loss.""",
+                'type': 'number',
+                'default': 0.0},
+            'n_jobs': {
+                'description': 'Number of trials to evaluate in parallel.',
+                'anyOf': [
+                {   'description': '1 unless in joblib.parallel_backend context.',
+                    'enum': [None]},
+                {   'description': 'Use all processors.',
+                    'enum': [-1]},
+                {   'description': 'Number of jobs to run in parallel.',
+                    'type': 'integer',
+                    'minimum': 1}],
+                'default': None},
+            'max_opt_time': {
+                'description': 'Maximum amout of time in seconds for the optimization, trials that would start later are skipped.',
+                'anyOf': [
+                {   'type': 'number',
+                    'minimum': 0.0},
+                {   'description': 'No runtime bound.',
+                    'enum': [None]}],
+                'default': None},
+            'random_state': {
+                'description': 'Seed of the sampler.',
+                'anyOf': [
+                {   'type': 'integer'},
+                {   'description': 'Draw a fresh seed.',
+                    'enum': [None]}],
+                'default': None},
+            'pgo': {
+                'anyOf': [
+                {   'description': 'lale.search.PGO'},
+                {   'enum': [None]}],
+                'default': None},
+            'args_to_scorer':{
+                'anyOf':[
+                    {'type':'object'},#Python dictionary
+                    {'enum':[None]}],
+                'description':"""A dictionary of additional keyword arguments to pass to the scorer.
+Used for cases where the scorer has a signature such as ``scorer(estimator, X, y, **kwargs)``.""",
+                'default':None}}}]}
+
+_input_fit_schema = {
+    'type': 'object',
+    'required': ['X', 'y'],
+    'properties': {
+        'X': {},
+        'y': {}}}
+_input_predict_schema = {
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {}}}
+
+_output_predict_schema:Dict[str, Any] = {}
+
+_combined_schemas = {
+    'description': """Random search over the search space of a planned operator with quasi-random sequences.
+
+Unlike Hyperopt, the trials do not depend on each other, so there is
+no per-trial suggestion overhead and all trials can be evaluated in
+parallel with n_jobs. This makes it a strong baseline when trials are
+fast.
+
+Examples
+--------
+>>> from lale.lib.sklearn import PCA, KNeighborsClassifier
+>>> planned = PCA >> (LogisticRegression | KNeighborsClassifier)
+>>> clf = RandomSearch(estimator=planned, max_evals=8, sampler='lhs', cv=3, n_jobs=2)
+>>> from sklearn import datasets
+>>> iris = datasets.load_iris()
+>>> trained = clf.fit(iris.data, iris.target)
+>>> predictions = trained.predict(iris.data)
+""",
+    'documentation_url': 'https://lale.readthedocs.io/en/latest/modules/lale.lib.lale.random_search.html',
+    'type': 'object',
+    'tags': {
+        'pre': [],
+        'op': ['estimator'],
+        'post': []},
+    'properties': {
+        'hyperparams': _hyperparams_schema,
+        'input_fit': _input_fit_schema,
+        'input_predict': _input_predict_schema,
+        'output_predict': _output_predict_schema}}
+
+lale.docstrings.set_docstrings(RandomSearchImpl, _combined_schemas)
+
+RandomSearch = lale.operators.make_operator(RandomSearchImpl, _combined_schemas)
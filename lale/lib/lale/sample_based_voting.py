@@ -18,8 +18,8 @@ import pandas as pd
 import numpy as np
 
 class SampleBasedVotingImpl():
-    def __init__(self, hyperparams=None):
-        self._hyperparams = hyperparams
+    def __init__(self, voting='hard'):
+        self.voting = voting
         self.end_index_list = None
 
     def set_meta_data(self, meta_data_dict):
@@ -32,21 +32,35 @@ class SampleBasedVotingImpl():
 
         if end_index_list is None:
             return X
+        if isinstance(X, (pd.DataFrame, pd.Series)):
+            X = X.values
+        X = np.asarray(X)
+        end_indices = np.asarray(end_index_list, dtype=int)
+        if len(end_indices) == 0:
+            return np.array([], dtype=X.dtype)
+        start_indices = np.concatenate(([0], end_indices[:-1]))
+        lengths = end_indices - start_indices
+        if np.any(lengths <= 0):
+            raise ValueError('Every segment of end_index_list must contain at least one sample.')
+        X = X[:end_indices[-1]]
+        if X.ndim == 1:
+            if self.voting == 'soft':
+                raise ValueError('Soft voting requires scores or probabilities with one column per class.')
+            classes, codes = np.unique(X, return_inverse=True)
+            n_classes = len(classes)
+        elif self.voting == 'soft':
+            averages = np.add.reduceat(X, start_indices, axis=0) / lengths[:, np.newaxis]
+            return np.argmax(averages, axis=1)
         else:
-            voted_labels = []
-            prev_index = 0
-            if not isinstance(X, np.ndarray):
-                if isinstance(X, list):
-                    X = np.array(X)
-                elif isinstance(X, pd.dataframe):
-                    X = X.as_matrix()
-            for index in end_index_list:
-                labels = X[prev_index:index]
-                (values,counts) = np.unique(labels,return_counts=True)
-                ind=np.argmax(counts) #If two labels are in majority, this will pick the first one.
-                voted_labels.append(ind)
-            return np.array(voted_labels)
-    
+            classes, codes = None, np.argmax(X, axis=1)
+            n_classes = X.shape[1]
+        segment_ids = np.repeat(np.arange(len(lengths)), lengths)
+        counts = np.bincount(segment_ids * n_classes + codes, minlength=len(lengths) * n_classes)
+        counts = counts.reshape(len(lengths), n_classes)
+        winners = np.argmax(counts, axis=1) #If two labels are in majority, this will pick the first one.
+        if classes is None:
+            return winners
+        return classes[winners]
 
 _hyperparams_schema = {
     '$schema': 'http://json-schema.org/draft-04/schema#',
@@ -54,8 +68,14 @@ _hyperparams_schema = {
     {   'description': 'This first object lists all constructor arguments with their types, but omits constraints for conditional hyperparameters',
         'type': 'object',
         'additionalProperties': False,
+        'required': ['voting'],
         'relevantToOptimizer': [],
-        'properties': {}}]}
+        'properties': {
+            'voting': {
+                'enum': ['hard', 'soft'],
+                'default': 'hard',
+                'description': """If 'hard', each sample votes for one label and the most frequent label of each segment wins.
+If 'soft', the rows of X are class probabilities, which are averaged over each segment and the class with the highest average wins."""}}}]}
 
 _input_transform_schema = {
     '$schema': 'http://json-schema.org/draft-04/schema#',
@@ -77,7 +97,8 @@ _output_transform_schema = {
 
 _combined_schemas = {
     '$schema': 'http://json-schema.org/draft-04/schema#',
-    'description': """Treat the input as labels and use the end_index_list to produce labels using voting. Note that here, X contains the label and no y is accepted.""",
+    'description': """Treat the input as labels and use the end_index_list to produce labels using voting. Note that here, X contains the label and no y is accepted.
+When X has one column per class, for instance the predict_proba output of a classifier inside a pipeline, each row votes for its highest-scoring column and the result contains column indices instead of labels.""",
     'documentation_url': 'https://lale.readthedocs.io/en/latest/modules/lale.lib.lale.sample_based_voting.html',
     'type': 'object',
     'tags': {
@@ -15,9 +15,11 @@
 import os, sys
 sys.path.append(os.getcwd())
 
+import concurrent.futures
+import tempfile
+
 import numpy as np
 from scipy.signal import resample
-from sklearn import preprocessing
 import warnings
 import collections
 import pickle
@@ -48,7 +50,7 @@ class Slice:
     def apply(self, data):
         s = [slice(None),] * data.ndim
         s[-1] = slice(self.start, self.stop)
-        return data[s]
+        return data[tuple(s)]
 
 class Magnitude:
     """
@@ -62,17 +64,23 @@ class Magnitude:
 
 class Log10:
     """
-    Apply Log10
+    Apply Log10. Non-positive entries are replaced separately for each
+    matrix in the last two axes, so a stack of windows gives the same
+    result as applying this to every window on its own.
     """
     def get_name(self):
         return "log10"
 
     def apply(self, data):
         # 10.0 * log10(re * re + im * im)
-        indices = np.where(data <= 0)
-        data[indices] = np.max(data)
-        data[indices] = (np.min(data) * 0.1)
-        return np.log10(data)
+        matrices = data.reshape((-1,) + data.shape[-2:])
+        non_positive = (matrices <= 0).reshape(len(matrices), -1).any(axis=1)
+        for i in np.flatnonzero(non_positive):
+            matrix = matrices[i]
+            indices = np.where(matrix <= 0)
+            matrix[indices] = np.max(matrix)
+            matrix[indices] = (np.min(matrix) * 0.1)
+        return np.log10(matrices).reshape(data.shape)
 
 class Pipeline(object):
     """
@@ -120,6 +128,13 @@ class Resample:
             return resample(data, self.f, axis=axis)
         return data
 
+# Same as sklearn.preprocessing.scale, but for any number of dimensions
+def scale(data, axis):
+    mean = np.mean(data, axis=axis, keepdims=True)
+    std = np.std(data, axis=axis, keepdims=True)
+    std[std == 0.0] = 1.0
+    return (data - mean) / std
+
 class StandardizeLast:
     """
     Scale across the last axis.
@@ -128,53 +143,55 @@ class StandardizeLast:
         return 'standardize-last'
 
     def apply(self, data):
-        return preprocessing.scale(data, axis=data.ndim-1)
+        return scale(data, axis=data.ndim-1)
 
 class StandardizeFirst:
     """
-    Scale across the first axis.
+    Scale across the first axis of each matrix, that is, the
+    second-to-last axis of a stack of matrices.
     """
     def get_name(self):
         return 'standardize-first'
 
     def apply(self, data):
-        return preprocessing.scale(data, axis=0)
+        return scale(data, axis=data.ndim-2)
 
 
 class CorrelationMatrix:
     """
     Calculate correlation coefficients matrix across all EEG channels.
+    Works like np.corrcoef on each matrix in the last two axes.
     """
     def get_name(self):
         return 'correlation-matrix'
 
     def apply(self, data):
-        return np.corrcoef(data)
+        centered = data - np.mean(data, axis=-1, keepdims=True)
+        covariance = np.matmul(centered, np.swapaxes(centered, -1, -2))
+        stddev = np.sqrt(np.diagonal(covariance, axis1=-2, axis2=-1))
+        correlation = covariance / stddev[..., :, np.newaxis] / stddev[..., np.newaxis, :]
+        return np.clip(correlation, -1, 1)
 
 
 class Eigenvalues:
     """
-    Take eigenvalues of a matrix, and sort them by magnitude in order to
+    Take eigenvalues of a symmetric matrix, and sort them by magnitude in order to
     make them useful as features (as they have no inherent order).
     """
     def get_name(self):
         return 'eigenvalues'
 
     def apply(self, data):
-        w, v = np.linalg.eig(data)
+        w = np.linalg.eigvalsh(data)
         w = np.absolute(w)
-        w.sort()
+        w.sort(axis=-1)
         return w
 
 
-# Take the upper right triangle of a matrix
+# Take the upper right triangle of a matrix, or of each matrix in a stack
 def upper_right_triangle(matrix):
-    accum = []
-    for i in range(matrix.shape[0]):
-        for j in range(i+1, matrix.shape[1]):
-            accum.append(matrix[i, j])
-
-    return np.array(accum)
+    rows, columns = np.triu_indices(matrix.shape[-2], k=1, m=matrix.shape[-1])
+    return matrix[..., rows, columns]
 
 class FreqCorrelation:
     """
@@ -231,12 +248,12 @@ class FreqCorrelation:
         if self.with_eigen:
             out.append(w)
         if self.with_fft:
-            data1 = data1.ravel()
+            data1 = data1.reshape(data1.shape[:-2] + (-1,))
             out.append(data1)
         for d in out:
-            assert d.ndim == 1
+            assert d.ndim == data.ndim - 1
 
-        return np.concatenate(out, axis=0)
+        return np.concatenate(out, axis=-1)
 
 
 class TimeCorrelation:
@@ -268,12 +285,14 @@ class TimeCorrelation:
 
     def apply(self, data):
         # so that correlation matrix calculation doesn't crash
-        for ch in data:
-            if np.alltrue(ch == 0.0):
-                ch[-1] += 0.00001
+        constant = np.all(data == 0.0, axis=-1)
+        if np.any(constant):
+            # on a copy, since windows overlap in the caller's data
+            data = data.copy()
+            data[..., -1][constant] += 0.00001
 
         data1 = data
-        if data1.shape[1] > self.max_hz:
+        if data1.shape[-1] > self.max_hz:
             data1 = Resample(self.max_hz).apply(data1)
 
         if self.scale_option == 'first_axis':
@@ -294,9 +313,9 @@ class TimeCorrelation:
             out.append(w)
 
         for d in out:
-            assert d.ndim == 1
+            assert d.ndim == data.ndim - 1
 
-        return np.concatenate(out, axis=0)
+        return np.concatenate(out, axis=-1)
 
 class FFTWithTimeFreqCorrelation:
     """
@@ -320,49 +339,130 @@ class FFTWithTimeFreqCorrelation:
 
         return np.concatenate((data1, data2), axis=data1.ndim - 1)
 
+#Upper bound on the number of windows processed together, to bound the memory
+#used by the stacked windows and their spectra.
+_windows_per_chunk = 1024
+
+def _transform_series_into_memmap(impl, seizure_data, filename, shape, offset):
+    #runs in a worker process, writes the features of one series into rows offset, offset+1, ... of the memory-mapped result
+    warnings.filterwarnings("ignore")
+    X_transformed = np.memmap(filename, dtype=np.float64, mode='r+', shape=shape)
+    for fft_data in impl._transform_series(impl._pipeline(), seizure_data):
+        X_transformed[offset:offset + len(fft_data)] = fft_data
+        offset += len(fft_data)
+    X_transformed.flush()
+    del X_transformed
+
 class TimeFreqEigenVectorsImpl():
     def __init__(self, window_length=1, window_step=0.5, 
-        fft_min_freq=1, fft_max_freq=24, sampling_frequency=250):
+        fft_min_freq=1, fft_max_freq=24, sampling_frequency=250, n_jobs=None):
         self.window_length = window_length
         self.window_step = window_step
         self.fft_min_freq = fft_min_freq
         self.fft_max_freq = fft_max_freq
         self.sampling_frequency = sampling_frequency
+        self.n_jobs = n_jobs
 
     def transform(self, X, y = None):
         warnings.filterwarnings("ignore")
-        pipeline = Pipeline([FFTWithTimeFreqCorrelation(self.fft_min_freq, self.fft_max_freq, 
-        self.sampling_frequency, 'first_axis')])
-        X_transformed = []
-        y_transformed = np.empty((0))
-        self.end_index_list = [] #This is the list of end indices for samples generated per seizure
+        pipeline = self._pipeline()
+        X = [np.asarray(seizure_data) for seizure_data in X]
+        n_samples = [self._n_windows(seizure_data) for seizure_data in X] #number of samples generated per seizure
 
         #The transformation map is just a list of indices corresponding to the last sample generated by each time-series.
-        for i in range(len(X)):
-            seizure_data = X[i]
-            if y is not None:
-                seizure_label = y[i]
-            start, step = 0, int(np.floor(self.window_step * self.sampling_frequency))
-            stop = start + int(np.floor(self.window_length * self.sampling_frequency))
-            fft_data = []
-            while stop < seizure_data.shape[1]:
-                signal_window = seizure_data[:, start:stop]
-                fft_window = pipeline.apply(signal_window)
-                fft_data.append(fft_window)
-                start, stop = start + step, stop + step
-            X_transformed.extend(fft_data)
-            if y is not None:
-                labels_for_all_seizure_samples = np.full(len(fft_data), seizure_label)
-                y_transformed = np.hstack((y_transformed, labels_for_all_seizure_samples))
-            previous_element  = self.end_index_list[i-1] if (i-1)>=0 else 0
-            self.end_index_list.append(previous_element + len(fft_data))
-
-        X_transformed = np.array(X_transformed)
+        self.end_index_list = np.cumsum(n_samples, dtype=int).tolist()
+        n_rows = sum(n_samples)
+        if n_rows == 0:
+            X_transformed = np.array([])
+        else:
+            #the number of features only depends on the number of channels, so one window is enough to find it
+            first = X[int(np.flatnonzero(n_samples)[0])]
+            n_features = self._transform_series(pipeline, first[:, :self._window_size() + 1])[0].shape[1]
+            n_jobs = self._effective_n_jobs(len(X))
+            if n_jobs == 1:
+                X_transformed = np.empty((n_rows, n_features))
+                offset = 0
+                for seizure_data in X:
+                    for fft_data in self._transform_series(pipeline, seizure_data):
+                        X_transformed[offset:offset + len(fft_data)] = fft_data
+                        offset += len(fft_data)
+            else:
+                X_transformed = self._transform_in_parallel(X, n_samples, (n_rows, n_features), n_jobs)
         if y is None:
             y_transformed = None
+        else:
+            y_transformed = np.repeat(np.asarray(y)[:len(n_samples)], n_samples)
 
         return X_transformed, y_transformed
 
+    def _transform_in_parallel(self, X, n_samples, shape, n_jobs):
+        """Shards the series across a pool of n_jobs processes.
+
+        Every worker writes its features directly into a memory-mapped file
+        in a temporary folder, at the rows given by the end indices of the
+        preceding series, so the result keeps the order of X and no
+        features are pickled."""
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, 'X_transformed.mmap')
+            mapped = np.memmap(filename, dtype=np.float64, mode='w+', shape=shape)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = []
+                offset = 0
+                for seizure_data, n_windows in zip(X, n_samples):
+                    if n_windows > 0:
+                        futures.append(executor.submit(
+                            _transform_series_into_memmap,
+                            self, seizure_data, filename, shape, offset))
+                    offset += n_windows
+                for future in futures:
+                    future.result()
+            X_transformed = np.array(mapped)
+            #the file can only be removed once it is no longer mapped
+            del mapped
+        return X_transformed
+
+    def _effective_n_jobs(self, n_series):
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs == 0:
+            raise ValueError('n_jobs == 0 has no meaning, use None or a positive or negative number of processes.')
+        n_jobs = self.n_jobs if self.n_jobs > 0 else (os.cpu_count() or 1) + 1 + self.n_jobs
+        return max(1, min(n_jobs, n_series))
+
+    def _pipeline(self):
+        return Pipeline([FFTWithTimeFreqCorrelation(self.fft_min_freq, self.fft_max_freq, 
+        self.sampling_frequency, 'first_axis')])
+
+    def _window_size(self):
+        return int(np.floor(self.window_length * self.sampling_frequency))
+
+    def _window_step(self):
+        return int(np.floor(self.window_step * self.sampling_frequency))
+
+    def _n_windows(self, seizure_data):
+        #the last window ends before the last time step, as in the original loop
+        return len(range(0, seizure_data.shape[1] - self._window_size(), self._window_step()))
+
+    def _transform_series(self, pipeline, seizure_data):
+        """Features of all windows of one series, as a list of 2-D chunks.
+
+        The windows are a strided view on seizure_data, and each chunk of
+        windows goes through the pipeline as one 3-D stack of shape
+        (windows, channels, window_size)."""
+        window_size = self._window_size()
+        n_time_steps = seizure_data.shape[1]
+        if window_size >= n_time_steps:
+            return []
+        n_channels = seizure_data.shape[0]
+        channel_stride, time_stride = seizure_data.strides
+        windows = np.lib.stride_tricks.as_strided(
+            seizure_data,
+            shape=(self._n_windows(seizure_data), n_channels, window_size),
+            strides=(self._window_step() * time_stride, channel_stride, time_stride),
+            writeable=False)
+        return [pipeline.apply(windows[start:start + _windows_per_chunk])
+                for start in range(0, len(windows), _windows_per_chunk)]
+
     def get_transform_meta_output(self):
         if self.end_index_list is not None:
             return {'end_index_list': self.end_index_list}
@@ -375,7 +475,7 @@ _hyperparams_schema = {
     'allOf': [{
         'type': 'object',
         'additionalProperties': False,
-        'required': ['window_length', 'window_step', 'fft_min_freq', 'fft_max_freq', 'sampling_frequency'],
+        'required': ['window_length', 'window_step', 'fft_min_freq', 'fft_max_freq', 'sampling_frequency', 'n_jobs'],
         'relevantToOptimizer': ['window_length', 'window_step', 'fft_max_freq'],        
         'properties': {
             'window_length': {
@@ -407,6 +507,17 @@ _hyperparams_schema = {
                 'type': 'integer',
                 'default': 250,
                 'description': 'TODO'},
+            'n_jobs': {
+                'anyOf': [
+                    {   'description': '1, that is, no parallelism.',
+                        'enum': [None]},
+                    {   'description': 'Use all processors.',
+                        'enum': [-1]},
+                    {   'description': 'Number of processes.',
+                        'type': 'integer',
+                        'minimum': 1}],
+                'default': None,
+                'description': 'Number of processes that extract the features of different series in parallel. The features are returned through a memory-mapped file in a temporary folder.'},
         }}
         #TODO: Any constraints on hyper-parameter combinations?
         ]
@@ -12,6 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
+import os
+import tempfile
+import threading
+import lale.datasets.resources
 import lale.docstrings
 import lale.operators
 import torch
@@ -21,72 +26,128 @@ import pandas as pd
 import logging
 logging.basicConfig(level=logging.INFO)
 
+#same files that pytorch_pretrained_bert downloads for 'bert-base-uncased'
+lale.datasets.resources.register(
+    'bert/bert-base-uncased-vocab.txt',
+    'https://s3.amazonaws.com/models.huggingface.co/bert/bert-base-uncased-vocab.txt')
+lale.datasets.resources.register(
+    'bert/bert-base-uncased.tar.gz',
+    'https://s3.amazonaws.com/models.huggingface.co/bert/bert-base-uncased.tar.gz')
+
+#tokenizer and model by path, shared by all clones of the operator, since
+#the weights are only read during transform
+_pretrained_cache = {}
+_pretrained_lock = threading.Lock()
+
+def _load_pretrained(vocab_path, model_path):
+    with _pretrained_lock:
+        key = (vocab_path, model_path)
+        if key not in _pretrained_cache:
+            if os.path.isfile(model_path):
+                #pytorch_pretrained_bert extracts local archives without checking them
+                lale.datasets.resources.check_archive_members(model_path)
+            tokenizer = BertTokenizer.from_pretrained(vocab_path, max_len=512)
+            model = BertModel.from_pretrained(model_path)
+            model.eval()
+            _pretrained_cache[key] = (tokenizer, model)
+        return _pretrained_cache[key]
+
+#no autograd bookkeeping at all, or just no gradients with older torch
+_inference_mode = getattr(torch, 'inference_mode', torch.no_grad)
+
 class BertPretrainedEncoderImpl():
-    def __init__(self, batch_size = 32):
-        # Load pre-trained model tokenizer (vocabulary)
-        self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
+    def __init__(self, batch_size = 32, bucket_by_length = True, n_threads = None, cache_dir = None):
+        # Load pre-trained model tokenizer (vocabulary), from the resource mirror if there is one
+        vocab_path = lale.datasets.resources.find_or_default(
+            'bert/bert-base-uncased-vocab.txt', 'bert-base-uncased')
+        model_path = lale.datasets.resources.find_or_default(
+            'bert/bert-base-uncased.tar.gz', 'bert-base-uncased')
+        self.tokenizer, self.model = _load_pretrained(vocab_path, model_path)
+        #cached embeddings are only valid for the same vocabulary and weights
+        self._model_id = f'{vocab_path}\0{model_path}'
         self.max_seq_length = self.tokenizer.max_len
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = BertModel.from_pretrained('bert-base-uncased')
         self.batch_size = batch_size
+        self.bucket_by_length = bucket_by_length
+        self.n_threads = n_threads
+        self.cache_dir = cache_dir
 
     # def fit(self, X, y):
     #     # TODO: Find the right value for max sequence length
     #     return BertPretrainedEncoderImpl()
 
+    def _token_ids(self, line):
+        tokenized_text = self.tokenizer.tokenize(f'[CLS] {line} [SEP]')
+        tokenized_ids = self.tokenizer.convert_tokens_to_ids(tokenized_text)
+        return tokenized_ids[:self.max_seq_length]
+
+    def _cache_file_name(self, line):
+        key = f'{self._model_id}\0{self.max_seq_length}\0{line}'
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f'{digest}.npy')
+
+    def _encode_batch(self, batch_ids):
+        # Zero-pad up to the longest sequence in the batch, instead of max_seq_length.
+        # The mask has 1 for real tokens and 0 for padding tokens. Only real
+        # tokens are attended to.
+        seq_length = max(len(ids) for ids in batch_ids)
+        tokens = np.zeros((len(batch_ids), seq_length), dtype=np.int64)
+        input_mask = np.zeros((len(batch_ids), seq_length), dtype=np.int64)
+        for i, ids in enumerate(batch_ids):
+            tokens[i, :len(ids)] = ids
+            input_mask[i, :len(ids)] = 1
+        #This transformer is only applicable for single sentences as we are passing all
+        # segment ids as 1. BERT has a notion of a sentence pair, say for a question-answering task
+        # that would need a different handling of segments_ids
+        segments = np.ones_like(tokens)
+        to_tensor = lambda a: torch.from_numpy(a).to(self.device)
+        encoded_layer, _ = self.model(
+            to_tensor(tokens), to_tensor(segments), to_tensor(input_mask),
+            output_all_encoded_layers=False)
+        return encoded_layer[:, 0, :].cpu().numpy()
+
     def transform(self, X):
-        if isinstance(X, np.ndarray) or isinstance(X, pd.DataFrame):
-            X = X.squeeze()
-        self.model.eval()
+        if isinstance(X, pd.DataFrame):
+            X = X.iloc[:, 0]
+        elif isinstance(X, np.ndarray):
+            X = X.reshape(-1)
+        lines = [*X]
+        result = np.empty((len(lines), self.model.config.hidden_size), dtype=np.float32)
+        todo = []
+        for i, line in enumerate(lines):
+            if self.cache_dir is not None and os.path.exists(self._cache_file_name(line)):
+                result[i] = np.load(self._cache_file_name(line))
+            else:
+                todo.append(i)
+        # Convert tokens to vocabulary indices
+        token_ids = {i: self._token_ids(lines[i]) for i in todo}
+        if self.bucket_by_length:
+            #batches of similar lengths need less padding
+            todo.sort(key=lambda i: len(token_ids[i]))
         self.model.to(self.device)
-        transformed_X = None
-        num_batches = len(X)//self.batch_size
-        last_batch_size = len(X)%self.batch_size
-        for batch_idx in range(num_batches+1):
-          min_idx = batch_idx*self.batch_size
-          if batch_idx+1 <= num_batches:
-            max_idx = (batch_idx+1)*self.batch_size            
-          else:
-            max_idx = batch_idx*self.batch_size + last_batch_size
-          batch_data = X[min_idx:max_idx]
-          indexed_tokenized_X = []
-          segments_ids = []
-          # Convert token to vocabulary indices
-          for line in batch_data:
-              tokenized_text = self.tokenizer.tokenize(f'[CLS] {line} [SEP]')
-              tokenized_ids = self.tokenizer.convert_tokens_to_ids(tokenized_text)
-              if len(tokenized_ids) > self.max_seq_length - 2:
-                  tokenized_ids = tokenized_ids[:(self.max_seq_length)]            
-
-              # The mask has 1 for real tokens and 0 for padding tokens. Only real
-              # tokens are attended to.
-              input_mask = [1] * len(tokenized_ids)
-              # Zero-pad up to the sequence length.
-              padding = [0] * (self.max_seq_length - len(tokenized_ids))
-              padded_tokenized_ids = tokenized_ids + padding
-              input_mask += padding            
-              indexed_tokenized_X.append(padded_tokenized_ids)
-
-              #This transformer is only applicable for single sentences as we are passing all
-              # segment ids as 1. BERT has a notion of a sentence pair, say for a question-answering task
-              # that would need a different handling of segments_ids
-              segments_ids.append([1 for token in padded_tokenized_ids])
-
-          # Convert inputs to PyTorch tensors
-          tokens_tensor = torch.tensor(indexed_tokenized_X)
-          segments_tensors = torch.tensor(segments_ids)
-
-          # Predict hidden states features for each layer
-          with torch.no_grad():
-            encoded_layers, _ = self.model(tokens_tensor.to(self.device), segments_tensors.to(self.device))
-          batch_X = encoded_layers[-1][:, 0, :].detach().cpu().numpy()
-          if transformed_X is None:
-            transformed_X = batch_X
-          else:
-            transformed_X = np.vstack((transformed_X, batch_X))
-        return transformed_X
-
-
+        saved_n_threads = torch.get_num_threads()
+        if self.n_threads is not None:
+            torch.set_num_threads(self.n_threads)
+        try:
+            with _inference_mode():
+                for start in range(0, len(todo), self.batch_size):
+                    batch_idx = todo[start:start + self.batch_size]
+                    result[batch_idx] = self._encode_batch([token_ids[i] for i in batch_idx])
+        finally:
+            torch.set_num_threads(saved_n_threads)
+        if self.cache_dir is not None:
+            for i in todo:
+                self._store_in_cache(lines[i], result[i])
+        return result
+
+    def _store_in_cache(self, line, embedding):
+        file_name = self._cache_file_name(line)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        #write next to the final location and rename, so readers never see a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(file_name), suffix='.npy')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, embedding)
+        os.replace(tmp_name, file_name)
 
 _input_schema_fit = {
   '$schema': 'http://json-schema.org/draft-04/schema#',
@@ -151,7 +212,27 @@ _hyperparams_schema = {
           'minimum': 1,
           'distribution': 'uniform',
           'minimumForOptimizer': 32,
-          'maximumForOptimizer': 128}}}]}
+          'maximumForOptimizer': 128},
+        'bucket_by_length':{
+          'description': 'Sort the sentences by number of tokens before batching, so '
+            'each batch is padded to a similar length. The result is in the original order.',
+          'type': 'boolean',
+          'default': True},
+        'n_threads':{
+          'description': 'Number of threads for intra-op parallelism of torch during transform.',
+          'anyOf': [
+            { 'type': 'integer', 'minimum': 1},
+            { 'enum': [None],
+              'description': 'Keep the current setting of torch.'}],
+          'default': None},
+        'cache_dir':{
+          'description': 'Directory of an on-disk cache of embeddings, keyed by a hash of the '
+            'model and the text, so sentences encoded before are not encoded again.',
+          'anyOf': [
+            { 'type': 'string'},
+            { 'enum': [None],
+              'description': 'No cache.'}],
+          'default': None}}}]}
 
 _combined_schemas = {
   '$schema': 'http://json-schema.org/draft-04/schema#',
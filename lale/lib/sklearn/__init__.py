@@ -56,6 +56,8 @@ Transformers:
 * lale.lib.sklearn. `ColumnTransformer`_
 * lale.lib.sklearn. `FeatureAgglomeration`_
 * lale.lib.sklearn. `FunctionTransformer`_
+* lale.lib.sklearn. `IncrementalPCA`_
+* lale.lib.sklearn. `MiniBatchKMeans`_
 * lale.lib.sklearn. `MinMaxScaler`_
 * lale.lib.sklearn. `MissingIndicator`_
 * lale.lib.sklearn. `NMF`_
@@ -87,10 +89,12 @@ Transformers:
 .. _`GaussianNB`: lale.lib.sklearn.gaussian_nb.html
 .. _`GradientBoostingClassifier`: lale.lib.sklearn.gradient_boosting_classifier.html
 .. _`GradientBoostingRegressor`: lale.lib.sklearn.gradient_boosting_regressor.html
+.. _`IncrementalPCA`: lale.lib.sklearn.incremental_pca.html
 .. _`KNeighborsClassifier`: lale.lib.sklearn.k_neighbors_classifier.html
 .. _`LinearRegression`: lale.lib.sklearn.linear_regression.html
 .. _`LinearSVC`: lale.lib.sklearn.linear_svc.html
 .. _`LogisticRegression`: lale.lib.sklearn.logistic_regression.html
+.. _`MiniBatchKMeans`: lale.lib.sklearn.mini_batch_k_means.html
 .. _`MinMaxScaler`: lale.lib.sklearn.min_max_scaler.html
 .. _`MissingIndicator`: lale.lib.sklearn.missing_indicator.html
 .. _`MLPClassifier`: lale.lib.sklearn.mlp_classifier.html
@@ -134,10 +138,12 @@ from .function_transformer import FunctionTransformer
 from .gaussian_nb import GaussianNB
 from .gradient_boosting_classifier import GradientBoostingClassifier
 from .gradient_boosting_regressor import GradientBoostingRegressor
+from .incremental_pca import IncrementalPCA
 from .k_neighbors_classifier import KNeighborsClassifier
 from .linear_regression import LinearRegression
 from .linear_svc import LinearSVC
 from .logistic_regression import LogisticRegression
+from .mini_batch_k_means import MiniBatchKMeans
 from .min_max_scaler import MinMaxScaler
 from .missing_indicator import MissingIndicator
 from .mlp_classifier import MLPClassifier
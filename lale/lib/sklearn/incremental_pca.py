@@ -0,0 +1,140 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sklearn.decomposition
+import lale.docstrings
+import lale.operators
+
+class IncrementalPCAImpl():
+
+    def __init__(self, n_components=None, whiten=False, copy=True, batch_size=None):
+        self._hyperparams = {
+            'n_components': n_components,
+            'whiten': whiten,
+            'copy': copy,
+            'batch_size': batch_size}
+        self._wrapped_model = sklearn.decomposition.IncrementalPCA(**self._hyperparams)
+
+    def fit(self, X, y=None):
+        self._wrapped_model.fit(X, y)
+        return self
+
+    def partial_fit(self, X, y=None):
+        self._wrapped_model.partial_fit(X, y)
+        return self
+
+    def transform(self, X):
+        return self._wrapped_model.transform(X)
+
+_hyperparams_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Incremental principal components analysis (IPCA).',
+    'allOf': [{
+        'type': 'object',
+        'required': ['n_components', 'whiten', 'copy', 'batch_size'],
+        'relevantToOptimizer': ['n_components', 'whiten', 'batch_size'],
+        'additionalProperties': False,
+        'properties': {
+            'n_components': {
+                'anyOf': [{
+                    'type': 'integer',
+                    'minimum': 1,
+                    'minimumForOptimizer': 2,
+                    'maximumForOptimizer': 256,
+                    'distribution': 'uniform'}, {
+                    'enum': [None],
+                    'description': 'min(n_samples, n_features)'}],
+                'default': None,
+                'description': 'Number of components to keep.'},
+            'whiten': {
+                'type': 'boolean',
+                'default': False,
+                'description': 'When True, the components_ vectors are divided by n_samples times components_ to ensure uncorrelated outputs with unit component-wise variances.'},
+            'copy': {
+                'type': 'boolean',
+                'default': True,
+                'description': 'If False, X will be overwritten.'},
+            'batch_size': {
+                'anyOf': [{
+                    'type': 'integer',
+                    'minimum': 1,
+                    'minimumForOptimizer': 3,
+                    'maximumForOptimizer': 128,
+                    'distribution': 'uniform'}, {
+                    'enum': [None],
+                    'description': '5 * n_features'}],
+                'default': None,
+                'description': 'The number of samples to use for each batch, only used when calling fit.'},
+}}]}
+
+_input_fit_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Fit the model with X, using minibatches of size batch_size.',
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {
+            'type': 'array',
+            'items': {
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            },
+            'description': 'Training data.'},
+        'y': {'description': 'Ignored'},
+    },
+}
+_input_transform_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Apply dimensionality reduction to X.',
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {
+            'type': 'array',
+            'items': {
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            },
+            'description': 'New data.'},
+    },
+}
+_output_transform_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Apply dimensionality reduction to X.',
+    'type': 'array',
+    'items': {'type': 'array', 'items': {'type': 'number'}}
+}
+_combined_schemas = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': """`Incremental PCA`_ transformer from scikit-learn, which also supports partial_fit.
+
+.. _`Incremental PCA`: https://scikit-learn.org/0.20/modules/generated/sklearn.decomposition.IncrementalPCA.html#sklearn-decomposition-incrementalpca
+""",
+  'documentation_url': 'https://lale.readthedocs.io/en/latest/modules/lale.lib.sklearn.incremental_pca.html',
+    'type': 'object',
+    'tags': {
+        'pre': [],
+        'op': ['transformer'],
+        'post': []},
+    'properties': {
+        'hyperparams': _hyperparams_schema,
+        'input_fit': _input_fit_schema,
+        'input_transform': _input_transform_schema,
+        'output_transform': _output_transform_schema}}
+
+lale.docstrings.set_docstrings(IncrementalPCAImpl, _combined_schemas)
+
+IncrementalPCA = lale.operators.make_operator(IncrementalPCAImpl, _combined_schemas)
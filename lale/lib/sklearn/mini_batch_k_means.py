@@ -0,0 +1,249 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sklearn.cluster
+import lale.docstrings
+import lale.operators
+
+class MiniBatchKMeansImpl():
+
+    def __init__(self, n_clusters=8, init='k-means++', max_iter=100, batch_size=100, verbose=0, compute_labels=True, random_state=None, tol=0.0, max_no_improvement=10, init_size=None, n_init=3, reassignment_ratio=0.01):
+        self._hyperparams = {
+            'n_clusters': n_clusters,
+            'init': init,
+            'max_iter': max_iter,
+            'batch_size': batch_size,
+            'verbose': verbose,
+            'compute_labels': compute_labels,
+            'random_state': random_state,
+            'tol': tol,
+            'max_no_improvement': max_no_improvement,
+            'init_size': init_size,
+            'n_init': n_init,
+            'reassignment_ratio': reassignment_ratio}
+        self._wrapped_model = sklearn.cluster.MiniBatchKMeans(**self._hyperparams)
+
+    def fit(self, X, y=None, sample_weight=None):
+        self._wrapped_model.fit(X, y, sample_weight)
+        return self
+
+    def partial_fit(self, X, y=None, sample_weight=None):
+        self._wrapped_model.partial_fit(X, y, sample_weight)
+        return self
+
+    def transform(self, X):
+        return self._wrapped_model.transform(X)
+
+    def predict(self, X, sample_weight=None):
+        return self._wrapped_model.predict(X, sample_weight)
+
+_hyperparams_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Mini-Batch K-Means clustering.',
+    'allOf': [{
+        'type': 'object',
+        'required': ['n_clusters', 'init', 'max_iter', 'batch_size', 'verbose', 'compute_labels', 'random_state', 'tol', 'max_no_improvement', 'init_size', 'n_init', 'reassignment_ratio'],
+        'relevantToOptimizer': ['n_clusters', 'init', 'max_iter', 'batch_size', 'compute_labels', 'tol', 'max_no_improvement', 'n_init'],
+        'additionalProperties': False,
+        'properties': {
+            'n_clusters': {
+                'type': 'integer',
+                'minimum': 1,
+                'minimumForOptimizer': 2,
+                'maximumForOptimizer': 8,
+                'distribution': 'uniform',
+                'default': 8,
+                'description': 'The number of clusters to form as well as the number of centroids to generate.'},
+            'init': {
+                'enum': ['k-means++', 'random'],
+                'default': 'k-means++',
+                'description': 'Method for initialization.'},
+            'max_iter': {
+                'type': 'integer',
+                'minimum': 1,
+                'minimumForOptimizer': 10,
+                'maximumForOptimizer': 1000,
+                'distribution': 'uniform',
+                'default': 100,
+                'description': 'Maximum number of iterations over the complete dataset before stopping independently of any early stopping criterion heuristics.'},
+            'batch_size': {
+                'type': 'integer',
+                'minimum': 1,
+                'minimumForOptimizer': 3,
+                'maximumForOptimizer': 128,
+                'distribution': 'uniform',
+                'default': 100,
+                'description': 'Size of the mini batches.'},
+            'verbose': {
+                'anyOf': [{
+                    'type': 'boolean'}, {
+                    'type': 'integer'}],
+                'default': 0,
+                'description': 'Verbosity mode.'},
+            'compute_labels': {
+                'type': 'boolean',
+                'default': True,
+                'description': 'Compute label assignment and inertia for the complete dataset once the minibatch optimization has converged in fit.'},
+            'random_state': {
+                'description': 'Seed of pseudo-random number generator for centroid initialization and random reassignment.',
+                'anyOf': [{
+                    'description': 'RandomState used by np.random',
+                    'enum': [None]}, {
+                    'description': 'Explicit seed.',
+                    'type': 'integer'}],
+                'default': None},
+            'tol': {
+                'type': 'number',
+                'minimum': 0.0,
+                'minimumForOptimizer': 1e-08,
+                'maximumForOptimizer': 0.01,
+                'distribution': 'loguniform',
+                'default': 0.0,
+                'description': 'Control early stopping based on the relative center changes as measured by a smoothed, variance-normalized of the mean center squared position changes.'},
+            'max_no_improvement': {
+                'anyOf': [{
+                    'type': 'integer',
+                    'minimum': 1,
+                    'minimumForOptimizer': 10,
+                    'maximumForOptimizer': 11,
+                    'distribution': 'uniform'}, {
+                    'enum': [None],
+                    'description': 'Disable convergence detection based on inertia.'}],
+                'default': 10,
+                'description': 'Control early stopping based on the consecutive number of mini batches that does not yield an improvement on the smoothed inertia.'},
+            'init_size': {
+                'anyOf': [{
+                    'type': 'integer',
+                    'minimum': 1}, {
+                    'enum': [None],
+                    'description': '3 * batch_size'}],
+                'default': None,
+                'description': 'Number of samples to randomly sample for speeding up the initialization.'},
+            'n_init': {
+                'type': 'integer',
+                'minimum': 1,
+                'minimumForOptimizer': 3,
+                'maximumForOptimizer': 10,
+                'distribution': 'uniform',
+                'default': 3,
+                'description': 'Number of random initializations that are tried.'},
+            'reassignment_ratio': {
+                'type': 'number',
+                'minimum': 0.0,
+                'default': 0.01,
+                'description': 'Control the fraction of the maximum number of counts for a center to be reassigned.'},
+}}]}
+
+_input_fit_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Compute the centroids on X by chunking it into mini-batches.',
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {
+            'type': 'array',
+            'items': {
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            },
+            'description': 'Training instances to cluster.'},
+        'y': {'description': 'Ignored'},
+        'sample_weight': {
+            'anyOf': [{
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            }, {
+                'enum': [None]}],
+            'default': None,
+            'description': 'The weights for each observation in X.'},
+    },
+}
+_input_transform_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Transform X to a cluster-distance space.',
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {
+            'type': 'array',
+            'items': {
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            },
+            'description': 'New data to transform.'},
+    },
+}
+_output_transform_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'X transformed in the new space.',
+    'type': 'array',
+    'items': {'type': 'array', 'items': {'type': 'number'}}
+}
+_input_predict_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Predict the closest cluster each sample in X belongs to.',
+    'type': 'object',
+    'required': ['X'],
+    'properties': {
+        'X': {
+            'type': 'array',
+            'items': {
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            },
+            'description': 'New data to predict.'},
+        'sample_weight': {
+            'anyOf': [{
+                'type': 'array',
+                'items': {
+                    'type': 'number'},
+            }, {
+                'enum': [None]}],
+            'default': None,
+            'description': 'The weights for each observation in X.'},
+    },
+}
+_output_predict_schema = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': 'Index of the cluster each sample belongs to.',
+    'type': 'array',
+    'items': {'type': 'integer'}
+}
+_combined_schemas = {
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+    'description': """`Mini-batch k-means`_ clustering from scikit-learn, which also supports partial_fit.
+
+.. _`Mini-batch k-means`: https://scikit-learn.org/0.20/modules/generated/sklearn.cluster.MiniBatchKMeans.html#sklearn-cluster-minibatchkmeans
+""",
+  'documentation_url': 'https://lale.readthedocs.io/en/latest/modules/lale.lib.sklearn.mini_batch_k_means.html',
+    'type': 'object',
+    'tags': {
+        'pre': [],
+        'op': ['transformer', 'estimator'],
+        'post': []},
+    'properties': {
+        'hyperparams': _hyperparams_schema,
+        'input_fit': _input_fit_schema,
+        'input_transform': _input_transform_schema,
+        'output_transform': _output_transform_schema,
+        'input_predict': _input_predict_schema,
+        'output_predict': _output_predict_schema}}
+
+lale.docstrings.set_docstrings(MiniBatchKMeansImpl, _combined_schemas)
+
+MiniBatchKMeans = lale.operators.make_operator(MiniBatchKMeansImpl, _combined_schemas)
@@ -30,6 +30,10 @@ class MultinomialNBImpl():
         self._wrapped_model.fit(X, y)
         return self
 
+    def partial_fit(self, X, y=None, classes=None):
+        self._wrapped_model.partial_fit(X, y, classes=classes)
+        return self
+
     def predict(self, X):
         return self._wrapped_model.predict(X)
 
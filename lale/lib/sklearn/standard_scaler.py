@@ -29,6 +29,10 @@ class StandardScalerImpl():
         self._wrapped_model.fit(X, y)
         return self
 
+    def partial_fit(self, X, y=None):
+        self._wrapped_model.partial_fit(X, y)
+        return self
+
     def transform(self, X, copy=None):
         return self._wrapped_model.transform(X, copy)
 
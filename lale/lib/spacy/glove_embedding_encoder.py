@@ -18,12 +18,46 @@ import numpy as np
 import lale.docstrings
 import lale.operators
 from sklearn.utils.validation import _is_arraylike
-import urllib.request
 import os
-import zipfile
+import tempfile
+import threading
+import lale.datasets.resources
 
 logging.basicConfig(level=logging.INFO)
 
+_resources_dir = os.path.join(os.path.dirname(__file__), "resources")
+
+lale.datasets.resources.register(
+    'glove/glove.6B.zip', 'http://nlp.stanford.edu/data/glove.6B.zip',
+    default_path=os.path.join(_resources_dir, 'glove.6B.zip'))
+
+#number of sentences whose word vectors are gathered at once during transform
+_sentences_per_batch = 4096
+
+#sorted vocabulary and memory-mapped matrix of word vectors by dimension,
+#shared by all clones, and through the page cache by all processes
+_embeddings = {}
+_embeddings_lock = threading.Lock()
+
+def _save_npy(file_name, array):
+    #write next to the final location and rename, so readers never see a partial file
+    fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(file_name), suffix='.npy')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp_name, file_name)
+
+def _convert_glove(glove_path, vocab_path, vectors_path):
+    """One-time conversion of a GloVe text file into a sorted vocabulary and a float32 matrix."""
+    words, vectors = [], []
+    with open(glove_path, 'r', encoding='utf-8') as file_handle:
+        for line in file_handle:
+            line = line.split()
+            words.append(line[0])
+            vectors.append(np.array(line[1:], dtype=np.float32))
+    order = np.argsort(words, kind='stable')
+    _save_npy(vectors_path, np.stack(vectors)[order])
+    _save_npy(vocab_path, np.array(words)[order])
+
 
 class GloveEmbeddingEncoderImpl(object):
     """
@@ -52,52 +86,66 @@ class GloveEmbeddingEncoderImpl(object):
         if self.dim not in [50, 100, 200, 300]:
             raise ValueError("dim must be in 50, 100, 200, or 300")
 
-        glove_path = os.path.join(os.path.dirname(__file__),
-                                  "resources",
-                                  "glove.6B.{}d.txt".format(dim))
-
-        if not os.path.exists(glove_path):
-            download_url = 'http://nlp.stanford.edu/data/glove.6B.zip'
-            download_dir = os.path.join(os.path.dirname(__file__), 'resources', 'glove.6B.zip')
-            if not os.path.exists(os.path.join(os.path.dirname(__file__), "resources")):
-                os.mkdir(os.path.join(os.path.dirname(__file__), "resources"))
-            urllib.request.urlretrieve(download_url, download_dir)
-            with zipfile.ZipFile(download_dir, 'r') as zip_ref:
-                zip_ref.extractall(os.path.join(os.path.dirname(__file__), "resources"))
-            os.remove(download_dir)
-
-        self.glove_dict = self._load_glove(glove_path)
+        #the embeddings are loaded on first use, so creating the operator is cheap
         nlp = English()
         self.tokenizer = nlp.Defaults.create_tokenizer(nlp)
-        print('finish initialization')
 
     def fit(self, X, y=None):
         return self
 
-    def _load_glove(self, glove_path):
-        glove_dict = dict()
-        with open(glove_path, 'r', encoding='utf-8') as file_handle:
-            for line in file_handle:
-                line = line.split()
-                glove_dict[line[0]] = np.array(line[1:], dtype=np.float32)
-        return glove_dict
+    def _glove_arrays(self):
+        with _embeddings_lock:
+            if self.dim not in _embeddings:
+                prefix = os.path.join(_resources_dir, "glove.6B.{}d".format(self.dim))
+                vocab_path, vectors_path = prefix + '.vocab.npy', prefix + '.vectors.npy'
+                if not (os.path.exists(vocab_path) and os.path.exists(vectors_path)):
+                    _convert_glove(self._glove_path(), vocab_path, vectors_path)
+                vocab = np.load(vocab_path, mmap_mode='r', allow_pickle=False)
+                vectors = np.load(vectors_path, mmap_mode='r', allow_pickle=False)
+                unk_id = int(np.searchsorted(vocab, 'unk'))
+                _embeddings[self.dim] = (vocab, vectors, unk_id)
+            return _embeddings[self.dim]
+
+    def _token_ids(self, tokens):
+        vocab, _, unk_id = self._glove_arrays()
+        tokens = np.array(tokens)
+        positions = np.minimum(np.searchsorted(vocab, tokens), len(vocab) - 1)
+        return np.where(vocab[positions] == tokens, positions, unk_id)
+
+    def _glove_path(self):
+        glove_file_name = "glove.6B.{}d.txt".format(self.dim)
+        glove_path = os.path.join(_resources_dir, glove_file_name)
+        if not os.path.exists(glove_path):
+            #from the resource mirror if there is one, otherwise downloaded
+            zip_path = lale.datasets.resources.resolve('glove/glove.6B.zip')
+            if lale.datasets.resources.mirror_dir() is None:
+                lale.datasets.resources.extract_archive(zip_path, _resources_dir)
+            else:
+                lale.datasets.resources.extract_archive(zip_path, _resources_dir, [glove_file_name])
+            if lale.datasets.resources.mirror_dir() is None:
+                os.remove(zip_path)
+        return glove_path
 
     def transform(self, X):
         if not _is_arraylike(X):
             raise TypeError("X is not iterable")
-
-        transformed_X = list()
-        for text in X:
-            temp_vec = list()
-            for token in self.tokenizer(text.lower()):
-                temp_vec.append(self.glove_dict.get(token, self.glove_dict['unk']))
-
+        texts = [text.lower() for text in X]
+        _, vectors, _ = self._glove_arrays()
+        transformed_X = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), _sentences_per_batch):
+            batch = texts[start:start + _sentences_per_batch]
+            #an empty text counts as a single unknown word
+            tokens = [[token.text for token in doc] or ['unk']
+                      for doc in self.tokenizer.pipe(batch)]
+            lengths = np.array([len(doc_tokens) for doc_tokens in tokens])
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            ids = self._token_ids([token for doc_tokens in tokens for token in doc_tokens])
+            word_vecs = vectors[ids]
             if self.combiner == 'mean':
-                sentence_vec = np.mean(temp_vec, axis=0)
+                sentence_vecs = np.add.reduceat(word_vecs, offsets, axis=0) / lengths[:, np.newaxis]
             else:
-                sentence_vec = np.amax(temp_vec, axis=0)
-
-            transformed_X.append(sentence_vec)
+                sentence_vecs = np.maximum.reduceat(word_vecs, offsets, axis=0)
+            transformed_X[start:start + len(batch)] = sentence_vecs
         return transformed_X
 
 _input_schema_fit = {
@@ -18,9 +18,14 @@ import random
 import tensorflow_hub as hub
 import tensorflow as tf
 import numpy as np
+import lale.datasets.resources
 import lale.docstrings
 import lale.operators
 
+lale.datasets.resources.register(
+    'use/universal-sentence-encoder-2.tar.gz',
+    'https://tfhub.dev/google/universal-sentence-encoder/2?tf-hub-format=compressed')
+
 class USEPretrainedEncoderImpl(object):
     """
     USEPretrainedEncoderImpl is a module that allows simple consumption and fine-tuning of the
@@ -30,7 +35,10 @@ class USEPretrainedEncoderImpl(object):
     ----------
     model_path: string, (default=None), path to save the model
 
-    batch_size: int, (default=32), batch size of fine-tuning the model
+    batch_size: int, (default=32), batch size of fine-tuning the model and of transform
+
+    n_threads: int, (default=None), number of threads of the TensorFlow session,
+        or None for the TensorFlow default
 
     References
     ----------
@@ -38,7 +46,8 @@ class USEPretrainedEncoderImpl(object):
     """
     def __init__(self,
                  model_path=None,
-                 batch_size=32):
+                 batch_size=32,
+                 n_threads=None):
         self.resources_dir = os.path.join(os.path.dirname(__file__), 'resources')
 
         if model_path is None:
@@ -46,15 +55,30 @@ class USEPretrainedEncoderImpl(object):
         if os.path.exists(os.path.join(self.resources_dir, model_path)):
             self.url = os.path.join(self.resources_dir, model_path)
         else:
-            os.environ['TFHUB_CACHE_DIR'] = os.path.join(self.resources_dir, 'pretrained_USE')
-            self.url = "https://tfhub.dev/google/universal-sentence-encoder/2"
+            archive_path = lale.datasets.resources.find_or_default(
+                'use/universal-sentence-encoder-2.tar.gz', None)
+            if archive_path is not None:
+                #unpack the module from the resource mirror where TF-Hub would have cached it
+                lale.datasets.resources.extract_archive(
+                    archive_path, os.path.join(self.resources_dir, model_path))
+                self.url = os.path.join(self.resources_dir, model_path)
+            else:
+                os.environ['TFHUB_CACHE_DIR'] = os.path.join(self.resources_dir, 'pretrained_USE')
+                self.url = "https://tfhub.dev/google/universal-sentence-encoder/2"
 
         # load the use model from saved location or tensorflow hub
         self.embed = hub.Module(self.url, trainable=True)
-        self.sess = tf.Session()
+        # build the inference subgraph once, so transform does not add ops to the graph
+        self._X_input = tf.placeholder(dtype=tf.string, shape=(None,))
+        self._embedding = self.embed(self._X_input)
+        n_session_threads = 0 if n_threads is None else n_threads
+        self.sess = tf.Session(config=tf.ConfigProto(
+            intra_op_parallelism_threads=n_session_threads,
+            inter_op_parallelism_threads=n_session_threads))
         self.epochs = 10
         self.lr = 0.01
         self.batch_size = batch_size
+        self.n_threads = n_threads
         self.sess.run([tf.global_variables_initializer(),
                        tf.tables_initializer()])
 
@@ -103,9 +127,9 @@ class USEPretrainedEncoderImpl(object):
 
             return x, y, x_batch, y_batch, current_step
 
-        X_batch = tf.placeholder(dtype=tf.string, shape=(None))
+        X_batch = self._X_input
         Y_batch = tf.placeholder(dtype=tf.int16, shape=(None, num_classes))
-        embedded_representation = self.embed(X_batch)
+        embedded_representation = self._embedding
         dense_layer = tf.layers.Dense(units=num_classes, use_bias=True)
         logits = dense_layer(embedded_representation)
         los = tf.nn.softmax_cross_entropy_with_logits_v2(labels=Y_batch, logits=logits)
@@ -141,8 +165,12 @@ class USEPretrainedEncoderImpl(object):
         -------
         transformed_x: 2d-array, shape [n_samples, 512], sentence embedding for downstream task
         """
-        sentence_embedding = self.embed(X)
-        transformed_x = self.sess.run(sentence_embedding)
+        X = np.asarray(X).reshape(-1)
+        transformed_x = np.empty((len(X), int(self._embedding.shape[-1])), dtype=np.float32)
+        for start in range(0, len(X), self.batch_size):
+            stop = start + self.batch_size
+            transformed_x[start:stop] = self.sess.run(
+                self._embedding, feed_dict={self._X_input: X[start:stop]})
         return transformed_x
 
 
@@ -213,7 +241,14 @@ _hyperparams_schema = {
                  'minimum': 1,
                  'distribution': 'uniform',
                  'minimumForOptimizer': 16,
-                 'maximumForOptimizer': 128}}}]}
+                 'maximumForOptimizer': 128},
+             'n_threads': {
+                 'description': 'Number of threads for intra-op and inter-op parallelism of the TensorFlow session.',
+                 'anyOf': [
+                     {'type': 'integer', 'minimum': 1},
+                     {'enum': [None],
+                      'description': 'Let TensorFlow pick the number of threads.'}],
+                 'default': None}}}]}
 
 _combined_schemas = {
     '$schema': 'http://json-schema.org/draft-04/schema#',
@@ -118,7 +118,9 @@ from lale.schemas import Schema
 import jsonschema
 import lale.pretty_print
 import logging
+import random
 import shutil
+import time
 import lale.json_operator
 from lale.json_operator import JSON_TYPE
 from sklearn.pipeline import if_delegate_has_method
@@ -1209,13 +1211,15 @@ class TrainableIndividualOp(PlannedIndividualOp, TrainableOperator):
         self._trained = result
         return result
 
-    def partial_fit(self, X, y = None, **fit_params)->TrainedOperator:
+    def partial_fit(self, X, y = None, **fit_params)->'TrainedIndividualOp':
         if not hasattr(self._impl, "partial_fit"):
             raise AttributeError(f'{self.name()} has no partial_fit implemented.')
+        return self._partial_fit_impl(self._clone_impl(), X, y, fit_params)
+
+    def _partial_fit_impl(self, trainable_impl, X, y, fit_params)->'TrainedIndividualOp':
         X = self._validate_input_schema('X', X, 'partial_fit')
         y = self._validate_input_schema('y', y, 'partial_fit')
         filtered_fit_params = _fixup_hyperparams_dict(fit_params)
-        trainable_impl = self._clone_impl()
         if filtered_fit_params is None:
             trained_impl = trainable_impl.partial_fit(X, y)
         else:
@@ -1226,6 +1230,44 @@ class TrainableIndividualOp(PlannedIndividualOp, TrainableOperator):
         self._trained = result
         return result
 
+    def fit_with_batches(self, X, y=None, num_epochs=1, shuffle_batches=False, random_state=None, num_prefetch=0, timings=None)->'TrainedIndividualOp':
+        """Train incrementally by calling partial_fit on each batch for several epochs.
+
+        The impl is cloned once at the start, and then the same impl is
+        updated in place by all batches of all epochs.
+
+        Parameters
+        ----------
+        X : iterable
+            Batches of the form X_batch, (X_batch, y_batch), or [X_batch, y_batch],
+            for instance a data loader created with lale.helpers.create_data_loader.
+        y : array, optional
+            For a supervised operator, this is an array with the unique class labels
+            in the entire dataset, by default None
+        num_epochs : int, optional
+            Number of passes over the batches, by default 1
+        shuffle_batches : bool, optional
+            Whether to visit the batches in a different random order in each
+            epoch, which requires X to be a sequence, by default False
+        random_state : int, optional
+            Seed for the order of the batches when shuffle_batches is True, by default None
+        num_prefetch : int, optional
+            Number of batches to load ahead in a background thread while
+            the current batch is being processed, by default 0
+        timings : list, optional
+            If given, one record per epoch is appended to it, with the number
+            of rows, the seconds spent loading and computing, and the
+            throughput in rows per second, by default None
+
+        Returns
+        -------
+        result : TrainedIndividualOp
+        """
+        if not hasattr(self._impl, "partial_fit"):
+            raise AttributeError(f'{self.name()} has no partial_fit implemented.')
+        return _partial_fit_with_batches(self, X, y, num_epochs, shuffle_batches,
+                                         random_state, num_prefetch, timings)
+
     def freeze_trained(self)->'TrainedIndividualOp':
         """
         .. deprecated:: 0.0.0
@@ -1437,7 +1479,8 @@ class TrainableIndividualOp(PlannedIndividualOp, TrainableOperator):
         impl = self._impl
         if impl is not None and not inspect.isclass(impl):
             impl = cloner(impl)
-        cp = make_operator(impl, schemas=self._schemas, name=self._name)
+        # the schemas are shared with self and were already checked when it was made
+        cp = _make_operator_with_checked_schemas(impl, self._schemas, self._name)
         if isinstance(cp, PlannedIndividualOp):
             cp._hyperparams = self._hyperparams
         return cp
@@ -1464,6 +1507,30 @@ class TrainedIndividualOp(TrainableIndividualOp, TrainedOperator):
         else:
             return self 
 
+    def partial_fit(self, X, y = None, **fit_params)->'TrainedIndividualOp':
+        """Continue training on another batch of data.
+
+        Unlike `fit` and `partial_fit` on a trainable operator, this does
+        not clone the impl. The learned coefficients are updated in place,
+        so the result shares its impl with this operator.
+
+        Parameters
+        ----------
+        X :
+            Features; see input_fit schema of the operator.
+        y :
+            Labels, if the operator is supervised.
+
+        Returns
+        -------
+        result : TrainedIndividualOp
+        """
+        if not hasattr(self._impl, "partial_fit"):
+            raise AttributeError(f'{self.name()} has no partial_fit implemented.')
+        if self.is_frozen_trained():
+            return self
+        return self._partial_fit_impl(self._impl_instance(), X, y, fit_params)
+
     @if_delegate_has_method(delegate='_impl')
     def transform(self, X, y = None):
         """Transform the data.
@@ -1586,7 +1653,8 @@ class TrainedIndividualOp(TrainableIndividualOp, TrainedOperator):
         impl = self._impl
         if impl is not None and not inspect.isclass(impl):
             impl = cloner(impl)
-        cp = make_operator(impl, schemas=self._schemas, name=self._name)
+        # the schemas are shared with self and were already checked when it was made
+        cp = _make_operator_with_checked_schemas(impl, self._schemas, self._name)
         if isinstance(cp, PlannedIndividualOp):
             cp._hyperparams = self._hyperparams
         return cp
@@ -1596,6 +1664,14 @@ _all_available_operators: List[PlannedOperator] = []
 def make_operator(impl, schemas = None, name = None) -> PlannedIndividualOp:
     if name is None:
         name = lale.helpers.assignee_name()
+    operatorObj = _make_operator_with_checked_schemas(impl, schemas, name)
+    operatorObj._check_schemas()
+    _all_available_operators.append(operatorObj)
+    return operatorObj
+
+def _make_operator_with_checked_schemas(impl, schemas, name) -> PlannedIndividualOp:
+    """Like make_operator, but neither validates the schemas nor registers
+    the result, for copies of operators whose schemas are already checked."""
     if inspect.isclass(impl):
         if hasattr(impl, 'fit'):
             operatorObj = PlannedIndividualOp(name, impl, schemas)
@@ -1608,8 +1684,6 @@ def make_operator(impl, schemas = None, name = None) -> PlannedIndividualOp:
             operatorObj = TrainedIndividualOp(name, impl, schemas)
         if hasattr(impl, 'get_params'):
             operatorObj._hyperparams = {**impl.get_params()}
-    operatorObj._check_schemas()
-    _all_available_operators.append(operatorObj)
     return operatorObj
 
 def get_available_operators(tag: str, more_tags: AbstractSet[str] = None) -> List[PlannedOperator]:
@@ -2034,6 +2108,94 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
         self._trained = result
         return result
 
+    def partial_fit(self, X, y=None, classes=None)->'TrainedPipeline':
+        """Incrementally update the pipeline with another chunk of data.
+
+        Steps are visited in topological order. Steps that implement
+        partial_fit are updated with their inputs for this chunk: a
+        trainable step starts from a fresh clone, whereas a trained step
+        keeps learning in place. Trained steps that cannot learn
+        incrementally, as well as frozen trained steps, are left unchanged
+        and only transform the chunk for their successors.
+
+        Parameters
+        ----------
+        X :
+            Features of the chunk.
+        y :
+            Labels of the chunk, for supervised pipelines.
+        classes : array, optional
+            All class labels of the stream, passed to the partial_fit of
+            the steps that accept it. Some classifiers require it for the
+            first chunk.
+
+        Returns
+        -------
+        result : TrainedPipeline
+        """
+        X = lale.datasets.data_schemas.add_schema(X)
+        y = lale.datasets.data_schemas.add_schema(y)
+        self.validate_schema(X, y)
+        trained_steps:List[TrainedOperator] = [ ]
+        outputs:Dict[Operator, Any] = { }
+        meta_outputs:Dict[Operator, Any] = {}
+        trained_map:Dict[TrainableOpType, TrainedOperator] = {}
+        sink_nodes = self._find_sink_nodes()
+        for operator in self._steps:
+            preds = self._preds[operator]
+            if len(preds) == 0:
+                inputs = [X]
+                meta_data_inputs:Dict[Operator, Any] = {}
+            else:
+                inputs = [outputs[pred] for pred in preds]
+                meta_data_inputs = {key: meta_outputs[pred][key] for pred in preds 
+                        if meta_outputs[pred] is not None for key in meta_outputs[pred]}
+            if len(inputs) == 1:
+                inputs = inputs[0]
+            if hasattr(operator._impl, "set_meta_data"):
+                operator._impl_instance().set_meta_data(meta_data_inputs)
+            if isinstance(inputs, tuple):#This is the case for transformers which return X and y, such as resamplers.
+                inputs, y = inputs
+            trained:TrainedIndividualOp
+            if hasattr(operator._impl, 'partial_fit') and not operator.is_frozen_trained():
+                if not operator.is_supervised():
+                    trained = operator.partial_fit(inputs)
+                else:
+                    trained = operator.partial_fit(inputs, y, **_partial_fit_classes(
+                        operator._impl_instance(), classes))
+            elif isinstance(operator, TrainedIndividualOp):
+                trained = operator
+            else:
+                raise AttributeError(f'{operator.name()} has no partial_fit implemented and is not trained, so it cannot be trained incrementally.')
+            trained_map[operator] = trained
+            trained_steps.append(trained)
+            if operator not in sink_nodes:
+                meta_output:Dict[Operator, Any] = {}
+                if trained.is_transformer():
+                    output = trained.transform(X = inputs, y = y)
+                    if hasattr(trained._impl, "get_transform_meta_output"):
+                        meta_output = trained._impl_instance().get_transform_meta_output()
+                else:
+                    if hasattr(trained._impl, 'predict_proba'):
+                        output = trained.predict_proba(X = inputs)
+                    elif hasattr(trained._impl, 'decision_function'):
+                        output = trained.decision_function(X = inputs)
+                    else:
+                        output = trained._predict(X = inputs)
+                    if hasattr(trained._impl, "get_predict_meta_output"):
+                        meta_output = trained._impl_instance().get_predict_meta_output()
+                outputs[operator] = output
+                meta_output_so_far = {key:meta_outputs[pred][key] for pred in preds 
+                        if meta_outputs[pred] is not None for key in meta_outputs[pred]}
+                meta_output_so_far.update(meta_output)#So newest gets preference in case of collisions
+                meta_outputs[operator] = meta_output_so_far
+
+        trained_edges = [(trained_map[a], trained_map[b]) for (a, b) in self.edges()]
+        trained_steps2:Any = trained_steps
+        result:TrainedPipeline = TrainedPipeline(trained_steps2, trained_edges, ordered=True)
+        self._trained = result
+        return result
+
     def transform(self, X, y = None):
         """
         .. deprecated:: 0.0.0
@@ -2119,7 +2281,7 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
             pass #TODO
         return out
     
-    def fit_with_batches(self, X, y=None, serialize=True, num_epochs_batching=None):
+    def fit_with_batches(self, X, y=None, serialize=True, num_epochs_batching=None, num_prefetch=0, timings=None):
         """[summary]
         
         Parameters
@@ -2129,6 +2291,14 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
         y : [type], optional
             For a supervised pipeline, this is an array with the unique class labels 
             in the entire dataset, by default None
+        num_prefetch : int, optional
+            Number of batches to load ahead in a background thread while
+            the current batch is being processed, by default 0
+        timings : list, optional
+            If given, one record per operator and epoch is appended to it,
+            with the number of rows, the seconds spent waiting for batches
+            to load, the seconds spent computing on them, and the
+            throughput in rows per second, by default None
         Returns
         -------
         [type]
@@ -2168,39 +2338,22 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
             else:
                 raise AttributeError("All operators to be trained with batching need to implement partial_fit. {} doesn't.".format(operator.name()))
             inputs_for_transform = inputs
-            for epoch in range(num_epochs):
-                training_loss = 0
-                nb_tr_examples, nb_tr_steps = 0, 0  
-                for _, batch_data in enumerate(inputs):#batching_transformer will output only one obj
-                    if isinstance(batch_data, tuple):
-                        batch_X, batch_y = batch_data
-                    elif isinstance(batch_data, list):
-                        batch_X = batch_data[0]
-                        batch_y = batch_data[1]
-                    else:
-                        batch_X = batch_data
-                        batch_y = None
-                    if trainable.is_supervised():
-                        try:
-                            trained = trainable.partial_fit(batch_X, batch_y, classes = y)
-                        except TypeError:
-                            trained = trainable.partial_fit(batch_X, batch_y)
-                    else:
-                        trained = trainable.partial_fit(batch_X)
+            trained = _partial_fit_with_batches(trainable, inputs, y, num_epochs,
+                num_prefetch=num_prefetch, timings=timings)
             trained = TrainedIndividualOp(trained.name(), trained._impl, trained._schemas)                
             trained_map[operator] = trained
             trained_steps.append(trained)
 
             output = None
-            for batch_idx, batch_data in enumerate(inputs_for_transform):#batching_transformer will output only one obj
-                if isinstance(batch_data, tuple):
-                    batch_X, batch_y = batch_data
-                elif isinstance(batch_data, list):
-                    batch_X = batch_data[0]
-                    batch_y = batch_data[1]
-                else:
-                    batch_X = batch_data
-                    batch_y = None
+            load_time, compute_time = 0.0, 0.0
+            start = time.time()
+            batches = lale.helpers.prefetch_batches(inputs_for_transform, num_prefetch)
+            n_rows = 0
+            for batch_idx, batch_data in enumerate(batches):#batching_transformer will output only one obj
+                load_time += time.time() - start
+                start = time.time()
+                batch_X, batch_y = _split_batch(batch_data)
+                n_rows += len(batch_X)
                 if trained.is_transformer():
                     batch_output = trained.transform(batch_X, batch_y)
                 else:
@@ -2228,14 +2381,17 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
                         output = lale.helpers.append_batch(output, (batch_output, batch_y)) 
                     else:
                         output = lale.helpers.append_batch(output, batch_output) 
+                compute_time += time.time() - start
+                start = time.time()
+            _record_batch_timings(timings, operator, 'transform', None, n_rows, load_time, compute_time)
             if serialize:
                 output.close()
-                output = lale.helpers.create_data_loader(os.path.join(serialization_out_dir, 'fit_with_batches'+str(operator_idx)+'.hdf5'), batch_size=inputs_for_transform.batch_size)
+                output = lale.helpers.create_data_loader(os.path.join(serialization_out_dir, 'fit_with_batches'+str(operator_idx)+'.hdf5'), batch_size=lale.helpers.get_batch_size(inputs_for_transform))
             else: 
                 if isinstance(output, tuple):
-                    output = lale.helpers.create_data_loader(X = output[0], y=output[1], batch_size=inputs_for_transform.batch_size)
+                    output = lale.helpers.create_data_loader(X = output[0], y=output[1], batch_size=lale.helpers.get_batch_size(inputs_for_transform))
                 else:
-                    output = lale.helpers.create_data_loader(X = output, y = None, batch_size=inputs_for_transform.batch_size)
+                    output = lale.helpers.create_data_loader(X = output, y = None, batch_size=lale.helpers.get_batch_size(inputs_for_transform))
             outputs[operator] = output
             operator_idx += 1
 
@@ -2254,6 +2410,71 @@ class TrainablePipeline(PlannedPipeline[TrainableOpType], TrainableOperator):
         # Currently, all TrainedPipelines implement transform
         return True
 
+def _split_batch(batch_data):
+    if isinstance(batch_data, tuple):
+        batch_X, batch_y = batch_data
+    elif isinstance(batch_data, list):
+        batch_X = batch_data[0]
+        batch_y = batch_data[1]
+    else:
+        batch_X = batch_data
+        batch_y = None
+    return batch_X, batch_y
+
+def _record_batch_timings(timings, operator, stage, epoch, n_rows, load_time, compute_time):
+    total_time = load_time + compute_time
+    throughput = n_rows / total_time if total_time > 0 else float('nan')
+    logger.info(f'{operator.name()} {stage} epoch {epoch}: {n_rows} rows, '
+                f'load {load_time:.3f}s, compute {compute_time:.3f}s, '
+                f'{throughput:.1f} rows/s')
+    if timings is not None:
+        timings.append({
+            'name': operator.name(), 'stage': stage, 'epoch': epoch,
+            'n_rows': n_rows, 'load_time': load_time,
+            'compute_time': compute_time, 'rows_per_second': throughput})
+
+def _partial_fit_classes(impl, classes)->Dict[str, Any]:
+    """Fit params passing classes to impl.partial_fit, if it accepts them."""
+    if classes is not None and 'classes' in inspect.signature(impl.partial_fit).parameters:
+        return {'classes': classes}
+    return {}
+
+def _partial_fit_with_batches(trainable, batches, classes, num_epochs, shuffle_batches=False, random_state=None, num_prefetch=0, timings=None):
+    trained:Optional[TrainedIndividualOp] = None
+    def partial_fit(batch_X, batch_y):
+        if trained is None:
+            #clone only once, so training starts afresh even if trainable was trained before
+            op, impl = trainable, trainable._clone_impl()
+        else:
+            op, impl = trained, trained._impl_instance()
+        if not trainable.is_supervised():
+            return op._partial_fit_impl(impl, batch_X, None, {})
+        return op._partial_fit_impl(
+            impl, batch_X, batch_y, _partial_fit_classes(impl, classes))
+    if shuffle_batches:
+        rng = random.Random(random_state)
+    for epoch in range(num_epochs):
+        if shuffle_batches:
+            order = list(range(len(batches)))
+            rng.shuffle(order)
+            epoch_batches:Iterable[Any] = (batches[i] for i in order)
+        else:
+            epoch_batches = batches
+        load_time, compute_time, n_rows = 0.0, 0.0, 0
+        start = time.time()
+        for batch_data in lale.helpers.prefetch_batches(epoch_batches, num_prefetch):
+            load_time += time.time() - start
+            start = time.time()
+            batch_X, batch_y = _split_batch(batch_data)
+            trained = partial_fit(batch_X, batch_y)
+            n_rows += len(batch_X)
+            compute_time += time.time() - start
+            start = time.time()
+        _record_batch_timings(timings, trainable, 'partial_fit', epoch, n_rows, load_time, compute_time)
+    if trained is None:
+        raise ValueError(f'{trainable.name()}.fit_with_batches() got no batches.')
+    return trained
+
 TrainedOpType = TypeVar('TrainedOpType', bound=TrainedIndividualOp)
 
 class TrainedPipeline(TrainablePipeline[TrainedOpType], TrainedOperator):
@@ -2403,7 +2624,7 @@ class TrainedPipeline(TrainablePipeline[TrainedOpType], TrainedOperator):
             outputs[operator] = output
         return outputs[self._steps[-1]]
 
-    def transform_with_batches(self, X, y=None, serialize = True):
+    def transform_with_batches(self, X, y=None, serialize = True, num_prefetch=0):
         """[summary]
         
         Parameters
@@ -2412,6 +2633,9 @@ class TrainedPipeline(TrainablePipeline[TrainedOpType], TrainedOperator):
             [description]
         y : [type], optional
             by default None
+        num_prefetch : int, optional
+            Number of batches to load ahead in a background thread while
+            the current batch is being processed, by default 0
         Returns
         -------
         [type]
@@ -2436,7 +2660,8 @@ class TrainedPipeline(TrainablePipeline[TrainedOpType], TrainedOperator):
                 inputs = inputs[0]
             trained = operator
             output = None
-            for batch_idx, batch_data in enumerate(inputs):#batching_transformer will output only one obj
+            batches = lale.helpers.prefetch_batches(inputs, num_prefetch)
+            for batch_idx, batch_data in enumerate(batches):#batching_transformer will output only one obj
                 if isinstance(batch_data, Tuple):
                     batch_X, batch_y = batch_data
                 else:
@@ -2471,12 +2696,12 @@ class TrainedPipeline(TrainablePipeline[TrainedOpType], TrainedOperator):
                         output = lale.helpers.append_batch(output, batch_output)
             if serialize:
                 output.close()
-                output = lale.helpers.create_data_loader(os.path.join(serialization_out_dir, 'fit_with_batches'+str(operator_idx)+'.hdf5'), batch_size=inputs.batch_size)
+                output = lale.helpers.create_data_loader(os.path.join(serialization_out_dir, 'fit_with_batches'+str(operator_idx)+'.hdf5'), batch_size=lale.helpers.get_batch_size(inputs))
             else: 
                 if isinstance(output, tuple):
-                    output = lale.helpers.create_data_loader(X = output[0], y=output[1], batch_size=inputs.batch_size)
+                    output = lale.helpers.create_data_loader(X = output[0], y=output[1], batch_size=lale.helpers.get_batch_size(inputs))
                 else:
-                    output = lale.helpers.create_data_loader(X = output, y = None, batch_size=inputs.batch_size)            
+                    output = lale.helpers.create_data_loader(X = output, y = None, batch_size=lale.helpers.get_batch_size(inputs))            
             outputs[operator] = output
             operator_idx += 1
 
@@ -14,6 +14,7 @@
 
 import logging
 import itertools
+import json
 import jsonschema
 
 from .schema_ranges import SchemaRange
@@ -116,14 +117,52 @@ def liftAnyOf(schemas:List[Schema])->Iterator[Schema]:
 def impossible()->Schema:
     return SFalse
 
+# Simplifying a planned pipeline checks the enumerations of the same
+# hyperparameter schemas against the same sub-schemas many times, and
+# checking a schema is much more expensive than validating a value.
+# So validators are interned by a structural key of their schema.
+_max_validators = 4096
+_validators:Dict[str, Any] = {}
+
+def _structural_key(s:Any)->Optional[str]:
+    """A key that is equal for structurally equal JSON values, or None if s is not JSON."""
+    try:
+        return json.dumps(s, sort_keys=True, allow_nan=True)
+    except (TypeError, ValueError):
+        return None
+
+def _draft4_validator(s:Schema)->jsonschema.Draft4Validator:
+    """Returns a validator for s, raising jsonschema.SchemaError if s is not a valid schema."""
+    key = _structural_key(s)
+    result = None if key is None else _validators.get(key, None)
+    if result is None:
+        try:
+            jsonschema.Draft4Validator.check_schema(s)
+            result = jsonschema.Draft4Validator(s)
+        except jsonschema.SchemaError as error:
+            result = error
+        if key is not None:
+            if len(_validators) >= _max_validators:
+                _validators.clear()
+            _validators[key] = result
+    if isinstance(result, jsonschema.SchemaError):
+        raise result
+    return result
+
 def enumValues(es:set_with_str_for_keys[Any], s:Schema)->set_with_str_for_keys[Any]:
     """Given an enumeration set and a schema, return all the consistent values of the enumeration."""
-    # TODO: actually check.  This should call the json schema validator
     ret = list()
+    try:
+        validator = _draft4_validator(s)
+    except jsonschema.SchemaError as error:
+        validator = None
+        schema_error = error
     try:
         for e in es:
             try:
-                jsonschema.validate(e, s, jsonschema.Draft4Validator)
+                if validator is None:
+                    raise schema_error
+                validator.validate(e)
                 ret.append(e)
             except:
                 logger.debug(f"enumValues: {e} removed from {es} because it does not validate according to {s}")
@@ -55,9 +55,10 @@ T = TypeVar('T')
 class FrequencyDistribution(Generic[T]):
     """ Represents the distribution implied by a histogram
     """
-    freq_dist:np.array # Array[T,int]
-    vals:np.array # Array[T]
-    cumulative_freqs:np.array # Array[int] 
+    vals:np.ndarray # Array[T], without the default value
+    frequencies:np.ndarray # Array[int], with the frequency of the default value last
+    cumulative_freqs:np.ndarray # Array[int]
+    has_default:bool
 
     @classmethod
     def asIntegerValues(cls, freqs:Iterable[Tuple[Any, int]], inclusive_min:Optional[int]=None, inclusive_max:Optional[int]=None)->'FrequencyDistribution[int]':
@@ -77,14 +78,19 @@ class FrequencyDistribution(Generic[T]):
     def __init__(self, freqs:Iterable[Tuple[Defaultable[T], int]], dtype=object):
         # we need them to be sorted for locality
         sorted_freq_list = sorted(freqs, key = (lambda k: (k[0] is _default_value, None if k[0] is _default_value else k[0])))
-        freqs_array = np.array(sorted_freq_list, dtype=[('value',object),('frequency',int)])
-#        freqs_array.sort(order='value')
-        self.freq_dist = freqs_array
-
-        self.vals = freqs_array['value']
-        self.cumulative_freqs = np.cumsum(freqs_array['frequency'])
+        # the default value sorts last, and is kept out of the typed array of values
+        self.has_default = len(sorted_freq_list) > 0 and sorted_freq_list[-1][0] is _default_value
+        n_vals = len(sorted_freq_list) - 1 if self.has_default else len(sorted_freq_list)
+        # filled element-wise, so that numpy does not turn tuples into extra dimensions
+        self.vals = np.empty(n_vals, dtype=dtype)
+        for i in range(n_vals):
+            self.vals[i] = sorted_freq_list[i][0]
+        self.frequencies = np.array([f for _, f in sorted_freq_list], dtype=np.int64)
+        self.cumulative_freqs = np.cumsum(self.frequencies)
 
     def __len__(self):
+        if len(self.cumulative_freqs) == 0:
+            return 0
         return np.int_(self.cumulative_freqs[-1])
     
     @overload
@@ -97,20 +103,18 @@ class FrequencyDistribution(Generic[T]):
     def __getitem__(self, key: slice) -> Sequence[T]: ...
 
     def __getitem__(self, key: Union[int, Sequence[int], slice]) -> Union[T, Sequence[T]]:
-        indices:Sequence[int]
+        indices:Any
         single = False
-        if isinstance(key, (int, float)):
+        if isinstance(key, (int, float, np.integer)):
             single = True
             indices = [key]
         elif isinstance(key, slice):
-            # TODO: this could be made more efficient
-            indices = range(key.start or 0, key.stop or len(self), key.step or 1)
+            indices = np.arange(*key.indices(len(self)))
         else:
             indices = key
 
-        val_indices:Sequence[int] = np.searchsorted(self.cumulative_freqs, indices, side='right')
-
-        values = self.vals[val_indices].tolist()
+        val_indices = np.searchsorted(self.cumulative_freqs, indices, side='right')
+        values = self._values_at(val_indices)
 
         if single:
             assert len(values) == 1
@@ -118,15 +122,36 @@ class FrequencyDistribution(Generic[T]):
         else:
             return values
 
+    def _values_at(self, val_indices:np.ndarray)->List[Any]:
+        if not self.has_default:
+            return self.vals[val_indices].tolist()
+        is_default = val_indices == len(self.vals)
+        values = self.vals[np.where(is_default, 0, val_indices)].tolist() if len(self.vals) > 0 else [None] * len(val_indices)
+        for i in np.flatnonzero(is_default):
+            values[i] = _default_value
+        return values
+
     def sample(self)->T:
         l = len(self)
         i = random.randrange(l)
         return self[i]
 
     def samples(self, count:int)->Sequence[T]:
-        l = len(self)
-        i:Sequence[int] = [random.randrange(l) for _ in range(count)]
-        return self[i]
+        """ Draws count values at once with a single uniform draw from numpy.
+            The numpy generator is seeded from the random module,
+            so random.seed still makes the samples reproducible.
+        """
+        rng = np.random.RandomState(random.randrange(2**32))
+        u = rng.random_sample(count) * len(self)
+        val_indices = np.searchsorted(self.cumulative_freqs, u, side='right')
+        return self._values_at(val_indices)
+
+    def probabilities(self)->List[Tuple[Defaultable[T], float]]:
+        """ The values, including the default value if present, with their probabilities.
+        """
+        values = self._values_at(np.arange(len(self.frequencies)))
+        probs = (self.frequencies / self.frequencies.sum()).tolist()
+        return list(zip(values, probs))
 
 
 # utiltities to convert and sample from a PGO frequency distribution
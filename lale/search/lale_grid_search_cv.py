@@ -40,6 +40,33 @@ def get_lale_gridsearchcv_op(op, params, **kwargs):
 #    return Ops.TrainableIndividualOp(_name=name, _impl=g, _schemas=None)
 
 
+def _is_parallel(n_jobs:Optional[int])->bool:
+    import joblib
+    return joblib.effective_n_jobs(n_jobs) != 1
+
+def share_data_with_workers(data, folder:str):
+    """ Dumps a plain numpy array, or a pandas frame or series with a single
+        numeric dtype, into folder and returns a read-only memory map of it.
+        joblib sends memory-mapped arrays to worker processes by file name,
+        so the data is written once instead of being pickled for every task.
+        Anything else, for instance data with a schema, is returned unchanged.
+    """
+    import os
+    import joblib
+    import pandas as pd
+    def dump_and_map(array:np.ndarray)->np.ndarray:
+        file_name = os.path.join(folder, f'data{len(os.listdir(folder))}.joblib')
+        joblib.dump(array, file_name)
+        return joblib.load(file_name, mmap_mode='r')
+    if type(data) is np.ndarray and data.dtype != object:
+        return dump_and_map(data)
+    if type(data) is pd.DataFrame and len(set(data.dtypes)) == 1 and data.dtypes.iloc[0] != object \
+       and np.issubdtype(data.dtypes.iloc[0], np.number):
+        return pd.DataFrame(dump_and_map(data.values), index=data.index, columns=data.columns, copy=False)
+    if type(data) is pd.Series and data.dtype != object and np.issubdtype(data.dtype, np.number):
+        return pd.Series(dump_and_map(data.values), index=data.index, name=data.name, copy=False)
+    return data
+
 def get_parameter_grids(
     op:'PlannedOperator', 
     num_samples:Optional[int]=None, 
@@ -15,7 +15,6 @@
 from typing import Any, Dict, Iterable, List, Optional
 import os
 import math
-import re
 
 from lale.search.search_space import *
 from lale.util.Visitor import Visitor, accept
@@ -42,10 +41,6 @@ def _mk_label(label, counter, useCounter = True):
     else:
         return f"{label}{counter}"
 
-@scope.define
-def pgo_sample(pgo, sample):
-     return pgo[sample]
-
 @scope.define
 def make_nested_hyperopt(space):
     return helpers.NestedHyperoptSpace(space)
@@ -84,6 +79,8 @@ class SearchSpaceHPExprVisitor(Visitor):
 
         if len(space.vals) == 1:
             return as_hp_vals(space.vals[0])
+        elif space.pgo is not None and len(space.pgo) > 0:
+            return hp.pchoice(self.mk_label(path, counter), [ (p, as_hp_vals(v)) for v, p in space.pgo.probabilities()])
         else:
             return hp.choice(self.mk_label(path, counter), [ as_hp_vals(v) for v in space.vals])
 
@@ -93,8 +90,9 @@ class SearchSpaceHPExprVisitor(Visitor):
     def visitSearchSpaceNumber(self, space:SearchSpaceNumber, path:str, counter=None):
         label = self.mk_label(path, counter)
 
-        if space.pgo is not None:
-            return scope.pgo_sample(space.pgo, hp.quniform(label, 0, len(space.pgo)-1, 1))
+        if space.pgo is not None and len(space.pgo) > 0:
+            # a native categorical prior, which TPE models directly
+            return hp.pchoice(label, [(p, v) for v, p in space.pgo.probabilities()])
 
         dist = "uniform"
         if space.distribution:
@@ -205,11 +203,20 @@ class SearchSpaceHPExprVisitor(Visitor):
     def visitSearchSpaceEmpty(self, op:SearchSpaceEmpty, path:str, counter=None):
         raise SearchSpaceError(path, "The hyperopt backend can't compile an empty (sub-) search space")
 
+def _val_as_str(v):
+    if v is None:
+        return "null"
+    elif isinstance(v, str):
+        return f"'{v}'"
+    else:
+        return str(v)
+
+def _pgo_options_str(pgo:FrequencyDistribution)->str:
+    return "[" + ", ".join([f"({p}, {_val_as_str(v)})" for v, p in pgo.probabilities()]) + "]"
+
 class SearchSpaceHPStrVisitor(Visitor):
-    pgo_dict:Dict[str, FrequencyDistribution]
     names:Dict[str,int]
 
-    pgo_header:Optional[str]
     nested_header:Optional[str]
     decls:str
 
@@ -218,8 +225,6 @@ class SearchSpaceHPStrVisitor(Visitor):
         visitor = cls(name)
         ret:str = ""
         body = accept(space, visitor, name, counter=counter, useCounter=useCounter)
-        if visitor.pgo_header is not None:
-            ret += visitor.pgo_header
         if visitor.nested_header is not None:
             ret += visitor.nested_header
         if visitor.decls:
@@ -251,26 +256,17 @@ class SearchSpaceHPStrVisitor(Visitor):
 
     def __init__(self, name:str):
         super(SearchSpaceHPStrVisitor, self).__init__()
-        self.pgo_dict = {}
         self.names = {}
-        self.pgo_header = None
         self.nested_header = None
         self.decls = ""
 
     def visitSearchSpaceEnum(self, space:SearchSpaceEnum, path:str, counter=None, useCounter=True):
-
-        def val_as_str(v):
-            if v is None:
-                return "null"
-            elif isinstance(v, str):
-                return f"'{v}'"
-            else:
-                return str(v)
-
         if len(space.vals) == 1:
-            return val_as_str(space.vals[0])
+            return _val_as_str(space.vals[0])
+        elif space.pgo is not None and len(space.pgo) > 0:
+            return f"hp.pchoice('{self.mk_label(path, counter, useCounter)}', {_pgo_options_str(space.pgo)})"
         else:
-            vals_str = "[" + ", ".join([val_as_str(v) for v in space.vals]) + "]"
+            vals_str = "[" + ", ".join([_val_as_str(v) for v in space.vals]) + "]"
             return f"hp.choice('{self.mk_label(path, counter, useCounter)}', {vals_str})"
 
     visitSearchSpaceConstant = visitSearchSpaceEnum
@@ -279,9 +275,8 @@ class SearchSpaceHPStrVisitor(Visitor):
     def visitSearchSpaceNumber(self, space:SearchSpaceNumber, path:str, counter=None, useCounter=True):
         label = self.mk_label(path, counter, useCounter=useCounter)
 
-        if space.pgo is not None:
-            self.pgo_dict[label] = space.pgo
-            return f"scope.pgo_sample(pgo_{label}, hp.quniform('{label}', {0}, {len(space.pgo)-1}, 1))"
+        if space.pgo is not None and len(space.pgo) > 0:
+            return f"hp.pchoice('{label}', {_pgo_options_str(space.pgo)})"
 
 
         dist = "uniform"
@@ -378,34 +373,6 @@ class SearchSpaceHPStrVisitor(Visitor):
             s_decls.append(f"{space_name}['{k}'] = {any_name}[{i}]")
             i = i + 1
         
-        pgo_decls_str:str = ""
-        if self.pgo_dict:
-            if not self.pgo_header:
-                self.pgo_header = """
-@scope.define
-def pgo_sample(pgo, sample):
-    return pgo[sample]
-
-"""
-
-            # use this to sort the pgo_labels by the unique ind
-            # appended to the key.
-            # This puts them in the order they appear in the hyperopt
-            # expression, making it easier to read
-            def last_num(kv):
-                matches = re.search('(\d+)$', kv[0])
-                if matches is None:
-                    return 0
-                else:
-                    return int(matches.group(0))
-
-            pgo_decls:List[str] = []
-            for k,v in sorted(self.pgo_dict.items(), key=last_num):
-                l = v.freq_dist.tolist()
-                pgo_decls.append(f"pgo_{k} = {l}")
-            if self.decls:
-                self.decls = self.decls + "\n"
-            self.decls = self.decls + "\n".join(pgo_decls)
         self.decls += "\n".join(s_decls) + "\n"
         return space_name
 
@@ -0,0 +1,137 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import random
+import warnings
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from lale.search.search_space_grid import op_to_search_space_grids, stratified_grid_indices, SearchSpaceGrid
+from lale.search.search_space import SearchSpacePrimitive, SearchSpaceEnum, SearchSpaceNumber
+from lale.search.PGO import PGO
+from lale.sklearn_compat import make_sklearn_compat
+
+import numpy as np
+
+try:
+    from scipy.stats import qmc
+    qmc_installed = True
+except ImportError:
+    qmc_installed = False
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import lale.operators as Ops
+
+samplers = ['sobol', 'lhs', 'uniform']
+
+def unit_samples(n:int, d:int, sampler:str, rng:np.random.RandomState)->np.ndarray:
+    """ Returns an n by d array of points in the unit hypercube [0, 1)^d.
+        sobol: scrambled Sobol sequence, lhs: Latin hypercube, uniform: independent uniform.
+    """
+    if d == 0 or n == 0:
+        return np.zeros((n, d))
+    if sampler == 'uniform':
+        return rng.random_sample((n, d))
+    if sampler == 'lhs':
+        # one point in each of the n strata of every dimension, permuted independently per dimension
+        strata = np.argsort(rng.random_sample((n, d)), axis=0)
+        return (strata + rng.random_sample((n, d))) / n
+    if sampler == 'sobol':
+        if not qmc_installed:
+            raise ValueError("The sobol sampler requires scipy.stats.qmc (scipy>=1.7), please use the lhs sampler instead.")
+        with warnings.catch_warnings():
+            # the balance properties are best for powers of two, but any n is fine
+            warnings.simplefilter("ignore")
+            engine = qmc.Sobol(d, scramble=True, seed=rng.randint(2**31))
+            return engine.random(n)
+    raise ValueError(f"unknown sampler {sampler}, expected one of {samplers}")
+
+def _number_values(key:str, hp:SearchSpaceNumber, u:np.ndarray)->List[Any]:
+    if hp.pgo is not None:
+        return list(hp.pgo[(u * len(hp.pgo)).astype(int).tolist()])
+    dist = hp.distribution or "uniform"
+    if hp.maximum is None:
+        raise ValueError(f"maximum not specified for a number with distribution {dist} for {key}")
+    if hp.minimum is None:
+        raise ValueError(f"minimum not specified for a number with distribution {dist} for {key}")
+    lo, hi = hp.getInclusiveMin(), hp.getInclusiveMax()
+    if dist == "uniform" or dist == "integer":
+        if hp.discrete:
+            values = np.minimum(np.floor(lo + u * (hi - lo + 1)), hi)
+        else:
+            values = lo + u * (hi - lo)
+    elif dist == "loguniform":
+        if lo <= 0:
+            raise ValueError(f"loguniform distribution needs a positive minimum for {key}")
+        values = np.exp(np.log(lo) + u * (np.log(hi) - np.log(lo)))
+        if hp.discrete:
+            values = np.clip(np.floor(values), lo, hi)
+    else:
+        raise ValueError(f"unknown/unsupported distribution {dist} for {key}")
+    if hp.discrete:
+        return values.astype(int).tolist()
+    return values.tolist()
+
+def _enum_values(hp:SearchSpaceEnum, u:np.ndarray)->List[Any]:
+    if hp.pgo is not None:
+        return list(hp.pgo[(u * len(hp.pgo)).astype(int).tolist()])
+    indices = np.minimum((u * len(hp.vals)).astype(int), len(hp.vals) - 1)
+    return [hp.vals[i] for i in indices]
+
+def sample_grid(grid:SearchSpaceGrid, n:int, sampler:str, rng:np.random.RandomState)->List[Dict[str, Any]]:
+    """ Samples n points of a grid, drawing all its non-constant dimensions at once from one unit sequence."""
+    varying:List[Tuple[str, SearchSpacePrimitive]] = []
+    fixed:Dict[str, Any] = {}
+    for k, v in grid.items():
+        if isinstance(v, SearchSpaceEnum) and len(v.vals) == 1:
+            fixed[k] = v.vals[0]
+        else:
+            varying.append((k, v))
+    u = unit_samples(n, len(varying), sampler, rng)
+    columns:Dict[str, List[Any]] = {}
+    for j, (k, v) in enumerate(varying):
+        if isinstance(v, SearchSpaceNumber):
+            columns[k] = _number_values(k, v, u[:, j])
+        elif isinstance(v, SearchSpaceEnum):
+            columns[k] = _enum_values(v, u[:, j])
+        else:
+            raise ValueError(f"Not yet supported hp description ({type(v)}) (key: {k}) in the random search backend")
+    return [{**fixed, **{k: col[i] for k, col in columns.items()}} for i in range(n)]
+
+def get_random_search_samples(op:'Ops.PlannedOperator',
+                              n:int,
+                              sampler:str='lhs',
+                              random_state:Optional[int]=None,
+                              pgo:Optional[PGO]=None)->List[Dict[str, Any]]:
+    """ Top level function: given a lale operator, returns n hyperparameter settings in sklearn format.
+        The samples are stratified over the choices in the operator,
+        and all numeric and categorical hyperparameters of a grid are drawn
+        jointly from one quasi-random sequence.
+    """
+    grids:Sequence[SearchSpaceGrid] = op_to_search_space_grids(op, pgo=pgo)
+    rng = np.random.RandomState(random_state)
+    rnd = random.Random(random_state)
+    counts = collections.Counter(stratified_grid_indices(grids, n, rnd))
+    result:List[Dict[str, Any]] = []
+    for index in sorted(counts):
+        result.extend(sample_grid(grids[index], counts[index], sampler, rng))
+    # interleave the strata, so that stopping early still covers all choices evenly
+    rnd.shuffle(result)
+    return result
+
+def lale_trainable_op_from_params(op:'Ops.PlannedOperator', params:Dict[str, Any])->'Ops.TrainableOperator':
+    from sklearn.base import clone
+    wrapped_op = clone(make_sklearn_compat(op))
+    return wrapped_op.set_params(**params).to_lale()
@@ -28,6 +28,7 @@ from lale.schema_utils import Schema, getMinimum, getMaximum, STrue, SFalse, is_
 from lale.search.search_space import *
 from lale.search.lale_hyperopt import search_space_to_str_for_comparison
 from lale.search.PGO import PGO, FrequencyDistribution, Freqs
+import lale.search.search_space_cache
 
 from lale.operators import *
 
@@ -142,7 +143,9 @@ class SearchSpaceOperatorVisitor(Visitor):
         else:
             long_name = module + '.' + op.name()
         name = op.name()
-        space = self.schemaToSearchSpace(long_name, name, schema)
+        space = lale.search.search_space_cache.lookup(
+            op, long_name, name, self.pgo,
+            lambda: self.schemaToSearchSpace(long_name, name, schema))
         if space is None:
             space = SearchSpaceEmpty()
         # we now augment the search space as needed with the specified hyper-parameters
@@ -385,7 +388,7 @@ class SearchSpaceOperatorVisitor(Visitor):
                     if k in anys:
                         logger.info(f"Ignoring Duplicate SearchSpace entry {k}")
                     anys[k] = o_choice
-                return SearchSpaceObject(longName, all_keys, anys.values())
+                return SearchSpaceObject(longName, all_keys, list(anys.values()))
             else:
                 return SearchSpaceObject(longName, [], [])
         
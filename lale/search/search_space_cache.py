@@ -0,0 +1,176 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide cache of the search spaces of individual operators.
+
+Compiling the hyperparameter schema of an operator into a search space
+(finding relevant fields, simplifying, filtering for the optimizer) is
+expensive, and every Hyperopt or grid search construction, including
+clones, used to do it again. The result only depends on the schemas of
+the operator, on its bound hyperparameters, and on the PGO data, so it
+is cached on the identity of the schemas and PGO objects plus a frozen
+form of the hyperparameters. Callers get a deep copy, since search
+spaces are augmented in place.
+
+The search spaces of the operators in lale.lib.sklearn can also be
+precompiled into a file with precompile. Building the package does this
+into the installed package, and users can precompile into a writable
+file of their own and point the LALE_PRECOMPILED_SEARCH_SPACES
+environment variable at it. That file is read on the first cache miss,
+not at import time, and its entries are keyed by a digest of the schema
+and of the code that compiles it, so they are ignored when either
+changes."""
+
+import collections
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+max_entries = 1024
+
+_package_dir = os.path.dirname(__file__)
+
+#generated when building the package, see setup.py
+shipped_path = os.path.join(_package_dir, 'precompiled_search_spaces.pickle')
+
+precompiled_path = os.environ.get('LALE_PRECOMPILED_SEARCH_SPACES', shipped_path)
+
+#source files whose changes can change the compiled search spaces
+_compiler_files = [
+    os.path.join(_package_dir, file_name) for file_name in [
+        'schema2search_space.py', 'search_space.py', 'search_space_cache.py',
+        os.path.join('..', 'schema_simplifier.py'),
+        os.path.join('..', 'schema_utils.py'),
+        os.path.join('..', 'schema_ranges.py')]]
+
+_cache:'collections.OrderedDict[Any, Any]' = collections.OrderedDict()
+_lock = threading.Lock()
+_precompiled:Optional[Dict[str, Any]] = None
+_code_version:Optional[str] = None
+
+def _get_code_version()->str:
+    """Digest of the lale version and of the code that compiles search spaces."""
+    global _code_version
+    if _code_version is None:
+        import lale
+        h = hashlib.sha1(lale.__version__.encode('utf-8'))
+        for file_name in _compiler_files:
+            with open(file_name, 'rb') as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+def _freeze(obj)->Optional[str]:
+    try:
+        return json.dumps(obj, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+
+def _digest(long_name:str, name:str, schema)->Optional[str]:
+    frozen = _freeze(schema)
+    if frozen is None:
+        return None
+    key = f'{_get_code_version()}\0{long_name}\0{name}\0{frozen}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def _lookup_precompiled(digest:str):
+    global _precompiled
+    if _precompiled is None:
+        _precompiled = {}
+        if os.path.exists(precompiled_path):
+            try:
+                with open(precompiled_path, 'rb') as f:
+                    _precompiled = pickle.load(f)
+            except Exception as e:
+                logger.warning(f'ignoring precompiled search spaces in {precompiled_path}: {e}')
+    return _precompiled.get(digest, None)
+
+def lookup(op, long_name:str, name:str, pgo, compute:Callable[[], Any]):
+    """Returns a copy of the cached search space of op, calling compute on a cache miss."""
+    schemas = op._schemas
+    hyperparams = getattr(op, '_hyperparams', None)
+    frozen_hyperparams = _freeze(hyperparams) if hyperparams else ''
+    if frozen_hyperparams is None:
+        return compute()
+    key = (id(schemas), long_name, name, frozen_hyperparams, id(pgo))
+    with _lock:
+        entry = _cache.get(key, None)
+        #the entry keeps schemas and pgo alive, so their ids are not reused
+        if entry is not None and entry[0] is schemas and entry[1] is pgo:
+            _cache.move_to_end(key)
+            return copy.deepcopy(entry[2])
+    space = None
+    if pgo is None and not hyperparams:
+        digest = _digest(long_name, name, op._hyperparam_schema_with_hyperparams())
+        if digest is not None:
+            space = _lookup_precompiled(digest)
+    if space is None:
+        space = compute()
+    with _lock:
+        _cache[key] = (schemas, pgo, space)
+        while len(_cache) > max_entries:
+            _cache.popitem(last=False)
+    return copy.deepcopy(space)
+
+def clear()->None:
+    """Empties the in-memory cache, for instance after modifying the schemas of an operator in place."""
+    global _precompiled
+    with _lock:
+        _cache.clear()
+        _precompiled = None
+
+def precompile(path:Optional[str]=None)->int:
+    """Compiles the search spaces of all operators in lale.lib.sklearn into a file, and returns their number.
+
+    The file is precompiled_path by default, which is inside the installed
+    package unless LALE_PRECOMPILED_SEARCH_SPACES is set. A different path
+    is also used by the following lookups in this process."""
+    global precompiled_path
+    import lale.lib.sklearn
+    import lale.operators
+    from lale.search.schema2search_space import SearchSpaceOperatorVisitor
+    if path is None:
+        path = precompiled_path
+    result = {}
+    visitor = SearchSpaceOperatorVisitor()
+    for attr_name in dir(lale.lib.sklearn):
+        op = getattr(lale.lib.sklearn, attr_name)
+        if not isinstance(op, lale.operators.PlannedIndividualOp):
+            continue
+        long_name = op._impl.__module__ + '.' + op.name()
+        schema = op._hyperparam_schema_with_hyperparams()
+        digest = _digest(long_name, op.name(), schema)
+        if digest is None:
+            continue
+        try:
+            result[digest] = visitor.schemaToSearchSpace(long_name, op.name(), schema)
+        except Exception as e:
+            logger.warning(f'not precompiling the search space of {long_name}: {e}')
+    with open(path, 'wb') as f:
+        pickle.dump(result, f)
+    precompiled_path = path
+    clear()
+    return len(result)
+
+if __name__ == '__main__':
+    import sys
+    n_spaces = precompile(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f'precompiled {n_spaces} search spaces into {precompiled_path}')
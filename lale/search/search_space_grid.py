@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import bisect
+import collections.abc
 import itertools
 import warnings
 import random
@@ -23,7 +25,7 @@ from lale.util.Visitor import Visitor, accept
 from lale.search.search_space import SearchSpace, SearchSpaceObject, SearchSpaceConstant, SearchSpaceEnum, SearchSpaceSum, SearchSpaceProduct, SearchSpacePrimitive, SearchSpaceArray, SearchSpaceOperator, should_print_search_space, SearchSpaceEmpty, SearchSpaceError
 from lale.search.schema2search_space import op_to_search_space
 from lale.search.PGO import PGO
-from lale.sklearn_compat import nest_all_HPparams, nest_choice_all_HPparams, DUMMY_SEARCH_SPACE_GRID_PARAM_NAME, discriminant_name, make_indexed_name, make_array_index_name, structure_type_name, structure_type_list, structure_type_tuple, structure_type_dict
+from lale.sklearn_compat import nest_HPparams, nest_choice_HPparams, DUMMY_SEARCH_SPACE_GRID_PARAM_NAME, discriminant_name, make_indexed_name, make_array_index_name, structure_type_name, structure_type_list, structure_type_tuple, structure_type_dict
 
 from lale.operators import PlannedOperator, OperatorChoice, PlannedIndividualOp, PlannedPipeline, Operator
 
@@ -32,7 +34,7 @@ SearchSpaceGrid = Dict[str,SearchSpacePrimitive]
 def search_space_grid_to_string(grid:SearchSpaceGrid)->str:
     return "{" + ";".join(f"{k}->{str(v)}" for k,v in grid.items()) + "}"
 
-def search_space_grids_to_string(grids:List[SearchSpaceGrid])->str:
+def search_space_grids_to_string(grids:Iterable[SearchSpaceGrid])->str:
     return "|".join(search_space_grid_to_string(grid) for grid in grids)
 
 def get_search_space_grids( op:'PlannedOperator', 
@@ -54,45 +56,183 @@ def get_search_space_grids( op:'PlannedOperator',
             name = "an operator"
         print(f"search space grids for {name}:\n{search_space_grids_to_string(all_parameters)}")
     if num_grids is None:
-        return all_parameters
+        return list(all_parameters)
     else:
         if num_grids <= 0:
             warnings.warn(f"get_search_space_grids(num_grids={num_grids}) called with a non-positive value for lale_num_grids")
             return []
+        # sample indices rather than grids, so that only the sampled grids are built
         if num_grids >= 1:
             samples = math.ceil(num_grids)
             if samples >= len(all_parameters):
-                return all_parameters
+                return list(all_parameters)
             else:
                 warnings.warn(f"get_search_space_grids(num_grids={num_grids}) sampling {math.ceil(num_grids)}/{len(all_parameters)}")
-                return random.sample(all_parameters, math.ceil(num_grids))
+                return [all_parameters[i] for i in random.sample(range(len(all_parameters)), math.ceil(num_grids))]
         else:
             samples = round(len(all_parameters)*num_grids)
             warnings.warn(f"get_search_space_grids(num_grids={num_grids}) sampling {samples}/{len(all_parameters)}")
-            return random.sample(all_parameters, samples)
+            return [all_parameters[i] for i in random.sample(range(len(all_parameters)), samples)]
 
-def search_space_to_grids(hp:SearchSpace)->List[SearchSpaceGrid]:
+def search_space_to_grids(hp:SearchSpace)->Sequence[SearchSpaceGrid]:
+    """ Returns the grids of the search space as a lazy sequence, which only builds a grid when it is indexed."""
     return SearchSpaceToGridVisitor.run(hp)
 
 def op_to_search_space_grids(op:PlannedOperator,
-                             pgo:Optional[PGO]=None)->List[SearchSpaceGrid]:
+                             pgo:Optional[PGO]=None)->Sequence[SearchSpaceGrid]:
     search_space = op_to_search_space(op, pgo=pgo)
     grids = search_space_to_grids(search_space)
     return grids
 
+class LazyGrids(collections.abc.Sequence):
+    """ A sequence of grids that are built when they are accessed.
+        The cross products of choices can be much too large to materialize,
+        but they are still indexable in constant time per factor,
+        so sampling a few grids is cheap.
+    """
+    def __len__(self)->int:
+        raise NotImplementedError
+
+    def _get(self, index:int)->SearchSpaceGrid:
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError(f"grid index {index} out of range for {n} grids")
+        return self._get(index)
+
+    def _stratified_indices(self, n:int, rnd:random.Random)->List[int]:
+        return _spread_indices(len(self), n, rnd)
+
+class MappedGrids(LazyGrids):
+    """ The grids of base, each transformed by f."""
+    def __init__(self, base:Sequence[SearchSpaceGrid], f:Callable[[SearchSpaceGrid], SearchSpaceGrid]):
+        self._base = base
+        self._f = f
+
+    def __len__(self)->int:
+        return len(self._base)
+
+    def _get(self, index:int)->SearchSpaceGrid:
+        return self._f(self._base[index])
+
+    def __iter__(self)->Iterator[SearchSpaceGrid]:
+        return map(self._f, self._base)
+
+    def _stratified_indices(self, n:int, rnd:random.Random)->List[int]:
+        return stratified_grid_indices(self._base, n, rnd)
+
+class ConcatenatedGrids(LazyGrids):
+    """ The grids of all parts, one part after the other."""
+    def __init__(self, parts:List[Sequence[SearchSpaceGrid]]):
+        self._parts = parts
+        self._ends = list(itertools.accumulate(len(part) for part in parts))
+
+    def __len__(self)->int:
+        return self._ends[-1] if self._ends else 0
+
+    def _get(self, index:int)->SearchSpaceGrid:
+        part = bisect.bisect_right(self._ends, index)
+        start = self._ends[part-1] if part > 0 else 0
+        return self._parts[part][index - start]
+
+    def __iter__(self)->Iterator[SearchSpaceGrid]:
+        return itertools.chain.from_iterable(self._parts)
+
+    def _stratified_indices(self, n:int, rnd:random.Random)->List[int]:
+        # every part gets the same share, however many grids it has
+        nonempty = [i for i, part in enumerate(self._parts) if len(part) > 0]
+        result:List[int] = []
+        for i, count in zip(nonempty, _spread_counts(len(nonempty), n, rnd)):
+            start = self._ends[i-1] if i > 0 else 0
+            result.extend(start + j for j in stratified_grid_indices(self._parts[i], count, rnd))
+        return result
+
+class ProductGrids(LazyGrids):
+    """ The cross product of the factors, in the order of itertools.product,
+        with every combination merged into a single grid by combine.
+        The i-th grid is found by writing i in the mixed radix given by the factor lengths.
+    """
+    def __init__(self, factors:List[Sequence[SearchSpaceGrid]], combine:Callable[[Tuple[SearchSpaceGrid,...]], SearchSpaceGrid]):
+        self._factors = factors
+        self._combine = combine
+        self._len = 1
+        for factor in factors:
+            self._len *= len(factor)
+
+    def __len__(self)->int:
+        return self._len
+
+    def _get(self, index:int)->SearchSpaceGrid:
+        # the last factor varies fastest, as in itertools.product
+        digits:List[SearchSpaceGrid] = []
+        for factor in reversed(self._factors):
+            index, digit = divmod(index, len(factor))
+            digits.append(factor[digit])
+        return self._combine(tuple(reversed(digits)))
+
+    def __iter__(self)->Iterator[SearchSpaceGrid]:
+        return map(self._combine, itertools.product(*self._factors))
+
+    def _stratified_indices(self, n:int, rnd:random.Random)->List[int]:
+        # stratify every factor on its own, and pair them up at random
+        result = [0] * n
+        for factor in self._factors:
+            digits = stratified_grid_indices(factor, n, rnd)
+            rnd.shuffle(digits)
+            result = [index * len(factor) + digit for index, digit in zip(result, digits)]
+        return result
+
+def _spread_counts(n_parts:int, n:int, rnd:random.Random)->List[int]:
+    """ Splits n into n_parts counts that differ by at most one, with the larger counts at random parts."""
+    if n_parts == 0:
+        return []
+    share, extra = divmod(n, n_parts)
+    extras = set(rnd.sample(range(n_parts), extra))
+    return [share + (1 if i in extras else 0) for i in range(n_parts)]
+
+def _spread_indices(length:int, n:int, rnd:random.Random)->List[int]:
+    if length == 0:
+        return []
+    if length >= n:
+        # sampling from a range only touches the chosen indices
+        return rnd.sample(range(length), n)
+    return [i for i, count in enumerate(_spread_counts(length, n, rnd)) for _ in range(count)]
+
+def stratified_grid_indices(grids:Sequence[SearchSpaceGrid], n:int, rnd:random.Random)->List[int]:
+    """ Returns n indices into grids, which are spread evenly over the choices
+        at every level of the search space rather than over the grids,
+        so a choice with many grids is not sampled more often than one with few.
+        Indices repeat if there are fewer grids than n.
+    """
+    if isinstance(grids, LazyGrids):
+        return grids._stratified_indices(n, rnd)
+    return _spread_indices(len(grids), n, rnd)
+
+def _nest_all_HPparams(name:str, grids:Sequence[SearchSpaceGrid])->Sequence[SearchSpaceGrid]:
+    return MappedGrids(grids, lambda grid: nest_HPparams(name, grid))
+
+def _chain_grids(gridline:Tuple[SearchSpaceGrid,...])->SearchSpaceGrid:
+    return dict(ChainMap(*gridline))
+
 # lets handle the general case
-SearchSpaceGridInternalType = Union[List[SearchSpaceGrid], SearchSpacePrimitive]
+SearchSpaceGridInternalType = Union[Sequence[SearchSpaceGrid], SearchSpacePrimitive]
 
 class SearchSpaceToGridVisitor(Visitor):
     @classmethod
-    def run(cls, space:SearchSpace)->List[SearchSpaceGrid]:
+    def run(cls, space:SearchSpace)->Sequence[SearchSpaceGrid]:
         visitor = cls()
         grids:SearchSpaceGridInternalType = accept(space, visitor)
         fixed_grids = cls.fixupDegenerateSearchSpaces(grids)
         return fixed_grids
 
     @classmethod
-    def fixupDegenerateSearchSpaces(cls, space:SearchSpaceGridInternalType)->List[SearchSpaceGrid]:
+    def fixupDegenerateSearchSpaces(cls, space:SearchSpaceGridInternalType)->Sequence[SearchSpaceGrid]:
         if isinstance(space, SearchSpacePrimitive):
             return [{DUMMY_SEARCH_SPACE_GRID_PARAM_NAME:space}]
         else:
@@ -111,62 +251,52 @@ class SearchSpaceToGridVisitor(Visitor):
 
     visitSearchSpaceNumber = visitSearchSpacePrimitive
 
-    def _searchSpaceList(self, space:SearchSpaceArray, *, size:int)->List[SearchSpaceGrid]:
+    def _searchSpaceList(self, space:SearchSpaceArray, *, size:int)->Sequence[SearchSpaceGrid]:
         sub_spaces = space.items(max=size)
 
-        param_grids:List[List[SearchSpaceGrid]] = \
-            [nest_all_HPparams(str(index), self.fixupDegenerateSearchSpaces(accept(sub,self))) for index,sub in enumerate(sub_spaces)]
-
-        param_grids_product:Iterable[Iterable[SearchSpaceGrid]] = itertools.product(*param_grids)
-        chained_grids:List[SearchSpaceGrid] = [
-            dict(ChainMap(*gridline,)) for gridline in param_grids_product]
+        param_grids:List[Sequence[SearchSpaceGrid]] = \
+            [_nest_all_HPparams(str(index), self.fixupDegenerateSearchSpaces(accept(sub,self))) for index,sub in enumerate(sub_spaces)]
 
         if space.is_tuple:
             st_val = structure_type_tuple
         else:
             st_val = structure_type_list
 
-        discriminated_grids:List[SearchSpaceGrid]=[{**d, structure_type_name:SearchSpaceConstant(st_val)} for d in chained_grids]
-
+        def discriminate(gridline:Tuple[SearchSpaceGrid,...])->SearchSpaceGrid:
+            return {**_chain_grids(gridline), structure_type_name:SearchSpaceConstant(st_val)}
 
-        return discriminated_grids
+        return ProductGrids(param_grids, discriminate)
 
-    def visitSearchSpaceArray(self, space:SearchSpaceArray)->List[SearchSpaceGrid]:
+    def visitSearchSpaceArray(self, space:SearchSpaceArray)->Sequence[SearchSpaceGrid]:
         if space.minimum == space.maximum:
             return self._searchSpaceList(space, size=space.minimum)
         else:
-            ret:List[SearchSpaceGrid] = []
-            for i in range(space.minimum, space.maximum+1):
-                ret.extend(self._searchSpaceList(space, size=i))
-            return ret
+            return ConcatenatedGrids([self._searchSpaceList(space, size=i)
+                                      for i in range(space.minimum, space.maximum+1)])
 
-    def visitSearchSpaceObject(self, space:SearchSpaceObject)->List[SearchSpaceGrid]:
+    def visitSearchSpaceObject(self, space:SearchSpaceObject)->Sequence[SearchSpaceGrid]:
         keys = space.keys
         keys_len = len(keys)
-        final_choices:List[SearchSpaceGrid] = []
+        final_choices:List[Sequence[SearchSpaceGrid]] = []
         for c in space.choices:
             assert keys_len == len(c)
-            kvs_complex:List[List[SearchSpaceGrid]] = []
+            kvs_complex:List[Sequence[SearchSpaceGrid]] = []
             kvs_simple:SearchSpaceGrid = {}
             for k,v in zip(keys, c):
-                vspace:Union[List[SearchSpaceGrid],SearchSpacePrimitive] = accept(v, self)
+                vspace:SearchSpaceGridInternalType = accept(v, self)
                 if isinstance(vspace, SearchSpacePrimitive):
                     kvs_simple[k] = vspace
                 else:
-                    nested_vspace:List[SearchSpaceGrid] = nest_all_HPparams(k, vspace)
+                    nested_vspace:Sequence[SearchSpaceGrid] = _nest_all_HPparams(k, vspace)
                     if nested_vspace:
                         kvs_complex.append(nested_vspace)
-            nested_space_choices:Iterable[Iterable[SearchSpaceGrid]] = itertools.product(*kvs_complex)
-            nested_space_choices_lists:List[List[SearchSpaceGrid]] = list(map((lambda x: list(x)),nested_space_choices))
-            nested_space_choices_filtered:List[List[SearchSpaceGrid]] = [
-                l for l in nested_space_choices_lists if l]
-            if nested_space_choices_filtered:
-                chained_grids:Iterable[SearchSpaceGrid] = [
-                  dict(ChainMap(*nested_choice, kvs_simple)) for nested_choice in nested_space_choices_filtered]
-                final_choices.extend(chained_grids)
+            if kvs_complex:
+                def chain_with_simple(nested_choice:Tuple[SearchSpaceGrid,...], kvs_simple=kvs_simple)->SearchSpaceGrid:
+                    return dict(ChainMap(*nested_choice, kvs_simple))
+                final_choices.append(ProductGrids(kvs_complex, chain_with_simple))
             else:
-                final_choices.append(kvs_simple)
-        return final_choices
+                final_choices.append([kvs_simple])
+        return ConcatenatedGrids(final_choices)
 
     def visitSearchSpaceSum(self, op:SearchSpaceSum)->SearchSpaceGridInternalType:
         sub_spaces:List[SearchSpace] = op.sub_spaces
@@ -177,32 +307,28 @@ class SearchSpaceToGridVisitor(Visitor):
         if len(sub_spaces) == 1:
             return list(sub_grids)[0]
         else:
-            fixed_grids:Iterable[List[SearchSpaceGrid]] = (SearchSpaceToGridVisitor.fixupDegenerateSearchSpaces(grid) for grid in sub_grids)
-            final_grids:List[SearchSpaceGrid] = []
+            fixed_grids:Iterable[Sequence[SearchSpaceGrid]] = (SearchSpaceToGridVisitor.fixupDegenerateSearchSpaces(grid) for grid in sub_grids)
+            final_grids:List[Sequence[SearchSpaceGrid]] = []
             for i, grids in enumerate(fixed_grids):
                 if not grids:
-                    grids = [{}]
+                    discriminated_grids:Sequence[SearchSpaceGrid] = [{discriminant_name:SearchSpaceConstant(i)}]
                 else:
                     # we need to add in this nesting
                     # in case a higher order operator directly contains
                     # another
-                    grids = nest_choice_all_HPparams(grids)
-
-                discriminated_grids:List[SearchSpaceGrid]=[{**d, discriminant_name:SearchSpaceConstant(i)} for d in grids]
-                final_grids.extend(discriminated_grids)
-            return final_grids
+                    def discriminate(d:SearchSpaceGrid, i=i)->SearchSpaceGrid:
+                        return {**nest_choice_HPparams(d), discriminant_name:SearchSpaceConstant(i)}
+                    discriminated_grids = MappedGrids(grids, discriminate)
+                final_grids.append(discriminated_grids)
+            return ConcatenatedGrids(final_grids)
 
     def visitSearchSpaceProduct(self, op:SearchSpaceProduct)->SearchSpaceGridInternalType:
 
         sub_spaces = op.get_indexed_spaces()
 
-        param_grids:List[List[SearchSpaceGrid]] = [nest_all_HPparams(make_indexed_name(name, index), self.fixupDegenerateSearchSpaces(accept(space,self))) for name,index,space in sub_spaces]
-
-        param_grids_product:Iterable[Iterable[SearchSpaceGrid]] = itertools.product(*param_grids)
-        chained_grids:List[SearchSpaceGrid] = [
-            dict(ChainMap(*gridline)) for gridline in param_grids_product]
+        param_grids:List[Sequence[SearchSpaceGrid]] = [_nest_all_HPparams(make_indexed_name(name, index), self.fixupDegenerateSearchSpaces(accept(space,self))) for name,index,space in sub_spaces]
 
-        return chained_grids
+        return ProductGrids(param_grids, _chain_grids)
 
     def visitSearchSpaceOperator(self, op:SearchSpaceOperator)->SearchSpaceGridInternalType:
         return accept(op.sub_space, self)
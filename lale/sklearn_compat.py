@@ -245,7 +245,10 @@ def set_structured_params(k, params:Dict[str, Any], hyper_parent):
 def set_operator_params(op:Ops.Operator, **impl_params)->Ops.TrainableOperator:
     """May return a new operator, in which case the old one should be overwritten
     """
-    if isinstance(op, Ops.PlannedIndividualOp):
+    if isinstance(op, Ops.TrainableIndividualOp) and not impl_params:
+        # nothing changes, so there is nothing to re-validate or re-create
+        return op
+    elif isinstance(op, Ops.PlannedIndividualOp):
         main_params, partitioned_sub_params = partition_sklearn_params(impl_params)
         hyper = op._hyperparams
         if hyper is None:
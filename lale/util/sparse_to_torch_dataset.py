@@ -0,0 +1,58 @@
+# Copyright 2019 IBM Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    from torch.utils.data import Dataset
+except ModuleNotFoundError:
+    raise ModuleNotFoundError("""Your Python environment does not have torch installed. You can install it with 
+                                pip install torch
+                                or with
+                                    pip install 'lale[full]'""")
+
+class SparseTorchDataset(Dataset):
+    """Pytorch Dataset subclass that takes a scipy sparse matrix and an optional label array.
+
+    Indexing with a list of row indices (as produced by a
+    torch.utils.data.BatchSampler) slices the rows in sparse format and
+    only densifies that batch, so the whole matrix is never densified."""
+
+    def __init__(self, X, y=None):
+        """X and y are the dataset and labels respectively.
+
+        Parameters
+        ----------
+        X : scipy sparse matrix
+            Two dimensional dataset of input features, converted to CSR
+            format for fast row slicing.
+        y : numpy array
+            Labels
+        """
+        self.X = X.tocsr()
+        self.y = y
+
+    def __len__(self):
+        return self.X.shape[0]
+
+    def __getitem__(self, idx):
+        batch_X = self.X[idx].toarray()
+        if self.y is not None:
+            return batch_X, self.y[idx]
+        else:
+            return batch_X
+
+    def get_data(self):
+        if self.y is None:
+            return self.X
+        else:
+            return self.X, self.y
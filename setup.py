@@ -13,8 +13,10 @@
 # limitations under the License.
 
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from datetime import datetime
 import os
+import subprocess
 import sys
 import logging
 logger = logging.getLogger(__name__)
@@ -44,6 +46,7 @@ else:
         'hyperopt==0.2.3',
         'jsonschema',
         'jsonsubschema',
+        'joblib',
         'scikit-learn==0.20.3',
         'scipy',
         'pandas<=0.25.3',
@@ -59,6 +62,21 @@ if "TRAVIS" in os.environ:
 else:
     VERSION=lale.__version__
 
+class build_py_with_search_spaces(build_py):
+    """Also precompiles the search spaces of lale.lib.sklearn into the build, if possible."""
+    def run(self):
+        super().run()
+        if self.dry_run:
+            return
+        target = os.path.join(self.build_lib, 'lale', 'search', 'precompiled_search_spaces.pickle')
+        try:
+            subprocess.run(
+                [sys.executable, '-m', 'lale.search.search_space_cache', target],
+                check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        except (OSError, subprocess.CalledProcessError) as e:
+            #search spaces are then compiled on first use instead
+            logger.warning(f'not precompiling search spaces: {e}')
+
 setup(
     name='lale',
     version=VERSION,
@@ -69,11 +87,14 @@ setup(
     url="https://github.com/IBM/lale",
     python_requires='>=3.6',
     packages=find_packages(),
+    package_data={'lale.search': ['precompiled_search_spaces.pickle']},
+    cmdclass={'build_py': build_py_with_search_spaces},
     license='',
     install_requires = install_requires,
     extras_require={
         'full': [
             'liac-arff>=2.4.0',
+            'pyarrow>=3.0.0',
             'pytorch-pretrained-bert>=0.6.1',
             'torchvision>=0.2.2',
             'tensorflow-datasets>=1.0.1',
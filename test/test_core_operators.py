@@ -315,6 +315,42 @@ class TestConcatFeatures(unittest.TestCase):
             for i_feature in range(len(transformed[i_sample])):
                 self.assertEqual(transformed[i_sample][i_feature],
                                  expected[i_sample][i_feature])
+    def test_sparse(self):
+        import numpy as np
+        import scipy.sparse
+        A = scipy.sparse.random(20, 1000, density=0.01, format='csr', random_state=42)
+        B = np.ones((20, 2))
+        transformed = ConcatFeatures().transform([A, B])
+        self.assertTrue(scipy.sparse.issparse(transformed))
+        self.assertEqual(transformed.shape, (20, 1002))
+        dense = ConcatFeatures(sparse_threshold=0.0).transform([A, B])
+        self.assertFalse(scipy.sparse.issparse(dense))
+        self.assertTrue(np.array_equal(dense, np.hstack([A.toarray(), B])))
+    def test_mixed_types(self):
+        import numpy as np
+        import pandas as pd
+        import scipy.sparse
+        A = pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5]}, index=[7, 8, 9])
+        B = np.array([10, 20, 30], dtype=np.int32)
+        C = scipy.sparse.csr_matrix([[0, 1], [2, 0], [0, 0]])
+        expected = np.array([[1, 0.5, 10, 0, 1], [2, 1.5, 20, 2, 0], [3, 2.5, 30, 0, 0]])
+        transformed = ConcatFeatures(sparse_threshold=0.0).transform([A, B, C])
+        self.assertEqual(transformed.dtype, np.float64)
+        self.assertTrue(np.array_equal(transformed, expected))
+        transformed = ConcatFeatures(sparse_threshold=0.0, dtype='float32').transform([A, B, C])
+        self.assertEqual(transformed.dtype, np.float32)
+        self.assertTrue(np.array_equal(transformed, expected))
+        with self.assertRaises(ValueError):
+            ConcatFeatures().transform([A, B[:2]])
+    def test_pandas_positional(self):
+        import pandas as pd
+        A = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}, index=[7, 8, 9])
+        B = pd.Series([0.5, 1.5, 2.5], name='a')
+        transformed = ConcatFeatures().transform([A, B])
+        self.assertEqual(list(transformed.columns), ['a', 'b', 'a'])
+        self.assertEqual(list(transformed.index), [7, 8, 9])
+        self.assertEqual(list(transformed.iloc[:, 2]), [0.5, 1.5, 2.5])
+        self.assertEqual(list(transformed.dtypes)[:1], [A['a'].dtype])
     def test_comparison_with_scikit(self):
         import warnings
         warnings.filterwarnings("ignore")
@@ -1198,4 +1234,111 @@ class TestSpuriousSideConstraintsClassification(unittest.TestCase):
 class TestLaleVersion(unittest.TestCase):
     def test_version_exists(self):
         import lale
-        self.assertIsNot(lale.__version__, None)
\ No newline at end of file
+        self.assertIsNot(lale.__version__, None)
+
+class TestTimeFreqEigenVectors(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        rng = np.random.RandomState(42)
+        self.X = [rng.randn(16, 250 * n_seconds) for n_seconds in [3, 10, 60]]
+        self.y = np.array([0, 1, 0])
+
+    def _original_window_features(self, window):
+        #the per-window features as computed before they were batched,
+        #that is, FFTWithTimeFreqCorrelation(1, 24, 250, 'first_axis') on one matrix
+        import numpy as np
+        from sklearn import preprocessing
+        def upper_right_triangle(matrix):
+            return np.array([matrix[i, j] for i in range(matrix.shape[0]) for j in range(i+1, matrix.shape[1])])
+        def eigenvalues(matrix):
+            w, v = np.linalg.eig(matrix)
+            w = np.absolute(w)
+            w.sort()
+            return w
+        def correlation_features(data):
+            corr = np.corrcoef(preprocessing.scale(data, axis=0))
+            return np.concatenate([upper_right_triangle(corr), eigenvalues(corr)])
+        data = window.copy()
+        for ch in data:
+            if np.all(ch == 0.0):
+                ch[-1] += 0.00001
+        time_features = correlation_features(data)
+        freq = np.absolute(np.fft.rfft(window, axis=1))[:, 1:25]
+        indices = np.where(freq <= 0)
+        freq[indices] = np.max(freq)
+        freq[indices] = (np.min(freq) * 0.1)
+        freq = np.log10(freq)
+        freq_features = np.concatenate([correlation_features(freq), freq.ravel()])
+        return np.concatenate([time_features, freq_features])
+
+    def _transform_window_by_window(self, X, y):
+        import numpy as np
+        X_transformed, y_transformed = [], []
+        for seizure_data, seizure_label in zip(X, y):
+            start, stop = 0, 250
+            while stop < seizure_data.shape[1]:
+                X_transformed.append(self._original_window_features(seizure_data[:, start:stop]))
+                y_transformed.append(seizure_label)
+                start, stop = start + 125, stop + 125
+        return np.array(X_transformed), np.array(y_transformed)
+
+    def test_same_as_window_by_window(self):
+        import numpy as np
+        from lale.lib.lale.time_series_transformer import TimeFreqEigenVectorsImpl
+        impl = TimeFreqEigenVectorsImpl()
+        X_transformed, y_transformed = impl.transform(self.X, self.y)
+        X_expected, y_expected = self._transform_window_by_window(self.X, self.y)
+        self.assertEqual(X_transformed.shape, X_expected.shape)
+        self.assertTrue(np.allclose(X_transformed, X_expected))
+        self.assertTrue(np.array_equal(y_transformed, y_expected))
+        meta_output = impl.get_transform_meta_output()
+        self.assertEqual(meta_output['end_index_list'], [4, 22, 140])
+
+    def test_n_jobs(self):
+        import numpy as np
+        from lale.lib.lale.time_series_transformer import TimeFreqEigenVectorsImpl
+        serial = TimeFreqEigenVectorsImpl()
+        X_expected, y_expected = serial.transform(self.X, self.y)
+        parallel = TimeFreqEigenVectorsImpl(n_jobs=2)
+        X_transformed, y_transformed = parallel.transform(self.X, self.y)
+        self.assertTrue(np.array_equal(X_transformed, X_expected))
+        self.assertTrue(np.array_equal(y_transformed, y_expected))
+        self.assertEqual(parallel.end_index_list, serial.end_index_list)
+
+    def test_n_jobs_zero(self):
+        import jsonschema
+        from lale.lib.lale.time_series_transformer import TimeFreqEigenVectors, TimeFreqEigenVectorsImpl
+        with self.assertRaises(jsonschema.ValidationError):
+            TimeFreqEigenVectors(n_jobs=0)
+        with self.assertRaises(ValueError):
+            TimeFreqEigenVectorsImpl(n_jobs=0).transform(self.X, self.y)
+
+class TestSampleBasedVoting(unittest.TestCase):
+    def test_hard_voting(self):
+        import numpy as np
+        from lale.lib.lale.sample_based_voting import SampleBasedVotingImpl
+        X = np.array(['a', 'b', 'b', 'c', 'a', 'c', 'c', 'b'])
+        voted = SampleBasedVotingImpl().transform(X, end_index_list=[3, 4, 8])
+        self.assertEqual(list(voted), ['b', 'c', 'c'])
+
+    def test_hard_voting_ties_and_meta_data(self):
+        import numpy as np
+        from lale.lib.lale.sample_based_voting import SampleBasedVotingImpl
+        impl = SampleBasedVotingImpl()
+        impl.set_meta_data({'end_index_list': [2, 6]})
+        voted = impl.transform([3, 1, 2, 2, 0, 0])
+        self.assertEqual(list(voted), [1, 0])
+
+    def test_soft_voting(self):
+        import numpy as np
+        from lale.lib.lale.sample_based_voting import SampleBasedVotingImpl
+        proba = np.array([[0.9, 0.1], [0.4, 0.6], [0.45, 0.55], [0.2, 0.8], [0.7, 0.3]])
+        hard = SampleBasedVotingImpl(voting='hard').transform(proba, end_index_list=[3, 5])
+        self.assertEqual(list(hard), [1, 0])
+        soft = SampleBasedVotingImpl(voting='soft').transform(proba, end_index_list=[3, 5])
+        self.assertEqual(list(soft), [0, 1])
+
+    def test_empty_segment(self):
+        from lale.lib.lale.sample_based_voting import SampleBasedVotingImpl
+        with self.assertRaises(ValueError):
+            SampleBasedVotingImpl().transform([0, 1, 1], end_index_list=[2, 2, 3])
@@ -542,3 +542,44 @@ class TestComposition(unittest.TestCase):
     def test_remove_last5(self):
         pipeline = StandardScaler()  >> ( PCA() & Nystroem() & PassiveAggressiveClassifier() )>>ConcatFeatures() >> NoOp() >> PassiveAggressiveClassifier()
         pipeline.remove_last(inplace=True).freeze_trainable()
+
+class TestPartialFit(unittest.TestCase):
+    def setUp(self):
+        from sklearn.datasets import load_iris
+        from sklearn.model_selection import train_test_split
+        data = load_iris()
+        X, y = data.data, data.target
+        self.X_train, self.X_test, self.y_train, self.y_test =  train_test_split(X, y, random_state=42)
+
+    def test_stream_of_chunks(self):
+        import numpy as np
+        from lale.lib.sklearn import SGDClassifier
+        trainable = StandardScaler() >> SGDClassifier(random_state=42)
+        classes = np.unique(self.y_train)
+        trained = trainable.partial_fit(self.X_train[:50], self.y_train[:50], classes=classes)
+        self.assertIsInstance(trained, TrainedPipeline)
+        trained = trained.partial_fit(self.X_train[50:], self.y_train[50:])
+        scaler = trained.steps()[0]._impl_instance()._wrapped_model
+        self.assertEqual(scaler.n_samples_seen_, len(self.X_train))
+        self.assertTrue(np.allclose(scaler.mean_, self.X_train.mean(axis=0)))
+        predictions = trained.predict(self.X_test)
+        self.assertEqual(len(predictions), len(self.y_test))
+
+    def test_frozen_and_stateless_steps(self):
+        import numpy as np
+        from lale.lib.sklearn import IncrementalPCA, MiniBatchKMeans, SGDClassifier
+        pca = PCA(n_components=2).fit(self.X_train).freeze_trained()
+        trainable = (pca & IncrementalPCA(n_components=2)) >> ConcatFeatures() >> SGDClassifier(random_state=42)
+        trainable = MinMaxScaler() >> trainable
+        classes = np.unique(self.y_train)
+        trained = trainable.partial_fit(self.X_train[:60], self.y_train[:60], classes=classes)
+        trained = trained.partial_fit(self.X_train[60:], self.y_train[60:])
+        self.assertIn(pca, trained.steps())
+        kmeans = MiniBatchKMeans(n_clusters=3, random_state=42)
+        trained_kmeans = kmeans.partial_fit(self.X_train[:60]).partial_fit(self.X_train[60:])
+        self.assertEqual(len(trained_kmeans.predict(self.X_test)), len(self.X_test))
+
+    def test_not_incremental(self):
+        trainable = StandardScaler() >> LogisticRegression()
+        with self.assertRaises(AttributeError):
+            trainable.partial_fit(self.X_train, self.y_train)
@@ -1,5 +1,5 @@
 import unittest
-from lale.grammar import Grammar
+from lale.grammar import Grammar, NonTerminal
 from lale.operators import make_choice, PlannedOperator, PlannedPipeline, TrainedOperator
 from lale import wrap_imported_operators
 
@@ -13,6 +13,7 @@ from lale.lib.lale import NoOp
 
 from lale.lib.lale import Hyperopt
 import lale.datasets
+import lale.pretty_print
 
 class TestGrammar(unittest.TestCase):
     def setUp(self):
@@ -76,4 +77,46 @@ class TestGrammar(unittest.TestCase):
         
         strainer = Hyperopt(estimator=sample, cv=2, max_evals=6, scoring='r2')
         strained = strainer.fit(self.train_X, self.train_y)
-        assert isinstance(strained.get_pipeline(), TrainedOperator)
\ No newline at end of file
+        assert isinstance(strained.get_pipeline(), TrainedOperator)
+
+    def test_unfold_memoized(self):
+        g = Grammar()
+        g.start       = g.estimator
+        g.estimator   = (NoOp | g.transformer) >> g.prim_est
+        g.transformer = (NoOp | g.transformer) >> g.prim_tfm
+
+        g.prim_est    = LR | KNN
+        g.prim_tfm    = PCA | Scaler
+
+        # exponential without sharing the expansions of the non-terminals
+        generated = g.unfold(40)
+        assert isinstance(generated, PlannedOperator)
+        assert g._unfold(NonTerminal('transformer'), 10) is g._unfold(NonTerminal('transformer'), 10)
+
+        # assigning a rule invalidates the expansions
+        g.prim_tfm = PCA
+        assert 'Scaler' not in lale.pretty_print.to_string(g.unfold(4))
+
+    def test_sample_batch(self):
+        g = Grammar()
+        g.start       = g.transformer >> g.transformer >> g.prim_est
+        g.transformer = NoOp | g.prim_tfm
+        g.prim_est    = LR | KNN
+        g.prim_tfm    = PCA | Scaler
+
+        samples = g.sample(3, 50)
+        # (NoOp | PCA | Scaler) >> (NoOp | PCA | Scaler) >> (LR | KNN)
+        self.assertLessEqual(len(samples), 18)
+        self.assertGreater(len(samples), 1)
+        printed = [lale.pretty_print.to_string(s) for s in samples]
+        self.assertEqual(len(printed), len(set(printed)))
+        for s in samples:
+            assert isinstance(s, PlannedOperator)
+        self.assertEqual(len(g.sample(3, 5)), 5)
+        # only NoOp >> NoOp >> (LR | KNN) can be derived in one step
+        self.assertEqual(len(g.sample(1, 5)), 2)
+        self.assertEqual(g.sample(0, 5), [])
+
+        trainer = Hyperopt(estimator=samples[0], cv=2, max_evals=2, scoring='r2')
+        trained = trainer.fit(self.train_X, self.train_y)
+        assert isinstance(trained.get_pipeline(), TrainedOperator)
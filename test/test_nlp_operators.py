@@ -44,3 +44,111 @@ for encoder in encoders:
         'test_{0}'.format(encoder.split('.')[-1]),
         create_function_test_encoder(encoder)
     )
+
+class TestBertPretrainedEncoder(unittest.TestCase):
+    def setUp(self):
+        self.X = ['Boston locates in the East Coast',
+                  'NBA',
+                  'Manhattan is located in the lower part of NYC',
+                  'Cambridge is part of the Greater Boston Area',
+                  'People worked at New York city usually lives in New Jersey Area']
+
+    def test_bucketed_same_as_unbucketed(self):
+        import numpy as np
+        from lale.lib.pytorch.bert_pretrained_encoder import BertPretrainedEncoderImpl
+        #batches of one sentence need no padding
+        unpadded = BertPretrainedEncoderImpl(batch_size=1, bucket_by_length=False).transform(self.X)
+        padded = BertPretrainedEncoderImpl(batch_size=4, bucket_by_length=False).transform(self.X)
+        bucketed = BertPretrainedEncoderImpl(batch_size=2, bucket_by_length=True).transform(self.X)
+        self.assertEqual(unpadded.shape, (len(self.X), 768))
+        np.testing.assert_allclose(padded, unpadded, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(bucketed, unpadded, rtol=1e-4, atol=1e-5)
+
+    def test_disk_cache(self):
+        import os
+        import tempfile
+        import numpy as np
+        from lale.lib.pytorch.bert_pretrained_encoder import BertPretrainedEncoderImpl
+        with tempfile.TemporaryDirectory() as cache_dir:
+            impl = BertPretrainedEncoderImpl(batch_size=2, cache_dir=cache_dir)
+            first = impl.transform(self.X)
+            cached = [impl._cache_file_name(line) for line in self.X]
+            self.assertTrue(all(os.path.exists(name) for name in cached))
+            #hits are read back from disk, also by a fresh instance
+            again = BertPretrainedEncoderImpl(batch_size=2, cache_dir=cache_dir)
+            np.testing.assert_array_equal(impl.transform(self.X), first)
+            np.testing.assert_array_equal(again.transform(self.X), first)
+            #partial hits are merged back in the original order
+            mixed = self.X[:2] + ['A sentence that is not cached yet']
+            np.testing.assert_array_equal(again.transform(mixed)[:2], first[:2])
+            #another model must not see these embeddings
+            again._model_id = 'another model'
+            self.assertNotEqual(again._cache_file_name(self.X[0]), cached[0])
+
+class TestGloveEmbeddingEncoder(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        #tiny synthetic GloVe file, deliberately not in sorted order
+        words = ['the', 'boston', 'unk', 'is', 'east', 'coast', ',', 'nba', 'a']
+        rng = np.random.RandomState(42)
+        self.glove = {word: rng.uniform(-1, 1, 50).astype(np.float32) for word in words}
+        self.X = ['Boston is the East Coast',
+                  'NBA',
+                  '',
+                  'Boston, a Zebra, is unheard-of',
+                  'the the the']
+
+    def _expected(self, impl, combiner):
+        import numpy as np
+        result = []
+        for text in self.X:
+            tokens = [token.text for token in impl.tokenizer(text.lower())] or ['unk']
+            vecs = [self.glove.get(token, self.glove['unk']) for token in tokens]
+            pool = np.mean if combiner == 'mean' else np.max
+            result.append(pool(np.stack(vecs), axis=0))
+        return np.stack(result)
+
+    def test_same_as_per_sentence_loop(self):
+        import os
+        import tempfile
+        import unittest.mock
+        import numpy as np
+        import lale.lib.spacy.glove_embedding_encoder as glove_module
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, 'glove.6B.50d.txt'), 'w', encoding='utf-8') as f:
+                for word, vec in self.glove.items():
+                    f.write(' '.join([word, *map(str, vec)]) + '\n')
+            with unittest.mock.patch.object(glove_module, '_resources_dir', tmpdir), \
+                 unittest.mock.patch.object(glove_module, '_sentences_per_batch', 2), \
+                 unittest.mock.patch.dict(glove_module._embeddings, clear=True):
+                for combiner in ['mean', 'max']:
+                    impl = glove_module.GloveEmbeddingEncoderImpl(dim=50, combiner=combiner)
+                    transformed = impl.transform(self.X)
+                    self.assertEqual(transformed.shape, (len(self.X), 50))
+                    np.testing.assert_allclose(
+                        transformed, self._expected(impl, combiner), rtol=1e-5, atol=1e-6)
+                #the text file was converted once into a sorted vocabulary
+                vocab = np.load(os.path.join(tmpdir, 'glove.6B.50d.vocab.npy'))
+                self.assertEqual(vocab.tolist(), sorted(self.glove))
+                self.assertIsInstance(glove_module._embeddings[50][1], np.memmap)
+                #unknown words and empty texts map to the vector of 'unk'
+                np.testing.assert_array_equal(
+                    impl._token_ids(['zebra', 'aaa', 'zzz', 'unk']),
+                    [vocab.tolist().index('unk')] * 4)
+                np.testing.assert_allclose(transformed[2], self.glove['unk'])
+
+class TestUSEPretrainedEncoder(unittest.TestCase):
+    def test_repeated_transform(self):
+        import numpy as np
+        from lale.lib.tensorflow.use_pretrained_encoder import USEPretrainedEncoderImpl
+        impl = USEPretrainedEncoderImpl(batch_size=2)
+        X = ['Boston locates in the East Coast', 'Manhattan is located in the lower part of NYC', 'NBA']
+        n_ops = len(impl.sess.graph.get_operations())
+        transformed = [impl.transform(X) for _ in range(3)]
+        #the inference subgraph is built once, not once per transform
+        self.assertEqual(len(impl.sess.graph.get_operations()), n_ops)
+        #batches of two give the same result as a single run over all of X
+        expected = impl.sess.run(impl._embedding, feed_dict={impl._X_input: X})
+        self.assertEqual(transformed[0].shape, (3, 512))
+        for result in transformed:
+            np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
@@ -409,6 +409,45 @@ class TestHyperopt(unittest.TestCase):
         search_space2 = hyperopt_search_space(pca2)
         self.assertNotEqual(search_space1, search_space2)
 
+    def test_search_space_cache(self):
+        import lale.search.search_space_cache
+        from lale.search.schema2search_space import op_to_search_space
+        lale.search.search_space_cache.clear()
+        space1 = op_to_search_space(LogisticRegression)
+        space2 = op_to_search_space(LogisticRegression)
+        self.assertIsNot(space1, space2)
+        self.assertEqual(str(space1), str(space2))
+        self.assertEqual(len(lale.search.search_space_cache._cache), 1)
+        space3 = op_to_search_space(LogisticRegression(C=0.5))
+        self.assertNotEqual(str(space1), str(space3))
+        self.assertEqual(len(lale.search.search_space_cache._cache), 2)
+
+    def test_precompiled_search_spaces(self):
+        import os
+        import tempfile
+        import unittest.mock
+        import lale.search.search_space_cache as cache
+        from lale.search.schema2search_space import op_to_search_space
+        expected = str(op_to_search_space(LogisticRegression))
+        long_name = LogisticRegression._impl.__module__ + '.' + LogisticRegression.name()
+        schema = LogisticRegression._hyperparam_schema_with_hyperparams()
+        saved_path = cache.precompiled_path
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'spaces.pickle')
+            try:
+                self.assertGreater(cache.precompile(path), 10)
+                self.assertEqual(cache.precompiled_path, path)
+                self.assertEqual(str(op_to_search_space(LogisticRegression)), expected)
+                digest = cache._digest(long_name, LogisticRegression.name(), schema)
+                self.assertIsNotNone(cache._lookup_precompiled(digest))
+                #entries compiled by other code are ignored
+                with unittest.mock.patch.object(cache, '_code_version', 'other code'):
+                    digest = cache._digest(long_name, LogisticRegression.name(), schema)
+                    self.assertIsNone(cache._lookup_precompiled(digest))
+            finally:
+                cache.precompiled_path = saved_path
+                cache.clear()
+
     def test_nested_pipeline1(self):
         from sklearn.datasets import load_iris
         from lale.lib.lale import Hyperopt
@@ -513,6 +552,90 @@ class TestHyperopt(unittest.TestCase):
         predictions_1 = clf.predict(self.X_test)
         assert np.array_equal(predictions_1, predictions)
 
+class TestSchemaSimplifier(unittest.TestCase):
+    def _planned_operators(self):
+        import importlib
+        import lale.operators
+        result = []
+        for lib_name in ['lale.lib.sklearn', 'lale.lib.autogen', 'lale.lib.xgboost', 'lale.lib.lightgbm']:
+            try:
+                lib = importlib.import_module(lib_name)
+            except ImportError:
+                continue
+            for attr_name in dir(lib):
+                op = getattr(lib, attr_name)
+                if isinstance(op, lale.operators.PlannedIndividualOp):
+                    result.append(op)
+        return result
+
+    def test_simplify_all_operators_same_as_uninterned(self):
+        import copy
+        import json
+        import unittest.mock
+        import jsonschema
+        import lale.schema_simplifier
+        from lale.schema_simplifier import narrowSimplifyAndFilter, set_with_str_for_keys
+        def uninterned_enum_values(es, s):
+            #enumValues as it was before validators were interned
+            ret = list()
+            for e in es:
+                try:
+                    jsonschema.validate(e, s, jsonschema.Draft4Validator)
+                    ret.append(e)
+                except:
+                    pass
+            return set_with_str_for_keys(iter(ret))
+        ops = self._planned_operators()
+        self.assertGreater(len(ops), 0)
+        schemas = [op._hyperparam_schema_with_hyperparams() for op in ops]
+        def simplify_all():
+            return [json.dumps(narrowSimplifyAndFilter(copy.deepcopy(s), True), sort_keys=True, default=repr)
+                    for s in schemas]
+        with unittest.mock.patch.object(lale.schema_simplifier, 'enumValues', uninterned_enum_values):
+            expected = simplify_all()
+        lale.schema_simplifier._validators.clear()
+        cold = simplify_all()
+        warm = simplify_all()
+        for op, e, c, w in zip(ops, expected, cold, warm):
+            self.assertEqual(c, e, op.name())
+            self.assertEqual(w, e, op.name())
+
+class TestRandomSearch(unittest.TestCase):
+    def setUp(self):
+        from sklearn.model_selection import train_test_split
+        from sklearn.datasets import load_iris
+        X, y = load_iris(return_X_y=True)
+        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(X, y)
+
+    def test_stratified_samples(self):
+        from lale.search.lale_random_search import get_random_search_samples, qmc_installed
+        planned = (PCA | NoOp) >> (LogisticRegression | KNeighborsClassifier)
+        samplers = ['sobol', 'lhs', 'uniform'] if qmc_installed else ['lhs', 'uniform']
+        for sampler in samplers:
+            samples = get_random_search_samples(planned, 40, sampler=sampler, random_state=42)
+            self.assertEqual(len(samples), 40)
+            choices = [s['LogisticRegression | KNeighborsClassifier__?'] for s in samples]
+            self.assertEqual(choices.count(0), choices.count(1))
+            again = get_random_search_samples(planned, 40, sampler=sampler, random_state=42)
+            self.assertEqual(str(samples), str(again))
+
+    def test_lhs_covers_every_stratum(self):
+        import numpy as np
+        from lale.search.lale_random_search import unit_samples
+        u = unit_samples(16, 3, 'lhs', np.random.RandomState(0))
+        for j in range(3):
+            self.assertEqual(sorted(np.floor(u[:, j] * 16).astype(int).tolist()), list(range(16)))
+
+    def test_planned_pipeline(self):
+        from lale.lib.lale import RandomSearch
+        planned = (PCA | NoOp) >> (LogisticRegression | KNeighborsClassifier)
+        clf = RandomSearch(estimator=planned, max_evals=6, cv=3, random_state=42)
+        trained = clf.fit(self.X_train, self.y_train)
+        trained.predict(self.X_test)
+        summary = trained.summary()
+        self.assertEqual(len(summary), 6)
+        self.assertIsNotNone(trained.get_pipeline(summary.index[0]))
+
 class TestAutoConfigureClassification(unittest.TestCase):
     def setUp(self):
         from sklearn.datasets import load_iris
@@ -643,6 +766,105 @@ class TestGridSearchCV(unittest.TestCase):
             iris = load_iris()
             clf.fit(iris.data, iris.target)
 
+    def test_summary_and_get_pipeline(self):
+        from sklearn.datasets import load_iris
+        from lale.lib.lale import GridSearchCV
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            clf = GridSearchCV(
+                estimator=PCA >> (LogisticRegression | KNeighborsClassifier),
+                lale_num_samples=1, lale_num_grids=3, cv=2)
+            X, y = load_iris(return_X_y=True)
+            trained = clf.fit(X, y)
+        summary = trained.summary()
+        self.assertGreater(len(summary), 1)
+        best_name = summary['loss'].idxmin()
+        candidate = trained.get_pipeline(best_name)
+        self.assertIs(candidate, trained.get_pipeline(best_name))
+        self.assertEqual(candidate.fit(X, y).predict(X).shape, (150,))
+
+    def test_parallel_with_observer(self):
+        import lale.operators
+        from sklearn.datasets import load_iris
+        from lale.lib.lale import GridSearchCV
+        events = []
+        class CountingObserver:
+            #the operator deep-copies the observer, so record into a shared list
+            def start_optimize(self, *args, **kwargs):
+                events.append('start_optimize')
+            def end_optimize(self, *args, **kwargs):
+                events.append('end_optimize')
+            def end_fit(self, *args, **kwargs):
+                events.append('end_fit')
+            def __deepcopy__(self, memo):
+                return self
+        observer = CountingObserver()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            clf = GridSearchCV(
+                estimator=LogisticRegression, lale_num_samples=1, lale_num_grids=2,
+                cv=2, n_jobs=2, observer=observer)
+            X, y = load_iris(return_X_y=True)
+            import joblib
+            with joblib.parallel_backend('threading'):
+                trained = clf.fit(X, y)
+        self.assertEqual(events, ['start_optimize', 'end_fit', 'end_optimize'])
+        trained.predict(X)
+        #like the serial path, the best pipeline is the trained one
+        self.assertIsInstance(trained.get_pipeline(), lale.operators.TrainedOperator)
+
+    def test_share_data_with_workers(self):
+        import os
+        import tempfile
+        import numpy as np
+        import pandas as pd
+        from lale.search.lale_grid_search_cv import share_data_with_workers
+        X = np.arange(12.0).reshape(4, 3)
+        df = pd.DataFrame(X, columns=['a', 'b', 'c'])
+        mixed = df.assign(d=['w', 'x', 'y', 'z'])
+        with tempfile.TemporaryDirectory() as folder:
+            shared = share_data_with_workers(X, folder)
+            self.assertIsInstance(shared, np.memmap)
+            self.assertTrue(np.array_equal(shared, X))
+            shared_df = share_data_with_workers(df, folder)
+            #the values of the frame are a view of a memory map in folder
+            values = np.asarray(shared_df)
+            mapped = values
+            while mapped is not None and not isinstance(mapped, np.memmap):
+                mapped = mapped.base
+            self.assertIsInstance(mapped, np.memmap)
+            self.assertTrue(np.shares_memory(values, mapped))
+            self.assertTrue(os.path.samefile(os.path.dirname(mapped.filename), folder))
+            self.assertTrue(shared_df.equals(df))
+            self.assertIs(share_data_with_workers(mixed, folder), mixed)
+            del shared, shared_df, values, mapped
+
+    def test_lazy_grids(self):
+        from lale.lib.sklearn import KNeighborsClassifier as KNN
+        from lale.search.search_space_grid import op_to_search_space_grids, search_space_grid_to_string
+        planned = (PCA | NoOp) >> (LogisticRegression | KNN)
+        grids = op_to_search_space_grids(planned)
+        materialized = [search_space_grid_to_string(grid) for grid in grids]
+        self.assertEqual(len(grids), len(materialized))
+        for i in [0, 1, len(grids)//2, len(grids)-1, -1]:
+            self.assertEqual(search_space_grid_to_string(grids[i]), materialized[i])
+        with self.assertRaises(IndexError):
+            grids[len(grids)]
+
+    def test_sample_grids_of_large_space(self):
+        import time
+        from lale.lib.sklearn import KNeighborsClassifier as KNN
+        from lale.search.search_space_grid import get_search_space_grids, op_to_search_space_grids
+        prep = lambda: PCA | Nystroem | NoOp
+        planned = (StandardScaler | MinMaxScaler | NoOp) >> prep() >> prep() >> prep() >> (LogisticRegression | KNN | SVC)
+        self.assertGreater(len(op_to_search_space_grids(planned)), 100000)
+        start = time.time()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            grids = get_search_space_grids(planned, num_grids=3)
+        self.assertEqual(len(grids), 3)
+        self.assertLess(time.time() - start, 5)
+
 class TestCrossValidation(unittest.TestCase):
     def test_cv_folds(self):
         trainable_lr = LogisticRegression(n_jobs=1)
@@ -42,6 +42,25 @@ class TestPGOLoad(unittest.TestCase):
         samples:List[str] = dist.samples(10)
 #        print(f"LR[C] samples: {samples}")
 
+    def test_pgo_samples_bulk(self):
+        import random
+        pgo = PGO.load_pgo_file(example_pgo_fp)
+        lr_c = pgo["LogisticRegression"]["C"]
+        dist = PGO.FrequencyDistribution.asFloatValues(lr_c.items())
+        self.assertEqual(dist.vals.dtype.kind, 'f')
+        random.seed(42)
+        samples = dist.samples(10000)
+        random.seed(42)
+        self.assertEqual(samples, dist.samples(10000))
+        for v in samples:
+            self.assertTrue(v is PGO.DefaultValue.token or isinstance(v, float))
+        probs = dict(dist.probabilities())
+        self.assertAlmostEqual(sum(probs.values()), 1.0)
+        default_share = samples.count(PGO.DefaultValue.token) / len(samples)
+        self.assertAlmostEqual(default_share, probs[PGO.DefaultValue.token], delta=0.02)
+        self.assertEqual(dist[0], min(v for v in probs if isinstance(v, float)))
+        self.assertIs(dist[len(dist) - 1], PGO.DefaultValue.token)
+
 class TestPGOGridSearchCV(unittest.TestCase):
     def test_lr_parameters(self):
         pgo = PGO.load_pgo_file(example_pgo_fp)
@@ -80,6 +99,15 @@ class TestPGOHyperopt(unittest.TestCase):
         lr = LogisticRegression()
         parameters:SearchSpace = hyperopt_search_space(lr, pgo=pgo)
 
+    def test_lr_categorical_prior(self):
+        from lale.search.lale_hyperopt import search_space_to_hp_str
+        from lale.search.schema2search_space import op_to_search_space
+        pgo = PGO.load_pgo_file(example_pgo_fp)
+
+        space_str = search_space_to_hp_str(op_to_search_space(LogisticRegression, pgo=pgo), 'LR')
+        self.assertIn("hp.pchoice('LR_C', [", space_str)
+        self.assertNotIn("pgo_sample", space_str)
+
     def test_lr_run(self):
         pgo = PGO.load_pgo_file(example_pgo_fp)
 
@@ -241,9 +241,75 @@ class TestBatching(unittest.TestCase):
         from sklearn.metrics import accuracy_score
 
         pipeline = Batching(operator=MinMaxScaler() >> SGDClassifier())
-        trained = pipeline.auto_configure(self.X_train, self.y_train, optimizer=Hyperopt, max_evals=1) 
+        trained = pipeline.auto_configure(self.X_train, self.y_train, optimizer=Hyperopt, max_evals=1)
         predictions = trained.predict(self.X_test)
 
+    def test_batching_shuffle_prefetch_summary(self):
+        from lale.lib.sklearn import MinMaxScaler, SGDClassifier
+        from lale.lib.lale import Batching
+
+        pipeline = Batching(operator=MinMaxScaler() >> SGDClassifier(random_state=42),
+                            batch_size=16, shuffle=True, num_prefetch=2, num_epochs=2)
+        trained = pipeline.fit(self.X_train, self.y_train)
+        predictions = trained.predict(self.X_test)
+        self.assertEqual(len(predictions), len(self.y_test))
+        summary = trained.summary()
+        fit_rows = summary[summary['stage'] == 'partial_fit']
+        self.assertEqual(len(fit_rows), 4)
+        self.assertTrue((summary['load_time'] >= 0).all())
+        self.assertTrue((summary['compute_time'] >= 0).all())
+
+    def test_partial_fit_continues_training(self):
+        import numpy as np
+        from lale.lib.sklearn import MinMaxScaler
+        trained = MinMaxScaler().partial_fit(self.X_train[:50])
+        trained2 = trained.partial_fit(self.X_train[50:])
+        self.assertIs(trained2._impl, trained._impl)
+        wrapped = trained2._impl_instance()._wrapped_model
+        self.assertTrue(np.array_equal(wrapped.data_min_, self.X_train.min(axis=0)))
+        self.assertTrue(np.array_equal(wrapped.data_max_, self.X_train.max(axis=0)))
+
+    def test_individual_fit_with_batches(self):
+        import numpy as np
+        from lale.lib.sklearn import SGDClassifier
+        batches = [(self.X_train[i:i+16], self.y_train[i:i+16])
+                   for i in range(0, len(self.X_train), 16)]
+        timings = []
+        trainable = SGDClassifier(random_state=42)
+        trained = trainable.fit_with_batches(
+            batches, y=np.unique(self.y_train), num_epochs=3,
+            shuffle_batches=True, random_state=42, timings=timings)
+        predictions = trained.predict(self.X_test)
+        self.assertEqual(len(predictions), len(self.y_test))
+        self.assertEqual([t['epoch'] for t in timings], [0, 1, 2])
+        for t in timings:
+            self.assertEqual(t['n_rows'], len(self.X_train))
+            self.assertGreater(t['rows_per_second'], 0)
+
+    def test_sparse_data_loader(self):
+        import numpy as np
+        import scipy.sparse
+        from lale.helpers import create_data_loader, get_batch_size
+        X = scipy.sparse.random(50, 1000, density=0.01, format='csr', random_state=42)
+        y = np.arange(50)
+        data_loader = create_data_loader(X, y, batch_size=16)
+        self.assertEqual(get_batch_size(data_loader), 16)
+        batches = list(data_loader)
+        self.assertEqual([len(batch_y) for _, batch_y in batches], [16, 16, 16, 2])
+        batch_X, batch_y = batches[1]
+        self.assertTrue(np.array_equal(np.asarray(batch_X), X[16:32].toarray()))
+        self.assertTrue(np.array_equal(np.asarray(batch_y), y[16:32]))
+
+    def test_prefetch_batches(self):
+        from lale.helpers import prefetch_batches
+        self.assertEqual(list(prefetch_batches(range(10), 3)), list(range(10)))
+        self.assertEqual(list(prefetch_batches(range(10), 0)), list(range(10)))
+        def failing_batches():
+            yield 1
+            raise KeyError('failed to load')
+        with self.assertRaises(KeyError):
+            list(prefetch_batches(failing_batches(), 1))
+
 class TestImportFromSklearnWithCognito(unittest.TestCase):
 
     def test_import_from_sklearn(self):
@@ -126,3 +126,24 @@ class TestClone(unittest.TestCase):
   def test_clone_clones_complex(self):
     op = ((MutatingOp(k=1) | ((MutatingOp(k=2) & MutatingOp(k=3)) >> Concat)) >> MutatingOp(k=4)) | MutatingOp(k=5)
     fit_clone_fit(op)
+
+  def test_clone_set_params_long_pipeline(self):
+    import lale.operators
+    from lale.lib.lale import NoOp
+    from lale.lib.sklearn import LogisticRegression, MinMaxScaler, StandardScaler
+    kinds = [StandardScaler, MinMaxScaler, NoOp]
+    steps = [kinds[i % len(kinds)]() for i in range(29)] + [LogisticRegression()]
+    op = make_sklearn_compat(lale.operators.make_pipeline(*steps))
+    n_available = len(lale.operators._all_available_operators)
+    n = 50
+    for i in range(n):
+      cp = clone(op).set_params(LogisticRegression__C=1.0 + i)
+    self.assertEqual(len(lale.operators._all_available_operators), n_available)
+    old_steps = op.to_lale().steps()
+    new_steps = cp.to_lale().steps()
+    self.assertEqual(len(new_steps), 30)
+    self.assertEqual(new_steps[-1].hyperparams(), {'C': 1.0 + n - 1})
+    self.assertEqual(old_steps[-1].hyperparams(), {})
+    for old_step, new_step in zip(old_steps, new_steps):
+      self.assertIsNot(old_step, new_step)
+      self.assertIsNot(old_step._impl, new_step._impl)
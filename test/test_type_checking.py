@@ -123,6 +123,284 @@ class TestDatasetSchemas(unittest.TestCase):
         self.assertEqual(train_X_schema, train_X_expected)
         self.assertEqual(train_y_schema, train_y_expected)
 
+    def test_parquet_to_schema(self):
+        from lale.datasets.arrow_datasets import ArrowBatchReader
+        from lale.datasets.data_schemas import to_schema
+        from lale.type_checking import validate_schema
+        import pyarrow
+        import pyarrow.parquet
+        import tempfile
+        train_X, train_y = self._irisDf['X'], self._irisDf['y']
+        df = train_X.assign(target=train_y)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'iris.parquet')
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            pyarrow.parquet.write_table(table, path)
+            reader = ArrowBatchReader(path, batch_size=50, target='target')
+            self.assertEqual(reader.schema_X, to_schema(train_X))
+            self.assertEqual(reader.schema_y, to_schema(train_y))
+            for epoch in range(2):
+                n_rows = []
+                for X, y in reader:
+                    validate_schema(X, to_schema(X), subsample_array=False)
+                    self.assertEqual(to_schema(X)['maxItems'], len(X))
+                    self.assertEqual(to_schema(y)['maxItems'], len(y))
+                    n_rows.append(len(X))
+                self.assertEqual(n_rows, [50, 50, 20])
+
+    def test_dataset_cache(self):
+        import lale.datasets.dataset_cache
+        from lale.datasets.data_schemas import to_schema
+        import numpy as np
+        import tempfile
+        saved_cache_dir = lale.datasets.dataset_cache.cache_dir
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lale.datasets.dataset_cache.cache_dir = tmpdir
+            try:
+                irisArr_X, irisArr_y = self._irisArr['X'], self._irisArr['y']
+                irisDf_X, irisDf_y = self._irisDf['X'], self._irisDf['y']
+                objs = [irisArr_X, irisArr_y, irisDf_X, irisDf_y]
+                self.assertIsNone(lale.datasets.dataset_cache.load('iris', test_size=0.2))
+                self.assertTrue(lale.datasets.dataset_cache.store('iris', objs, test_size=0.2))
+                self.assertIsNone(lale.datasets.dataset_cache.load('iris', test_size=0.3))
+                cached = lale.datasets.dataset_cache.load('iris', test_size=0.2)
+                self.assertIsInstance(cached[0].base, np.memmap)
+                for obj, cached_obj in zip(objs, cached):
+                    self.assertEqual(to_schema(cached_obj), to_schema(obj))
+                    self.assertTrue(np.array_equal(np.asarray(cached_obj), np.asarray(obj)))
+                lale.datasets.dataset_cache.clear('iris')
+                self.assertIsNone(lale.datasets.dataset_cache.load('iris', test_size=0.2))
+            finally:
+                lale.datasets.dataset_cache.cache_dir = saved_cache_dir
+
+    def test_dataset_cache_key(self):
+        import lale.datasets.dataset_cache as dataset_cache
+        import numpy as np
+        import os
+        import tempfile
+        import unittest.mock
+        objs = [np.arange(6.0).reshape(3, 2)]
+        saved_cache_dir = dataset_cache.cache_dir
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dataset_cache.cache_dir = os.path.join(tmpdir, 'cache')
+            source_file = os.path.join(tmpdir, 'fetch.py')
+            with open(source_file, 'w') as f:
+                f.write('preprocess = 1')
+            try:
+                self.assertTrue(dataset_cache.store('toy', objs, source_files=[source_file]))
+                self.assertIsNotNone(dataset_cache.load('toy', source_files=[source_file]))
+                with unittest.mock.patch.object(dataset_cache, '_format_version', -1):
+                    self.assertIsNone(dataset_cache.load('toy', source_files=[source_file]))
+                #changing the preprocessing code invalidates the entry
+                with open(source_file, 'w') as f:
+                    f.write('preprocess = 2')
+                dataset_cache._source_file_digests.clear()
+                self.assertIsNone(dataset_cache.load('toy', source_files=[source_file]))
+            finally:
+                dataset_cache.cache_dir = saved_cache_dir
+                dataset_cache._source_file_digests.clear()
+
+    def test_arff_reader(self):
+        from lale.datasets.arff_datasets import ArffBatchReader
+        from lale.datasets.data_schemas import liac_arff_to_schema, to_schema
+        import arff
+        import tempfile
+        arff_text = '\n'.join([
+            "% toy data",
+            "@relation 'toy'",
+            "@attribute 'checking status' {'<0','0<=X<200','no checking'}",
+            "@attribute duration numeric",
+            "@attribute age integer",
+            "@attribute name string",
+            "@attribute class {good,bad}",
+            "@data",
+            "'<0',6,67,'Bob, Jr.',good",
+            "'0<=X<200',48.5,?,'Al',bad",
+            "'no checking',?,49,?,good", ""])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'toy.arff')
+            with open(path, 'w') as f:
+                f.write(arff_text)
+            with open(path) as f:
+                larff = arff.load(f)
+            reader = ArffBatchReader(path, batch_size=2, target='class')
+            self.assertEqual(reader.attributes, larff['attributes'])
+            data_all = reader.read(missing_as_none=True)
+            self.assertEqual(to_schema(data_all), liac_arff_to_schema(larff))
+            data_all = data_all.astype(object).where(data_all.notna(), None)
+            self.assertEqual(data_all.values.tolist(), larff['data'])
+            n_rows = []
+            for X, y in reader:
+                self.assertEqual(to_schema(X)['maxItems'], len(X))
+                self.assertEqual(to_schema(y)['items']['enum'], ['good', 'bad'])
+                n_rows.append(len(y))
+            self.assertEqual(n_rows, [2, 1])
+
+    def test_arff_reader_double_quotes(self):
+        from lale.datasets.arff_datasets import ArffBatchReader
+        import arff
+        import tempfile
+        arff_text = '\n'.join([
+            "@relation toy",
+            "@attribute \"first name\" {\"Dan, Sr.\",'O\\'Brien',Al}",
+            "@attribute remark string",
+            "@attribute score numeric",
+            "@data",
+            "\"Dan, Sr.\",\"say \\\"hi\\\", please\",1",
+            "'O\\'Brien','it\\'s \"fine\"',2",
+            "Al,\"back\\\\slash\",?", ""])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'toy.arff')
+            with open(path, 'w') as f:
+                f.write(arff_text)
+            with open(path) as f:
+                larff = arff.load(f)
+            reader = ArffBatchReader(path, batch_size=2)
+            self.assertEqual(reader.attributes, larff['attributes'])
+            data_all = reader.read(missing_as_none=True)
+            data_all = data_all.astype(object).where(data_all.notna(), None)
+            self.assertEqual(data_all.values.tolist(), larff['data'])
+
+    def test_resources(self):
+        import lale.datasets.resources as resources
+        import os
+        import pathlib
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'source.txt')
+            with open(source, 'w') as f:
+                f.write('hello')
+            mirror = os.path.join(tmpdir, 'mirror')
+            os.makedirs(mirror)
+            saved_environ = dict(os.environ)
+            os.environ['LALE_RESOURCE_MIRROR'] = mirror
+            try:
+                resources.register('test/hello.txt', pathlib.Path(source).as_uri())
+                self.assertIsNone(resources.find('test/hello.txt'))
+                os.environ['LALE_OFFLINE'] = 'true'
+                with self.assertRaises(FileNotFoundError):
+                    resources.resolve('test/hello.txt')
+                os.environ['LALE_OFFLINE'] = 'false'
+                paths = resources.prefetch(['test/hello.txt'])
+                self.assertEqual(paths['test/hello.txt'], os.path.join(mirror, 'test', 'hello.txt'))
+                os.environ['LALE_OFFLINE'] = 'true'
+                self.assertEqual(resources.resolve('test/hello.txt'), paths['test/hello.txt'])
+                with open(paths['test/hello.txt'], 'w') as f:
+                    f.write('tampered')
+                with self.assertRaises(ValueError):
+                    resources.find('test/hello.txt')
+            finally:
+                os.environ.clear()
+                os.environ.update(saved_environ)
+                resources._registry.pop('test/hello.txt', None)
+
+    def test_resolve_into_target(self):
+        import lale.datasets.resources as resources
+        import os
+        import pathlib
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'source.txt')
+            with open(source, 'w') as f:
+                f.write('hello')
+            saved_environ = dict(os.environ)
+            os.environ.pop('LALE_RESOURCE_MIRROR', None)
+            os.environ.pop('LALE_OFFLINE', None)
+            try:
+                sha256 = resources.sha256_of_file(source)
+                resources.register('test/hello.txt', pathlib.Path(source).as_uri(), sha256=sha256)
+                entry = dict(resources._registry['test/hello.txt'])
+                target = os.path.join(tmpdir, 'download', 'hello.txt')
+                self.assertEqual(resources.resolve('test/hello.txt', target=target), target)
+                self.assertTrue(os.path.exists(target))
+                self.assertEqual(resources._registry['test/hello.txt'], entry)
+            finally:
+                os.environ.clear()
+                os.environ.update(saved_environ)
+                resources._registry.pop('test/hello.txt', None)
+
+    def test_extract_archive(self):
+        import lale.datasets.resources as resources
+        import io
+        import os
+        import tarfile
+        import tempfile
+        import zipfile
+        def add_file(archive, name):
+            info = tarfile.TarInfo(name)
+            info.size = 5
+            archive.addfile(info, io.BytesIO(b'hello'))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = os.path.join(tmpdir, 'target')
+            good = os.path.join(tmpdir, 'good.tar.gz')
+            with tarfile.open(good, 'w:gz') as archive:
+                add_file(archive, 'module/saved_model.pb')
+            resources.extract_archive(good, target)
+            self.assertTrue(os.path.exists(os.path.join(target, 'module', 'saved_model.pb')))
+            for bad_name in ['../evil.txt', 'module/../../evil.txt', '/tmp/evil.txt']:
+                bad = os.path.join(tmpdir, 'bad.tar.gz')
+                with tarfile.open(bad, 'w:gz') as archive:
+                    add_file(archive, 'module/ok.txt')
+                    add_file(archive, bad_name)
+                with self.assertRaises(ValueError):
+                    resources.extract_archive(bad, target)
+                self.assertFalse(os.path.exists(os.path.join(target, 'module', 'ok.txt')))
+            link = os.path.join(tmpdir, 'link.tar')
+            with tarfile.open(link, 'w') as archive:
+                info = tarfile.TarInfo('module/link')
+                info.type, info.linkname = tarfile.SYMTYPE, '../../etc/passwd'
+                archive.addfile(info)
+            with self.assertRaises(ValueError):
+                resources.check_archive_members(link)
+            bad_zip = os.path.join(tmpdir, 'bad.zip')
+            with zipfile.ZipFile(bad_zip, 'w') as archive:
+                archive.writestr('glove.6B.50d.txt', 'the 0.1')
+                archive.writestr('../evil.txt', 'hello')
+            with self.assertRaises(ValueError):
+                resources.extract_archive(bad_zip, target, ['glove.6B.50d.txt'])
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'evil.txt')))
+
+    def test_add_and_strip_schema_share_data(self):
+        from lale.datasets.data_schemas import add_schema, strip_schema, to_schema
+        import numpy as np
+        import pandas as pd
+        import scipy.sparse
+        arr = np.arange(12.0).reshape(4, 3)
+        df = pd.DataFrame(arr, columns=['a', 'b', 'c'])
+        for obj in [arr, df, df['a']]:
+            annotated = add_schema(obj)
+            stripped = strip_schema(annotated)
+            self.assertIs(type(stripped), type(obj))
+            self.assertTrue(np.shares_memory(np.asarray(annotated), np.asarray(obj)))
+            self.assertTrue(np.shares_memory(np.asarray(stripped), np.asarray(obj)))
+        sparse = scipy.sparse.csr_matrix(arr)
+        schema = {'type': 'array', 'items': {'type': 'array', 'items': {'type': 'number', 'minimum': 0.0}}}
+        self.assertIs(add_schema(sparse, schema), sparse)
+        self.assertEqual(to_schema(sparse), schema)
+        self.assertNotEqual(to_schema(scipy.sparse.csr_matrix(arr)), schema)
+
+    def test_schema_attachment_without_copies(self):
+        from lale.datasets.data_schemas import add_schema, strip_schema, to_schema
+        import numpy as np
+        import os
+        import pandas as pd
+        import tracemalloc
+        #set LALE_BENCHMARK_BYTES=5e9 for a 5GB frame
+        n_bytes = int(float(os.environ.get('LALE_BENCHMARK_BYTES', 1e8)))
+        n_cols = 100
+        n_rows = n_bytes // (8 * n_cols)
+        df = pd.DataFrame(np.zeros((n_rows, n_cols)), columns=[f'x{i}' for i in range(n_cols)])
+        tracemalloc.start()
+        X = df
+        for step in range(5):
+            X = add_schema(X, recalc=True)
+            to_schema(X)
+            X = strip_schema(X)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertTrue(np.shares_memory(X.to_numpy(), df.to_numpy()))
+        self.assertLess(peak, n_bytes / 100)
+
     def test_arff_to_schema(self):
         from lale.datasets.data_schemas import to_schema
         from lale.type_checking import validate_schema
@@ -257,6 +535,54 @@ class TestDatasetSchemas(unittest.TestCase):
         self.maxDiff = None
         self.assertEqual(transformed_schema, transformed_expected)
 
+    def test_keep_columns_as_view(self):
+        from lale.lib.lale import Project
+        import numpy as np
+        X = np.arange(12).reshape(3, 4)
+        transformed = Project(columns=[1, 2]).fit(X).transform(X)
+        self.assertTrue(np.shares_memory(transformed, X))
+        self.assertEqual(transformed.json_schema['items']['maxItems'], 2)
+        transformed = Project(columns=[3, 0]).fit(X).transform(X)
+        self.assertEqual(transformed.tolist(), [[3, 0], [7, 4], [11, 8]])
+
+    def test_keep_columns_of_narrower_frame(self):
+        from lale.lib.lale import Project
+        import pandas as pd
+        df = pd.DataFrame({'a': [1, 2], 'b': [3, 4], 'c': [5, 6], 'd': [7, 8]})
+        trained = Project(columns=['c', 'd']).fit(df)
+        for X in [df[['c', 'd']], df[['d', 'c']], df[['d', 'a', 'c']]]:
+            transformed = trained.transform(X)
+            self.assertEqual([*transformed.columns], ['c', 'd'])
+            self.assertEqual(transformed.values.tolist(), [[5, 7], [6, 8]])
+        with self.assertRaises(ValueError):
+            trained.transform(df[['a', 'c']])
+
+    def test_projection_pushdown(self):
+        from lale.datasets.arff_datasets import ArffBatchReader
+        from lale.lib.lale import Project
+        import tempfile
+        arff_text = '\n'.join([
+            "@relation toy",
+            "@attribute name string",
+            "@attribute age integer",
+            "@attribute city string",
+            "@attribute height numeric",
+            "@attribute class {good,bad}",
+            "@data",
+            "'Al',67,'Paris',1.8,good",
+            "'Bo',22,'Rome',1.6,bad"])
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.arff') as f:
+            f.write(arff_text)
+            f.flush()
+            reader = ArffBatchReader(f.name, target='class')
+            pipeline = (Project(columns=['name']) & Project(columns={'type': 'number'})) >> ConcatFeatures
+            projected = reader.project(pipeline)
+            self.assertEqual(projected.columns, ['name', 'age', 'height', 'class'])
+            for X, y in projected:
+                self.assertEqual(list(X.columns), ['name', 'age', 'height'])
+                self.assertEqual(list(y), ['good', 'bad'])
+            self.assertIs(reader.project(NoOp >> Project(columns=['name'])), reader)
+
     def test_input_schema_fit(self):
         self.maxDiff = None
         self.assertEqual(